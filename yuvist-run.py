@@ -25,8 +25,13 @@ if __name__ == '__main__':
     import sys
     sys_argv = sys.argv
     sys.argv = sys.argv[:1]
-    from yuvist.yuvistapp import YuvistApp
 
     cmd = sys_argv[1:] if len(sys_argv) > 1 else []
+
+    from yuvist.tools import TOOLS, run_tool
+    if len(cmd) > 0 and cmd[0] in TOOLS:
+        sys.exit(run_tool(cmd[0], cmd[1:]))
+
+    from yuvist.yuvistapp import YuvistApp
     app = YuvistApp(command=cmd)
     app.run()
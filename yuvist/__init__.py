@@ -22,7 +22,32 @@ __all__ = ()
 
 __version__ = '0.10.1'
 
-import kivy
+import sys
+
+
+def _run_tool():
+    # python -m yuvist.tools.<tool> imports this package before the tool,
+    # runpy holds the name of the module it is about to run
+    frame = sys._getframe()
+    while frame is not None:
+        if frame.f_globals.get('__name__') == 'runpy' and \
+           'mod_name' in frame.f_locals:
+            return str(frame.f_locals['mod_name']).startswith('yuvist.tools.')
+        frame = frame.f_back
+    return False
+
+
+# kivy parses sys.argv on import and exits on options it does not know, the
+# headless tools hide their own options, the viewer leaves kivy options alone
+if _run_tool():
+    _argv, sys.argv = sys.argv, sys.argv[:1]
+    try:
+        import kivy
+    finally:
+        sys.argv = _argv
+        del _argv
+else:
+    import kivy
 kivy.require('1.6.0')
 
 from os.path import dirname
@@ -18,16 +18,79 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-__all__ = ('Command', )
+__all__ = ('Command', 'ConvertCommand', 'CompareCommand', 'StatsCommand',
+           'DupsCommand', 'BenchmarkCommand')
 
 from argparse import ArgumentParser
+from multiprocessing import cpu_count
 
 import yuvist
-from yuvist.core.video import YUV_CHROMA_FORMAT, OUT_COLOR_FORMAT
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_BITDEPTH, \
+        YUV_COLOR_MATRIX, YUV_COLOR_RANGE, YUV_CONVERT_TYPE, YUV_CHROMA_FILTER, \
+        YUV_CHROMA_SITING, OUT_COLOR_FORMAT, COMPARE_MODE, PLAYBACK_POLICY
+from yuvist.core.video.detect_yuv import DetectYuv
 
 
 class Command(object):
 
+    def _add_yuv_arguments(self, parser):
+
+        parser.add_argument('--format', help='YUV image chroma format '
+                '(default detected)',
+                dest='format', action='store',
+                default=None, choices=YUV_CHROMA_FORMAT)
+        parser.add_argument('--size', help='YUV image width and height '
+                '(default detected)',
+                dest='yuv_size', action='store', metavar=('WIDTH', 'HEIGHT'),
+                default=None, type=int, nargs=2)
+        parser.add_argument('--bitdepth', help='YUV sample bit depth '
+                '(default detected)',
+                dest='bitdepth', action='store',
+                default=None, type=int, choices=YUV_BITDEPTH)
+
+    def _detect_yuv(self, filename):
+
+        # fill what the arguments left out from the filename and the file
+        try:
+            detected = DetectYuv(filename=filename, format=self.format,
+                                 size=self.yuv_size, bitdepth=self.bitdepth).detect()
+        except Exception:
+            detected = None
+        if detected is not None:
+            self.format, self.yuv_size, self.bitdepth = detected
+
+        self.format   = self.format or YUV_CHROMA_FORMAT[1]
+        self.yuv_size = self.yuv_size or [1920, 1080]
+        self.bitdepth = self.bitdepth or YUV_BITDEPTH[0]
+
+    def _add_color_arguments(self, parser):
+
+        parser.add_argument('--matrix', help='YUV to RGB color matrix',
+                dest='color_matrix', action='store',
+                default=YUV_COLOR_MATRIX[0], choices=YUV_COLOR_MATRIX)
+        parser.add_argument('--range', help='YUV sample range',
+                dest='color_range', action='store',
+                default=YUV_COLOR_RANGE[0], choices=YUV_COLOR_RANGE)
+        parser.add_argument('--chroma', help='chroma upsampling filter',
+                dest='chroma_filter', action='store',
+                default=YUV_CHROMA_FILTER[0], choices=YUV_CHROMA_FILTER)
+        parser.add_argument('--siting', help='chroma sample siting of the '
+                'bilinear filter',
+                dest='chroma_siting', action='store',
+                default=YUV_CHROMA_SITING[0], choices=YUV_CHROMA_SITING)
+
+    def _add_batch_arguments(self, parser):
+
+        parser.add_argument('--start', help='first frame to process',
+                dest='start', action='store', metavar='FRAME',
+                default=0, type=int)
+        parser.add_argument('--frames', help='number of frames to process',
+                dest='frames', action='store', metavar='COUNT',
+                default=None, type=int)
+        parser.add_argument('-j', '--jobs', help='number of worker processes',
+                dest='jobs', action='store', metavar='COUNT',
+                default=cpu_count(), type=int)
+
     def parse(self, args):
 
         parser = ArgumentParser(prog='yuvist.py',
@@ -52,20 +115,43 @@ class Command(object):
                 dest='state', action='store',
                 default='play', choices=['play', 'pause', 'stop'])
 
-        parser.add_argument('--format', help='YUV image chroma format',
-                dest='format', action='store',
-                default=YUV_CHROMA_FORMAT[1], choices=YUV_CHROMA_FORMAT)
+        self._add_yuv_arguments(parser)
+        self._add_color_arguments(parser)
         parser.add_argument('--colorfmt', help='output color format',
                 dest='colorfmt', action='store',
                 default=OUT_COLOR_FORMAT[1], choices=OUT_COLOR_FORMAT)
         parser.add_argument('--fps', help='display frames per second',
                 dest='yuv_fps', action='store', metavar='VALUE',
                 default=30., type=float)
-        parser.add_argument('--size', help='YUV image width and height',
-                dest='yuv_size', action='store', metavar=('WIDTH', 'HEIGHT'),
-                default=[1920, 1080], type=int, nargs=2)
+        parser.add_argument('--policy', help='late frame policy of playback',
+                dest='playback_policy', action='store',
+                default=PLAYBACK_POLICY[0], choices=PLAYBACK_POLICY)
+        parser.add_argument('--buffer', help='number of frames to read ahead',
+                dest='buffer_depth', action='store', metavar='FRAMES',
+                default=4, type=int)
+        parser.add_argument('--mmap', help='map YUV file into memory',
+                dest='use_mmap', action='store_true')
+        parser.add_argument('--cache', help='memory cap of decoded frame cache in MB',
+                dest='cache_size', action='store', metavar='MB',
+                default=256, type=int)
+        parser.add_argument('--region', help='read and show only this part of the frame',
+                dest='region', action='store', metavar=('X', 'Y', 'WIDTH', 'HEIGHT'),
+                nargs=4, type=int)
+        parser.add_argument('--preload', help='memory cap of preloaded playlist neighbours in MB',
+                dest='preload_size', action='store', metavar='MB',
+                default=256, type=int)
+        parser.add_argument('--profile', help='write hot path timings to a JSON file on exit',
+                dest='profile', action='store', metavar='FILENAME')
+
+        parser.add_argument('--compare', help='YUV image filename to compare with',
+                dest='compare_source', action='store', metavar='FILENAME',
+                default='')
+        parser.add_argument('--compare-mode', help='comparison display mode',
+                dest='compare_mode', action='store',
+                default=COMPARE_MODE[1], choices=COMPARE_MODE)
 
-        parser.add_argument('-l', '--playlist', help='filename of playlist',
+        parser.add_argument('-l', '--playlist', help='filename of JSON Lines playlist, '
+                'created when missing and updated on exit',
                 dest='playlist', action='store', metavar='FILENAME')
 
         parser.add_argument('playitem', help='YUV image filename',
@@ -79,6 +165,186 @@ class Command(object):
         return vars(self)
 
 
+class ConvertCommand(Command):
+
+    def parse(self, args):
+
+        parser = ArgumentParser(prog='yuvist.py convert',
+                description='Convert YUV image frames to RGB images',
+                epilog='Copyright (C) 2013 Luuvish <luuvish@gmail.com>')
+
+        self._add_yuv_arguments(parser)
+
+        parser.add_argument('-o', '--output', help='output filename, '
+                'a %%d pattern writes one file per frame, - writes to stdout',
+                dest='output', action='store', metavar='FILENAME',
+                required=True)
+        parser.add_argument('-t', '--type', help='output file type '
+                '(default from output filename)',
+                dest='type', action='store',
+                default=None, choices=['rgb', 'ppm', 'png'])
+        parser.add_argument('--method', help='YUV to RGB conversion method',
+                dest='method', action='store',
+                default='float', choices=YUV_CONVERT_TYPE)
+        self._add_color_arguments(parser)
+        self._add_batch_arguments(parser)
+
+        parser.add_argument('playitem', help='YUV image filename',
+                action='store', metavar='FILENAME')
+
+        parser.parse_args(args=args, namespace=self)
+        self._detect_yuv(self.playitem)
+
+        if self.type is None:
+            ext = self.output.rsplit('.', 1)[-1].lower()
+            self.type = ext if ext in ('ppm', 'png') else 'rgb'
+
+        return vars(self)
+
+
+class CompareCommand(Command):
+
+    def parse(self, args):
+
+        parser = ArgumentParser(prog='yuvist.py compare',
+                description='Compare two YUV image files by PSNR and SSIM',
+                epilog='Copyright (C) 2013 Luuvish <luuvish@gmail.com>')
+
+        self._add_yuv_arguments(parser)
+        self._add_batch_arguments(parser)
+
+        parser.add_argument('-o', '--output', help='per-frame report filename '
+                '(.csv or .json)',
+                dest='output', action='store', metavar='FILENAME',
+                default=None)
+        parser.add_argument('--no-ssim', help='skip SSIM computation',
+                dest='ssim', action='store_false')
+
+        parser.add_argument('reference', help='reference YUV image filename',
+                action='store', metavar='REFERENCE')
+        parser.add_argument('distorted', help='distorted YUV image filename',
+                action='store', metavar='DISTORTED')
+
+        parser.parse_args(args=args, namespace=self)
+        self._detect_yuv(self.reference)
+
+        return vars(self)
+
+
+class StatsCommand(Command):
+
+    def parse(self, args):
+
+        parser = ArgumentParser(prog='yuvist.py stats',
+                description='Per-frame statistics and histograms of YUV image planes',
+                epilog='Copyright (C) 2013 Luuvish <luuvish@gmail.com>')
+
+        self._add_yuv_arguments(parser)
+        parser.add_argument('--range', help='YUV sample range, '
+                'sets the levels counted as clipped',
+                dest='color_range', action='store',
+                default=YUV_COLOR_RANGE[0], choices=YUV_COLOR_RANGE)
+        parser.add_argument('--bins', help='number of histogram bins',
+                dest='bins', action='store', metavar='COUNT',
+                default=256, type=int)
+        self._add_batch_arguments(parser)
+
+        parser.add_argument('-o', '--output', help='per-frame report filename '
+                '(.csv or .json), - writes csv to stdout',
+                dest='output', action='store', metavar='FILENAME',
+                default=None)
+
+        parser.add_argument('playitem', help='YUV image filename',
+                action='store', metavar='FILENAME')
+
+        parser.parse_args(args=args, namespace=self)
+        self._detect_yuv(self.playitem)
+
+        return vars(self)
+
+
+class DupsCommand(Command):
+
+    def parse(self, args):
+
+        parser = ArgumentParser(prog='yuvist.py dups',
+                description='Hash every frame and flag duplicate and frozen YUV frames',
+                epilog='Copyright (C) 2013 Luuvish <luuvish@gmail.com>')
+
+        self._add_yuv_arguments(parser)
+        parser.add_argument('--threshold', help='mean luma signature distance '
+                'in 8 bit levels of a near duplicate (default %(default)s)',
+                dest='threshold', action='store', metavar='LEVELS',
+                default=1., type=float)
+        parser.add_argument('--grid', help='luma signature cells along each side '
+                '(default %(default)s)',
+                dest='grid', action='store', metavar='COUNT',
+                default=16, type=int)
+        self._add_batch_arguments(parser)
+
+        parser.add_argument('-o', '--output', help='index filename '
+                '(default FILENAME.dups, shown on the seek bar), - writes to stdout',
+                dest='output', action='store', metavar='FILENAME',
+                default=None)
+
+        parser.add_argument('playitem', help='YUV image filename',
+                action='store', metavar='FILENAME')
+
+        parser.parse_args(args=args, namespace=self)
+        self._detect_yuv(self.playitem)
+
+        return vars(self)
+
+
+class BenchmarkCommand(Command):
+
+    # QCIF through 8K
+    BENCHMARK_SIZES = ('176x144', '352x288', '1280x720', '1920x1080',
+                       '3840x2160', '7680x4320')
+
+    def parse(self, args):
+
+        parser = ArgumentParser(prog='yuvist.py benchmark',
+                description='Time YUV read and convert paths on synthetic files',
+                epilog='Copyright (C) 2013 Luuvish <luuvish@gmail.com>')
+
+        parser.add_argument('--format', help='YUV image chroma formats',
+                dest='formats', action='store', metavar='FORMAT',
+                default=list(YUV_CHROMA_FORMAT), nargs='+',
+                choices=YUV_CHROMA_FORMAT)
+        parser.add_argument('--size', help='YUV image sizes as WIDTHxHEIGHT',
+                dest='sizes', action='store', metavar='SIZE',
+                default=list(self.BENCHMARK_SIZES), nargs='+')
+        parser.add_argument('--bitdepth', help='YUV sample bit depth',
+                dest='bitdepth', action='store',
+                default=YUV_BITDEPTH[0], type=int, choices=YUV_BITDEPTH)
+        parser.add_argument('--time', help='seconds spent on each measurement',
+                dest='time', action='store', metavar='SECONDS',
+                default=.5, type=float)
+        parser.add_argument('--dir', help='directory for the synthetic files '
+                '(default a temporary one)',
+                dest='dir', action='store', metavar='PATH',
+                default=None)
+
+        parser.add_argument('-o', '--output', help='JSON filename to record results',
+                dest='output', action='store', metavar='FILENAME',
+                default=None)
+        parser.add_argument('-b', '--baseline', help='JSON results to compare with',
+                dest='baseline', action='store', metavar='FILENAME',
+                default=None)
+
+        parser.parse_args(args=args, namespace=self)
+
+        try:
+            self.sizes = [map(int, size.lower().split('x')) for size in self.sizes]
+        except ValueError:
+            self.sizes = None
+        if not self.sizes or any(len(size) != 2 for size in self.sizes):
+            parser.error('size must be WIDTHxHEIGHT')
+
+        return vars(self)
+
+
 if __name__ == '__main__':
 
     import sys
@@ -26,7 +26,11 @@ YUV_CHROMA_FORMAT = (
     'yuv420',
     'yuv422',
     'yuv422v',
-    'yuv444'
+    'yuv444',
+    'nv12',
+    'nv21',
+    'yuyv',
+    'uyvy'
 )
 
 YUV_CHROMA_SUBPIXEL = {
@@ -34,7 +38,88 @@ YUV_CHROMA_SUBPIXEL = {
     'yuv420' : (2, 2),
     'yuv422' : (1, 2),
     'yuv422v': (2, 1),
-    'yuv444' : (1, 1)
+    'yuv444' : (1, 1),
+    'nv12'   : (2, 2),
+    'nv21'   : (2, 2),
+    'yuyv'   : (2, 1),
+    'uyvy'   : (2, 1)
 }
 
+# how the planes of a chroma format are laid out in the file
+YUV_CHROMA_LAYOUT = {
+    'yuv400' : 'planar',
+    'yuv420' : 'planar',
+    'yuv422' : 'planar',
+    'yuv422v': 'planar',
+    'yuv444' : 'planar',
+    'nv12'   : 'semiplanar',
+    'nv21'   : 'semiplanar',
+    'yuyv'   : 'packed',
+    'uyvy'   : 'packed'
+}
+
+YUV_BITDEPTH = (8, 10, 12, 16)
+
+YUV_SIZE_LIST = (
+    (( 128,   96), 'SQCIF'),
+    (( 176,  144), 'QCIF'),
+    (( 320,  240), 'QVGA'),
+    (( 352,  240), '525 SIF'),
+    (( 352,  288), 'CIF'),
+    (( 352,  480), '525 HHR'),
+    (( 352,  576), '625 HHR'),
+    (( 640,  360), 'Q720p'),
+    (( 640,  480), 'VGA'),
+    (( 704,  480), '525 4SIF'),
+    (( 720,  480), '525 SD'),
+    (( 704,  576), '4CIF'),
+    (( 720,  576), '625 SD'),
+    (( 864,  480), '480p'),
+    (( 800,  600), 'SVGA'),
+    (( 960,  540), 'QHD'),
+    ((1024,  768), 'XGA'),
+    ((1280,  720), '720p HD'),
+    ((1280,  960), '4VGA'),
+    ((1280, 1024), 'SXGA'),
+    ((1408,  960), '525 16SIF'),
+    ((1408, 1152), '16CIF'),
+    ((1600, 1200), '4SVGA'),
+    ((1920, 1080), '1080 HD'),
+    ((2048, 1024), '2Kx1K'),
+    ((2048, 1080), '2Kx1080'),
+    ((2560, 1920), '16VGA'),
+    ((3616, 1536), '3616x1536'),
+    ((3680, 1536), '3672x1536'),
+    ((3840, 2160), '4HD'),
+    ((4096, 2048), '4Kx2K'),
+    ((4096, 2160), '4096x2160'),
+    ((4096, 2304), '4096x2304'),
+    ((7680, 4320), '7680x4320'),
+    ((8192, 4096), '8192x4096'),
+    ((8192, 4320), '8192x4320')
+)
+
+YUV_COLOR_MATRIX = ('bt601', 'bt709', 'bt2020')
+
+# luma weights of red and blue (Kr, Kb) of each color matrix
+YUV_COLOR_KRKB = {
+    'bt601' : (0.299,  0.114),
+    'bt709' : (0.2126, 0.0722),
+    'bt2020': (0.2627, 0.0593)
+}
+
+YUV_COLOR_RANGE = ('limited', 'full')
+
+# chroma upsampling, mpeg2 sites chroma on the left luma column and between
+# the rows, jpeg between the columns and the rows
+YUV_CHROMA_FILTER = ('nearest', 'bilinear')
+YUV_CHROMA_SITING = ('mpeg2', 'jpeg')
+
+# rgb conversion on the cpu, lut gathers all three offsets of a chroma pair
+YUV_CONVERT_TYPE = ('float', 'int', 'table', 'lut')
+
 OUT_COLOR_FORMAT = ('rgb', 'luminance')
+
+COMPARE_MODE = ('none', 'split', 'wipe', 'diff')
+
+PLAYBACK_POLICY = ('drop', 'hold', 'every')
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('CacheYuv', 'frame_cache')
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class CacheYuv(object):
+
+    def __init__(self, **kwargs):
+        self._lock    = Lock()
+        self._entries = OrderedDict()
+        self._limit   = kwargs.get('limit', 0)
+        self._used    = 0
+        self._hits    = 0
+        self._misses  = 0
+        self._evicted = 0
+
+    def _get_limit(self):
+        return self._limit
+
+    def _set_limit(self, limit):
+        with self._lock:
+            self._limit = limit
+            self._evict()
+
+    limit = property(lambda self: self._get_limit(),
+            lambda self, x: self._set_limit(x),
+            doc='Get/set the memory cap of the cache (in bytes, 0 disables)')
+
+    @property
+    def used(self):
+        return self._used
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def evictions(self):
+        return self._evicted
+
+    def info(self):
+        # counters for the profile, a snapshot taken under the lock
+        with self._lock:
+            return dict(entries=len(self._entries), used=self._used,
+                        limit=self._limit, hits=self._hits,
+                        misses=self._misses, evictions=self._evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries[key] = value
+            self._hits += 1
+            return value[0]
+
+    def put(self, key, buf):
+        nbytes = sum(len(plane) for plane in buf if plane is not None)
+        with self._lock:
+            if nbytes > self._limit:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._used -= old[1]
+            self._entries[key] = buf, nbytes
+            self._used += nbytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+
+    def _evict(self):
+        while self._used > self._limit and self._entries:
+            key, value = self._entries.popitem(last=False)
+            self._used -= value[1]
+            self._evicted += 1
+
+
+frame_cache = CacheYuv(limit=256 * 1024 * 1024)
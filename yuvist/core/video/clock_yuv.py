@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('ClockYuv', )
+
+import sys
+import time
+
+from yuvist.core.video import PLAYBACK_POLICY
+
+
+def _monotonic_clock():
+    # python 2 has no time.monotonic, ask the system for a clock that never
+    # jumps with the wall clock, time.time is the last resort only
+    try:
+        return time.monotonic
+    except AttributeError:
+        pass
+
+    if sys.platform == 'win32':
+        # QueryPerformanceCounter since the first call
+        return time.clock
+
+    try:
+        import ctypes
+        import ctypes.util
+    except ImportError:
+        return time.time
+
+    if sys.platform == 'darwin':
+        class _timebase(ctypes.Structure):
+            _fields_ = [('numer', ctypes.c_uint32), ('denom', ctypes.c_uint32)]
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'))
+            ticks = libc.mach_absolute_time
+            ticks.restype = ctypes.c_uint64
+            timebase = _timebase()
+            libc.mach_timebase_info(ctypes.byref(timebase))
+        except (OSError, AttributeError):
+            return time.time
+        scale = timebase.numer / (timebase.denom * 1e9)
+        return lambda: ticks() * scale
+
+    class _timespec(ctypes.Structure):
+        _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+    CLOCK_MONOTONIC = 1     # the value on linux, other unixes number it apart
+    if not sys.platform.startswith('linux'):
+        return time.time
+    try:
+        lib = ctypes.CDLL(ctypes.util.find_library('rt') or
+                          ctypes.util.find_library('c'), use_errno=True)
+        clock_gettime = lib.clock_gettime
+    except (OSError, AttributeError):
+        return time.time
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_timespec)]
+
+    def monotonic():
+        now = _timespec()
+        if clock_gettime(CLOCK_MONOTONIC, ctypes.byref(now)) != 0:
+            return time.time()
+        return now.tv_sec + now.tv_nsec * 1e-9
+
+    # a missing clock fails the first call, rather fall back right away
+    now = _timespec()
+    if clock_gettime(CLOCK_MONOTONIC, ctypes.byref(now)) != 0:
+        return time.time
+    return monotonic
+
+
+monotonic = _monotonic_clock()
+
+
+# playback clock, derives the frame to show from a monotonic wall clock
+#   drop  - show the frame due now, late frames are skipped
+#   hold  - like drop, but keep the last frame on screen while the due
+#           frame is still being read instead of waiting for it
+#   every - show every frame, the clock slips when a frame is late
+class ClockYuv(object):
+
+    def __init__(self, **kwargs):
+        self._fps    = kwargs.get('fps', 30.)
+        self._policy = kwargs.get('policy', PLAYBACK_POLICY[0])
+
+        if self._policy not in PLAYBACK_POLICY:
+            raise Exception("Not support playback policy")
+
+        self._origin  = None
+        self._started = None
+        self.reset()
+
+    def _get_fps(self):
+        return self._fps
+
+    def _set_fps(self, fps):
+        if fps == self._fps:
+            return
+        if self._origin is not None:
+            nframe = self.due()
+            self._fps = fps
+            self.start(nframe)
+        else:
+            self._fps = fps
+
+    fps = property(lambda self: self._get_fps(),
+            lambda self, x: self._set_fps(x),
+            doc='Get/set the frames per second')
+
+    @property
+    def policy(self):
+        return self._policy
+
+    @property
+    def running(self):
+        return self._origin is not None
+
+    @property
+    def displayed(self):
+        return self._displayed
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    @property
+    def repeated(self):
+        return self._repeated
+
+    @property
+    def slipped(self):
+        # frames the every policy fell behind the clock, none of them repeated
+        return self._slipped
+
+    @property
+    def elapsed(self):
+        if self._started is None:
+            return self._elapsed
+        return self._elapsed + monotonic() - self._started
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self._displayed / elapsed if elapsed > 0 else 0.
+
+    def reset(self):
+        self._displayed = 0
+        self._dropped   = 0
+        self._repeated  = 0
+        self._slipped   = 0
+        self._elapsed   = 0.
+        self._held      = -1
+        if self._started is not None:
+            self._started = monotonic()
+
+    def start(self, nframe):
+        now = monotonic()
+        self._origin = now - nframe / float(self._fps)
+        self._held   = nframe
+        if self._started is None:
+            self._started = now
+
+    def stop(self):
+        if self._started is not None:
+            self._elapsed += monotonic() - self._started
+        self._origin  = None
+        self._started = None
+
+    def due(self):
+        return int((monotonic() - self._origin) * self._fps)
+
+    def next(self, shown):
+        # frame to show after shown, None until it is due
+        if self._origin is None:
+            return None
+        due = self.due()
+        if due <= shown:
+            return None
+        if self._policy == PLAYBACK_POLICY[2] and due > shown + 1:
+            self._slipped += due - shown - 1
+            self.start(shown + 1)
+            return shown + 1
+        return due
+
+    def shown(self, nframe, last):
+        if nframe > last + 1 and last >= 0:
+            self._dropped += nframe - last - 1
+        self._displayed += 1
+
+    def held(self, nframe, last):
+        # the due frame is not read yet, the last one stays on screen
+        if nframe > self._held:
+            self._repeated += nframe - max(self._held, last)
+            self._held = nframe
+
+    def __str__(self):
+        return 'displayed %d dropped %d repeated %d slipped %d (%.2f fps)' % (
+            self._displayed, self._dropped, self._repeated, self._slipped,
+            self.rate)
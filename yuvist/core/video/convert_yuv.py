@@ -20,40 +20,63 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 __all__ = ('ConvertYuv', )
 
-from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL
+import sys
+from array import array
+from math import floor
+from threading import Lock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_COLOR_MATRIX, YUV_COLOR_KRKB, YUV_COLOR_RANGE, YUV_CONVERT_TYPE, \
+        YUV_CHROMA_FILTER, YUV_CHROMA_SITING
+
+
+# tables of every (matrix, range) converted so far, shared read only by all
+# converters, samples above 8 bits are brought to the 8 bit scale first
+_tables      = {}
+_tables_lock = Lock()
 
 
 class ConvertYuv(object):
 
     YUV_FIX       = 16            # fixed-point precision
-    YUV_RANGE_MIN = -227          # min value of r/g/b output
-    YUV_RANGE_MAX = 256 + 226     # max value of r/g/b output
     YUV_HALF      = 1 << (YUV_FIX - 1)
-    VP8kVToR      = [0] * 256
-    VP8kUToB      = [0] * 256
-    VP8kVToG      = [0] * 256
-    VP8kUToG      = [0] * 256
-    VP8kClip      = [0] * (YUV_RANGE_MAX - YUV_RANGE_MIN)
-
-    def __init__(self, **kwargs):
-
-        for i in xrange(256):
-            self.VP8kVToR[i] = (89858 * (i - 128) + self.YUV_HALF) >> self.YUV_FIX
-            self.VP8kUToG[i] = -22014 * (i - 128) + self.YUV_HALF
-            self.VP8kVToG[i] = -45773 * (i - 128)
-            self.VP8kUToB[i] = (113618 * (i - 128) + self.YUV_HALF) >> self.YUV_FIX
+    CHROMA_FIX    = 8             # fixed-point chroma filter weights
 
-        for i in xrange(self.YUV_RANGE_MIN, self.YUV_RANGE_MAX):
-            k = ((i - 16) * 76283 + self.YUV_HALF) >> self.YUV_FIX
-            k = 0 if k < 0 else 255 if k > 255 else k
-            self.VP8kClip[i - self.YUV_RANGE_MIN] = k
+    # the rounded bt601 limited constants yuvist always used, kept so its
+    # default output stays bit exact, float, 8 bit and YUV_FIX gains of
+    # (y, v->r, u->g, v->g, u->b)
+    LEGACY_COEFFS  = (1.164, 1.596, 0.391, 0.813, 2.018)
+    LEGACY_ICOEFFS = (298, 409, 100, 208, 516)
+    LEGACY_FIXED   = (76283, 89858, 22014, 45773, 113618)
 
-        type   = kwargs.get('type', 'float')
-        format = kwargs.get('format', YUV_CHROMA_FORMAT[1])
-        ysize  = kwargs.get('size', [0, 0])
+    def __init__(self, **kwargs):
 
+        type     = kwargs.get('type', 'float')
+        format   = kwargs.get('format', YUV_CHROMA_FORMAT[1])
+        ysize    = kwargs.get('size', [0, 0])
+        bitdepth = kwargs.get('bitdepth', 8)
+        matrix   = kwargs.get('matrix', YUV_COLOR_MATRIX[0])
+        range    = kwargs.get('range', YUV_COLOR_RANGE[0])
+        filter   = kwargs.get('filter', YUV_CHROMA_FILTER[0])
+        siting   = kwargs.get('siting', YUV_CHROMA_SITING[0])
+
+        if type not in YUV_CONVERT_TYPE:
+            raise Exception("Not support conversion type")
         if format not in YUV_CHROMA_SUBPIXEL:
             raise Exception("Not support chroma format")
+        if matrix not in YUV_COLOR_KRKB:
+            raise Exception("Not support color matrix")
+        if range not in YUV_COLOR_RANGE:
+            raise Exception("Not support color range")
+        if filter not in YUV_CHROMA_FILTER:
+            raise Exception("Not support chroma filter")
+        if siting not in YUV_CHROMA_SITING:
+            raise Exception("Not support chroma siting")
 
         subpixel = YUV_CHROMA_SUBPIXEL[format]
         csize = ysize[0] // subpixel[0], ysize[1] // subpixel[1]
@@ -62,49 +85,281 @@ class ConvertYuv(object):
 
         convert = None
         if type == 'int':
-            convert = self.rgb_int
-        elif type == 'table':
-            convert = self.rgb_table
+            convert = self.rgb_int, self.rgb_int_array
+        elif type in ('table', 'lut'):
+            # lut converts arrays in convert_lut, pixels as table does
+            convert = self.rgb_table, self.rgb_table_array
         else: # type == 'float':
-            convert = self.rgb_float
+            convert = self.rgb_float, self.rgb_float_array
 
-        self._convert  = convert
+        self._convert  = convert[0]
+        self._convert_array = convert[1]
+        self._type     = type
         self._format   = format
+        self._bitdepth = bitdepth
         self._ysize    = ysize
         self._csize    = csize
         self._subpixel = subpixel
+        self._matrix   = matrix
+        self._range    = range
+        self._filter   = filter
+        self._siting   = siting
+        self._taps     = None
+        self._taps_array = None
+        self._shared   = self.tables(matrix, range)
+        self._offset   = self._shared['offset']
+        self._coeffs   = self._shared['coeffs']
+        self._icoeffs  = self._shared['icoeffs']
+        self._vp8k     = self._shared['vp8k']
+        self._arrays   = None
+
+        if filter != YUV_CHROMA_FILTER[0] and format != YUV_CHROMA_FORMAT[0]:
+            site = self.chroma_site(subpixel, siting)
+            self._taps = [self.chroma_taps(ysize[i], csize[i], subpixel[i], site[i])
+                          for i in (0, 1)]
+
+    @property
+    def matrix(self):
+        return self._matrix
+
+    @property
+    def range(self):
+        return self._range
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def filter(self):
+        return self._filter
+
+    @property
+    def siting(self):
+        return self._siting
+
+    @staticmethod
+    def chroma_site(subpixel, siting):
+        # luma position of the first chroma sample along x and y
+        sx, sy = subpixel
+        if siting == YUV_CHROMA_SITING[0]:
+            return 0., (sy - 1) / 2.
+        return (sx - 1) / 2., (sy - 1) / 2.
+
+    @staticmethod
+    def chroma_taps(length, clength, step, site):
+        # the chroma samples on both sides of every luma sample and the
+        # weight of the second one, samples past the edges repeat the last
+        taps = []
+        for i in xrange(length):
+            c = (i - site) / float(step)
+            j = int(floor(c))
+            taps.append((min(max(j, 0), clength - 1),
+                         min(max(j + 1, 0), clength - 1), c - j))
+        return taps
+
+    @classmethod
+    def tables(cls, matrix, range):
+        # coefficients and vp8k tables, built once per matrix and range
+        key = matrix, range
+        with _tables_lock:
+            shared = _tables.get(key)
+            if shared is None:
+                offset, coeffs = cls.coefficients(matrix, range)
+                if cls.is_legacy(matrix, range):
+                    icoeffs, fixed = cls.LEGACY_ICOEFFS, cls.LEGACY_FIXED
+                else:
+                    icoeffs = tuple(int(round(c * 256)) for c in coeffs)
+                    # chroma gains are kept before the luma gain in vp8k
+                    fixed = (int(round(coeffs[0] * (1 << cls.YUV_FIX))), ) + \
+                            tuple(int(round(c / coeffs[0] * (1 << cls.YUV_FIX)))
+                                  for c in coeffs[1:])
+                shared = dict(offset=offset, coeffs=coeffs, icoeffs=icoeffs,
+                              vp8k=cls.vp8k_tables(offset, fixed))
+                _tables[key] = shared
+        return shared
+
+    def shared_array(self, name):
+        # numpy forms of the tables, built by the first converter needing them
+        with _tables_lock:
+            value = self._shared.get(name)
+            if value is None:
+                if name == 'table':
+                    value = [numpy.array(table, dtype=numpy.int32)
+                             for table in self._vp8k[:5]]
+                else: # name == 'pairs':
+                    value = self.pair_tables(self._vp8k)
+                for table in value:
+                    table.flags.writeable = False
+                self._shared[name] = value
+        return value
+
+    @classmethod
+    def pair_tables(cls, vp8k):
+        # r, g, b offsets of every (u << 8 | v) pair with the clip table base
+        # folded in, packed with a spare word into one 64 bit entry so a
+        # chroma sample is a single gather and its upsampling a single repeat
+        VToR, VToG, UToG, UToB, Clip, range_min = vp8k
+        VToR, VToG, UToG, UToB = [numpy.array(table, dtype=numpy.int32)
+                                  for table in (VToR, VToG, UToG, UToB)]
+        u = numpy.arange(1 << 16) >> 8
+        v = numpy.arange(1 << 16) & 0xff
+
+        pairs = numpy.zeros((1 << 16, 4), dtype=numpy.uint16)
+        pairs[:, 0] = VToR[v] - range_min
+        pairs[:, 1] = ((VToG[v] + UToG[u]) >> cls.YUV_FIX) - range_min
+        pairs[:, 2] = UToB[u] - range_min
+        return pairs.view(numpy.uint64).reshape(1 << 16), \
+               numpy.array(Clip, dtype=numpy.uint8)
+
+    @staticmethod
+    def is_legacy(matrix, range):
+        return matrix == YUV_COLOR_MATRIX[0] and range == YUV_COLOR_RANGE[0]
+
+    @classmethod
+    def coefficients(cls, matrix, range):
+        # luma offset and (y, v->r, u->g, v->g, u->b) gains on 8 bit samples
+        if cls.is_legacy(matrix, range):
+            return 16, cls.LEGACY_COEFFS
+
+        kr, kb = YUV_COLOR_KRKB[matrix]
+        kg = 1. - kr - kb
+
+        if range == YUV_COLOR_RANGE[1]:
+            offset, ky, kc = 0, 1., 1.
+        else:
+            offset, ky, kc = 16, 255. / 219, 255. / 224
+
+        return offset, (ky,
+                        2 * (1 - kr) * kc,
+                        2 * kb * (1 - kb) / kg * kc,
+                        2 * kr * (1 - kr) / kg * kc,
+                        2 * (1 - kb) * kc)
+
+    @classmethod
+    def vp8k_tables(cls, offset, fixed):
+        # chroma offsets are kept before the luma gain, the clip table applies it
+        fix, half = cls.YUV_FIX, cls.YUV_HALF
+        ky, rv, gu, gv, bu = fixed
+
+        VToR = [(rv * (i - 128) + half) >> fix for i in xrange(256)]
+        UToG = [-gu * (i - 128) + half for i in xrange(256)]
+        VToG = [-gv * (i - 128) for i in xrange(256)]
+        UToB = [(bu * (i - 128) + half) >> fix for i in xrange(256)]
+
+        # min/max value of y plus any r/g/b offset
+        bound = max(-VToR[0], -UToB[0], (VToG[0] + UToG[0]) >> fix) + 1
+        range_min, range_max = -bound, 256 + bound
+
+        Clip = []
+        for i in xrange(range_min, range_max):
+            k = ((i - offset) * ky + half) >> fix
+            Clip.append(0 if k < 0 else 255 if k > 255 else k)
+
+        return VToR, VToG, UToG, UToB, Clip, range_min
 
     def clip(self, value):
         return min(max(0, value), 255)
 
     def rgb_float(self, y, u, v):
 
-        r = 1.164 * (y-16)                   + 1.596 * (v-128)
-        g = 1.164 * (y-16) - 0.391 * (u-128) - 0.813 * (v-128)
-        b = 1.164 * (y-16) + 2.018 * (u-128)
+        ky, rv, gu, gv, bu = self._coeffs
+        y = ky * (y - self._offset)
+
+        r = y               + rv * (v-128)
+        g = y - gu * (u-128) - gv * (v-128)
+        b = y + bu * (u-128)
 
         return self.clip(int(r)), self.clip(int(g)), self.clip(int(b))
 
     def rgb_int(self, y, u, v):
 
-        r = 298 * (y-16)                 + 409 * (v-128)
-        g = 298 * (y-16) - 100 * (u-128) - 208 * (v-128)
-        b = 298 * (y-16) + 516 * (u-128)
+        ky, rv, gu, gv, bu = self._icoeffs
+        y = ky * (y - self._offset)
+
+        r = y               + rv * (v-128)
+        g = y - gu * (u-128) - gv * (v-128)
+        b = y + bu * (u-128)
 
         return self.clip((r+128)>>8), self.clip((g+128)>>8), self.clip((b+128)>>8)
 
     def rgb_table(self, y, u, v):
 
-        r_off = self.VP8kVToR[v]
-        g_off = (self.VP8kVToG[v] + self.VP8kUToG[u]) >> self.YUV_FIX
-        b_off = self.VP8kUToB[u]
+        VToR, VToG, UToG, UToB, Clip, range_min = self._vp8k
+
+        r_off = VToR[v]
+        g_off = (VToG[v] + UToG[u]) >> self.YUV_FIX
+        b_off = UToB[u]
+
+        r = Clip[y + r_off - range_min]
+        g = Clip[y + g_off - range_min]
+        b = Clip[y + b_off - range_min]
+
+        return r, g, b
+
+    def rgb_float_array(self, y, u, v):
+
+        ky, rv, gu, gv, bu = self._coeffs
+        y = ky * (y - self._offset)
+
+        r = y               + rv * (v-128)
+        g = y - gu * (u-128) - gv * (v-128)
+        b = y + bu * (u-128)
+
+        # astype truncates toward zero like int() does in rgb_float
+        r = r.astype(numpy.int32)
+        g = g.astype(numpy.int32)
+        b = b.astype(numpy.int32)
+
+        return numpy.clip(r, 0, 255), numpy.clip(g, 0, 255), numpy.clip(b, 0, 255)
 
-        r = self.VP8kClip[y + r_off - self.YUV_RANGE_MIN]
-        g = self.VP8kClip[y + g_off - self.YUV_RANGE_MIN]
-        b = self.VP8kClip[y + b_off - self.YUV_RANGE_MIN]
+    def rgb_int_array(self, y, u, v):
+
+        ky, rv, gu, gv, bu = self._icoeffs
+        y = ky * (y - self._offset)
+
+        r = y               + rv * (v-128)
+        g = y - gu * (u-128) - gv * (v-128)
+        b = y + bu * (u-128)
+
+        return numpy.clip((r+128)>>8, 0, 255), \
+               numpy.clip((g+128)>>8, 0, 255), \
+               numpy.clip((b+128)>>8, 0, 255)
+
+    def rgb_table_array(self, y, u, v):
+
+        if self._arrays is None:
+            self._arrays = self.shared_array('table')
+        VToR, VToG, UToG, UToB, Clip = self._arrays
+        range_min = self._vp8k[5]
+
+        r_off = VToR[v]
+        g_off = (VToG[v] + UToG[u]) >> self.YUV_FIX
+        b_off = UToB[u]
+
+        r = Clip[y + r_off - range_min]
+        g = Clip[y + g_off - range_min]
+        b = Clip[y + b_off - range_min]
 
         return r, g, b
 
+    def samples(self, buf):
+
+        if self._bitdepth <= 8:
+            return bytearray(buf)
+
+        samples = array('H')
+        samples.fromstring(str(buf))
+        if sys.byteorder != 'little':
+            samples.byteswap()
+
+        # bring samples to the 8 bit scale the rgb_* functions expect
+        shift = self._bitdepth - 8
+        if self._type == 'float':
+            return [s / float(1 << shift) for s in samples]
+        half = 1 << (shift - 1)
+        return [min((s + half) >> shift, 255) for s in samples]
+
     def raster(self, buf):
 
         format   = self._format
@@ -115,6 +370,15 @@ class ConvertYuv(object):
         ybuf, ubuf, vbuf = buf
         y, u, v = 128, 128, 128
 
+        ybuf = self.samples(ybuf)
+        if format != YUV_CHROMA_FORMAT[0]:
+            ubuf = self.samples(ubuf)
+            vbuf = self.samples(vbuf)
+        if self._taps is not None:
+            ubuf = self.resample(ubuf)
+            vbuf = self.resample(vbuf)
+            csize, subpixel = ysize, (1, 1)
+
         for posy in xrange(ysize[1]):
             for posx in xrange(ysize[0]):
                 y = ybuf[ysize[0] * posy + posx]
@@ -122,9 +386,176 @@ class ConvertYuv(object):
                     p = csize[0] * (posy // subpixel[1]) + (posx // subpixel[0])
                     u = ubuf[p]
                     v = vbuf[p]
-                yield ord(y), ord(u), ord(v)
+                yield y, u, v
 
-    def convert(self, buf):
+    def resample(self, samples):
+        # bilinear chroma at the luma size, columns first then rows, as
+        # interpolate() does on arrays
+        cwidth = self._csize[0]
+        taps_x, taps_y = self._taps
+
+        # integer samples blend with fixed-point weights, rounded once
+        if self._type == 'float':
+            scale, half = 1, None
+        else:
+            fix   = self.CHROMA_FIX
+            scale = 1 << fix
+            half  = 1 << (fix * 2 - 1)
+            taps_x = [(a, b, int(round(f * scale))) for a, b, f in taps_x]
+            taps_y = [(a, b, int(round(f * scale))) for a, b, f in taps_y]
+
+        rows = []
+        for row in xrange(self._csize[1]):
+            line = samples[row * cwidth:(row + 1) * cwidth]
+            rows.append([line[a] * scale + (line[b] - line[a]) * f
+                         for a, b, f in taps_x])
+
+        plane = []
+        for a, b, f in taps_y:
+            plane.extend(s * scale + (t - s) * f for s, t in zip(rows[a], rows[b]))
+
+        if half is None:
+            return plane
+        return [(s + half) >> (self.CHROMA_FIX * 2) for s in plane]
+
+    def normalize(self, plane):
+
+        if self._bitdepth <= 8:
+            return plane.astype(numpy.int32)
+
+        shift = self._bitdepth - 8
+        if self._type == 'float':
+            return plane / float(1 << shift)
+        half = 1 << (shift - 1)
+        return numpy.minimum((plane.astype(numpy.int32) + half) >> shift, 255)
+
+    def plane(self, buf, size):
+
+        dtype = '<u2' if self._bitdepth > 8 else 'u1'
+        plane = numpy.frombuffer(buf, dtype=dtype, count=size[0] * size[1])
+        return plane.reshape(size[1], size[0])
+
+    def expand(self, plane):
+
+        ysize    = self._ysize
+        subpixel = self._subpixel
+
+        if subpixel[1] > 1:
+            plane = plane.repeat(subpixel[1], axis=0)
+        if subpixel[0] > 1:
+            plane = plane.repeat(subpixel[0], axis=1)
+
+        # odd image sizes leave the last row/column without chroma sample
+        pad = ysize[1] - plane.shape[0], ysize[0] - plane.shape[1]
+        if pad[0] > 0 or pad[1] > 0:
+            pad = ((0, pad[0]), (0, pad[1])) + ((0, 0), ) * (plane.ndim - 2)
+            plane = numpy.pad(plane, pad, 'edge')
+
+        return plane
+
+    def upsample(self, buf):
+
+        return self.expand(self.plane(buf, self._csize))
+
+    def interpolate(self, plane):
+
+        fix = self.CHROMA_FIX
+        if self._taps_array is None:
+            taps = []
+            for a, b, f in [zip(*axis) for axis in self._taps]:
+                f = numpy.array(f)
+                if self._type != 'float':
+                    f = numpy.round(f * (1 << fix)).astype(numpy.int32)
+                taps.append((numpy.array(a), numpy.array(b), f))
+            self._taps_array = taps
+        (x0, x1, fx), (y0, y1, fy) = self._taps_array
+
+        # separable, every pass blends the two chroma samples around a luma
+        # one, integer samples with fixed-point weights rounded once
+        if self._type == 'float':
+            plane = plane.astype(numpy.float64)
+            a = plane.take(x0, axis=1)
+            plane = a + (plane.take(x1, axis=1) - a) * fx
+            a = plane.take(y0, axis=0)
+            return a + (plane.take(y1, axis=0) - a) * fy[:, numpy.newaxis]
+
+        plane = plane.astype(numpy.int32)
+        a = plane.take(x0, axis=1)
+        plane = (a << fix) + (plane.take(x1, axis=1) - a) * fx
+        a = plane.take(y0, axis=0)
+        plane = (a << fix) + (plane.take(y1, axis=0) - a) * fy[:, numpy.newaxis]
+        return (plane + (1 << (fix * 2 - 1))) >> (fix * 2)
+
+    def chroma(self, buf):
+
+        # nearest repeats samples before bringing them to 8 bits as before
+        if self._taps is None:
+            return self.normalize(self.upsample(buf))
+        return self.interpolate(self.normalize(self.plane(buf, self._csize)))
+
+    def convert_lut(self, buf):
+
+        format = self._format
+        ysize  = self._ysize
+        csize  = self._csize
+
+        if self._arrays is None:
+            self._arrays = self.shared_array('pairs')
+        pairs, clip = self._arrays
+
+        ybuf, ubuf, vbuf = buf
+
+        # offsets are gathered at chroma resolution and only then upsampled,
+        # filtered chroma has a pair of its own at every luma sample
+        if format != YUV_CHROMA_FORMAT[0] and self._taps is not None:
+            offsets = pairs[(self.chroma(ubuf) << 8) | self.chroma(vbuf)]
+        elif format != YUV_CHROMA_FORMAT[0]:
+            u = self.normalize(self.plane(ubuf, csize))
+            v = self.normalize(self.plane(vbuf, csize))
+            offsets = self.expand(pairs[(u << 8) | v])
+        else:
+            offsets = numpy.empty((ysize[1], ysize[0]), dtype=numpy.uint64)
+            offsets.fill(pairs[128 << 8 | 128])
+        offsets = offsets.view(numpy.uint16).reshape(ysize[1], ysize[0], 4)
+
+        # 8 bit luma indexes the clip table as it is
+        y = self.plane(ybuf, ysize)
+        if self._bitdepth > 8:
+            y = self.normalize(y).astype(numpy.uint16)
+
+        rgb = clip[offsets[..., :3] + y[..., numpy.newaxis]]
+        return rgb.tostring(), '', ''
+
+    def convert_array(self, buf):
+
+        format = self._format
+        ysize  = self._ysize
+
+        if self._type == 'lut':
+            return self.convert_lut(buf)
+
+        ybuf, ubuf, vbuf = buf
+
+        y = self.normalize(self.plane(ybuf, ysize))
+        if format != YUV_CHROMA_FORMAT[0]:
+            u = self.chroma(ubuf)
+            v = self.chroma(vbuf)
+        else:
+            u = numpy.empty_like(y)
+            v = numpy.empty_like(y)
+            u.fill(128)
+            v.fill(128)
+
+        r, g, b = self._convert_array(y, u, v)
+
+        rgb = numpy.empty((ysize[1], ysize[0], 3), dtype=numpy.uint8)
+        rgb[..., 0] = r
+        rgb[..., 1] = g
+        rgb[..., 2] = b
+
+        return rgb.tostring(), '', ''
+
+    def convert_raster(self, buf):
 
         rgb = []
 
@@ -136,3 +567,58 @@ class ConvertYuv(object):
 
         rgb = ''.join(map(chr, rgb))
         return rgb, '', ''
+
+    def convert(self, buf):
+
+        if numpy is not None:
+            return self.convert_array(buf)
+        return self.convert_raster(buf)
+
+
+if __name__ == '__main__':
+
+    from os import urandom
+    from timeit import default_timer
+
+    if numpy is None:
+        print 'numpy is not installed'
+        sys.exit(1)
+
+    format   = sys.argv[1] if len(sys.argv) > 1 else YUV_CHROMA_FORMAT[1]
+    ysize    = map(int, sys.argv[2:4]) if len(sys.argv) > 3 else [176, 144]
+    bitdepth = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+    matrix   = sys.argv[5] if len(sys.argv) > 5 else YUV_COLOR_MATRIX[0]
+    range    = sys.argv[6] if len(sys.argv) > 6 else YUV_COLOR_RANGE[0]
+
+    subpixel = YUV_CHROMA_SUBPIXEL[format]
+    csize = ysize[0] // subpixel[0], ysize[1] // subpixel[1]
+    if format in YUV_CHROMA_FORMAT[0]:
+        csize = (0, 0)
+
+    def random_plane(size):
+        if bitdepth <= 8:
+            return urandom(size[0] * size[1])
+        plane = numpy.frombuffer(urandom(size[0] * size[1] * 2), dtype='<u2')
+        return (plane >> (16 - bitdepth)).astype('<u2').tostring()
+
+    buf = random_plane(ysize), random_plane(csize), random_plane(csize)
+
+    print 'ConvertYuv %s %dx%d %dbit %s %s (ms per frame)' % (
+        format, ysize[0], ysize[1], bitdepth, matrix, range)
+    for type in YUV_CONVERT_TYPE:
+        start = default_timer()
+        convert = ConvertYuv(format=format, size=ysize, type=type,
+                             bitdepth=bitdepth, matrix=matrix, range=range)
+        create_ms = (default_timer() - start) * 1000.
+
+        start = default_timer()
+        raster_rgb = convert.convert_raster(buf)
+        raster_ms = (default_timer() - start) * 1000.
+
+        start = default_timer()
+        array_rgb = convert.convert_array(buf)
+        array_ms = (default_timer() - start) * 1000.
+
+        print '%-5s create %6.3f  raster %10.2f  array %8.2f  %s' % (
+            type, create_ms, raster_ms, array_ms,
+            'identical' if raster_rgb == array_rgb else 'MISMATCH')
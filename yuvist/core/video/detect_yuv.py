@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('DetectYuv', )
+
+import re
+import sys
+from array import array
+from os.path import basename, getsize, splitext
+
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_CHROMA_LAYOUT, YUV_BITDEPTH, YUV_SIZE_LIST
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+class DetectYuv(object):
+
+    SIZE_PATTERN   = re.compile(r'(\d{2,5})x(\d{2,5})')
+    CHROMA_PATTERN = re.compile(r'^(?:yuv|i)?(400|420|422|444)(?:p(\d{1,2})?)?(?:le)?$')
+    DEPTH_PATTERN  = re.compile(r'^(\d{1,2})b(?:it)?$')
+
+    SIZE_NAMES = dict((name.lower().replace(' ', ''), size)
+                      for size, name in YUV_SIZE_LIST)
+    SIZE_NAMES.update({
+        '720p' : (1280,  720),
+        '1080p': (1920, 1080),
+        '1080i': (1920, 1080),
+        '2160p': (3840, 2160),
+        'uhd'  : (3840, 2160),
+        '4k'   : (3840, 2160)
+    })
+
+    # filenames follow ffmpeg naming, its 4:2:2 halves the width
+    CHROMA_NAMES = {
+        '400' : 'yuv400',
+        'gray': 'yuv400',
+        '420' : 'yuv420',
+        '422' : 'yuv422v',
+        '444' : 'yuv444',
+        'nv12': 'nv12',
+        'nv21': 'nv21',
+        'yuyv': 'yuyv',
+        'yuy2': 'yuyv',
+        'uyvy': 'uyvy'
+    }
+
+    SAMPLE_ROWS    = 8       # rows compared per frame
+    SAMPLE_COLUMNS = 256     # samples compared per row
+    SAMPLE_BYTES   = 4096    # bytes per chunk sniffed for the bit depth
+
+    def __init__(self, **kwargs):
+
+        self._filename = kwargs.get('filename', None)
+        self._format   = kwargs.get('format', None)
+        self._size     = kwargs.get('size', None)
+        self._bitdepth = kwargs.get('bitdepth', None)
+
+        try:
+            self._filesize = getsize(self._filename)
+        except OSError:
+            raise Exception("Can't open file %s" % self._filename)
+
+    def parse_name(self):
+        # format, size and bitdepth the filename tells, None where it is silent
+        name = splitext(basename(self._filename))[0].lower()
+        format, size, bitdepth = None, None, None
+
+        match = self.SIZE_PATTERN.search(name)
+        if match:
+            size = [int(match.group(1)), int(match.group(2))]
+
+        for token in re.split(r'[^0-9a-z]+', name):
+            if size is None and token in self.SIZE_NAMES:
+                size = list(self.SIZE_NAMES[token])
+            if format is None and token in self.CHROMA_NAMES:
+                format = self.CHROMA_NAMES[token]
+            match = self.CHROMA_PATTERN.match(token)
+            if match:
+                format = format or self.CHROMA_NAMES[match.group(1)]
+                if match.group(2):
+                    bitdepth = bitdepth or int(match.group(2))
+            match = self.DEPTH_PATTERN.match(token)
+            if match:
+                bitdepth = bitdepth or int(match.group(1))
+
+        if bitdepth not in YUV_BITDEPTH:
+            bitdepth = None
+        return format, size, bitdepth
+
+    def sniff_bitdepth(self):
+        # 10/12 bit little-endian samples leave the high bytes nearly empty
+        filesize = self._filesize
+        lo, hi = 0, 0
+        with open(self._filename, 'rb') as fp:
+            for offset in (0, filesize // 2, filesize - self.SAMPLE_BYTES):
+                fp.seek(max(offset, 0) & ~1)
+                data = bytearray(fp.read(self.SAMPLE_BYTES))
+                if data:
+                    lo = max(lo, max(data[0::2]))
+                if data[1::2]:
+                    hi = max(hi, max(data[1::2]))
+        if lo >= 64 and hi < 4:
+            return YUV_BITDEPTH[1]
+        if lo >= 64 and hi < 16:
+            return YUV_BITDEPTH[2]
+        return YUV_BITDEPTH[0]
+
+    def candidates(self, format, size, bitdepth):
+        formats = [format] if format else \
+                  [YUV_CHROMA_FORMAT[1]] + [f for f in YUV_CHROMA_FORMAT
+                                           if f != YUV_CHROMA_FORMAT[1]]
+        sizes = [size] if size else [s for s, name in YUV_SIZE_LIST]
+
+        for format in formats:
+            for size in sizes:
+                yield format, list(size), bitdepth
+
+    @staticmethod
+    def frame_bytes(format, size, bitdepth):
+        # as ReaderYuv counts them, without opening the file per candidate
+        width, height = size
+        sample = 2 if bitdepth > 8 else 1
+        if YUV_CHROMA_LAYOUT[format] == 'packed':
+            return 0 if width % 2 else width * height * 2 * sample
+        if format in YUV_CHROMA_FORMAT[0]:
+            return width * height * sample
+        sx, sy = YUV_CHROMA_SUBPIXEL[format]
+        return (width * height + 2 * (width // sx) * (height // sy)) * sample
+
+    def fits(self, format, size, bitdepth):
+        nbytes = self.frame_bytes(format, size, bitdepth)
+        return 0 < nbytes <= self._filesize and self._filesize % nbytes == 0
+
+    def _row(self, reader, plane, row, samples):
+        height = reader.frame_size[0][1]
+        stride = len(plane) // height
+        data = array('H' if reader.bitdepth > 8 else 'B',
+                     str(plane[row * stride:(row + 1) * stride]))
+        if reader.bitdepth > 8 and sys.byteorder != 'little':
+            data.byteswap()
+        # the first sample of every texel, packed formats interleave chroma
+        return data[::samples]
+
+    def _distance(self, a, b, shift=0):
+        # mean difference of a few samples to the ones shift texels on in b
+        count = len(a) - shift
+        if count <= 0:
+            return 0.
+        step = max(1, count // self.SAMPLE_COLUMNS)
+        columns = xrange(0, count, step)
+        return sum(abs(a[i] - b[i + shift]) for i in columns) / float(len(columns))
+
+    def score(self, format, size, bitdepth):
+        # with the right geometry the next texel, the next row and the next
+        # frame are much closer than texels half a row apart, wrong layouts
+        # mix luma into chroma, wrong widths break the rows apart and wrong
+        # frame sizes shift the frames, lower is better
+        reader = ReaderYuv(filename=self._filename, format=format, size=size,
+                           bitdepth=bitdepth, mmap=True)
+        try:
+            height  = reader.frame_size[0][1]
+            samples = reader.frame_samples[0]
+            if height < 2:
+                return None
+
+            rows = sorted(set(min(height * (2 * k + 1) // (2 * self.SAMPLE_ROWS),
+                                  height - 2) for k in xrange(self.SAMPLE_ROWS)))
+            frames = sorted(set((0, reader.frames // 2)))
+
+            across, beside, down, motion = 0., 0., 0., None
+            for nframe in frames:
+                plane = reader.read(nframe)[0]
+                after = reader.read(nframe + 1)[0] if nframe + 1 < reader.frames else None
+                for row in rows:
+                    a = self._row(reader, plane, row, samples)
+                    # flat rows such as letterbox bars tell nothing
+                    spread = self._distance(a, a, len(a) // 2)
+                    if spread == 0:
+                        continue
+                    across += spread
+                    beside += self._distance(a, a, 1)
+                    down   += self._distance(a, self._row(reader, plane, row + 1, samples))
+                    if after is not None:
+                        motion = (motion or 0.) + \
+                                 self._distance(a, self._row(reader, after, row, samples))
+        finally:
+            reader.close()
+
+        if across == 0:
+            return None
+        if motion is None:
+            return (beside + down) / (2 * across)
+        return (beside + down + motion) / (3 * across)
+
+    def detect(self):
+        # filename first, then score whatever geometry fits the file size
+        format, size, bitdepth = self.parse_name()
+        format   = self._format or format
+        size     = self._size or size
+        bitdepth = self._bitdepth or bitdepth
+        if format and size and bitdepth and self.fits(format, size, bitdepth):
+            return format, list(size), bitdepth
+
+        bitdepth = bitdepth or self.sniff_bitdepth()
+        candidates = [c for c in self.candidates(format, size, bitdepth)
+                      if self.fits(*c)]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+
+        scores = [(self.score(*c), c) for c in candidates]
+        scores = [(score, c) for score, c in scores if score is not None]
+        if not scores:
+            return candidates[0]
+
+        # two stacked frames look like one taller frame, so out of the
+        # candidates close to the best take the one with the smallest frame
+        best = min(score for score, c in scores)
+        close = [c for score, c in scores if score <= best * 1.05 + .01]
+        return min(close, key=lambda c: self.frame_bytes(*c))
+
+
+if __name__ == '__main__':
+
+    from timeit import default_timer
+
+    if len(sys.argv) < 2:
+        print 'usage: %s file [file ...]' % sys.argv[0]
+        sys.exit(1)
+
+    for filename in sys.argv[1:]:
+        start = default_timer()
+        result = DetectYuv(filename=filename).detect()
+        elapsed = (default_timer() - start) * 1000.
+        if result is None:
+            print '%s: unknown (%.1f ms)' % (filename, elapsed)
+        else:
+            format, size, bitdepth = result
+            print '%s: %s %dx%d %dbit (%.1f ms)' % (
+                filename, format, size[0], size[1], bitdepth, elapsed)
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('HashYuv', )
+
+import sys
+import json
+from array import array
+from os import stat
+from os.path import abspath
+from zlib import crc32
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yuvist.core.video import YUV_CHROMA_FORMAT
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+class HashYuv(object):
+
+    GRID         = 16       # signature cells along each side of the luma plane
+    SAMPLES      = 8        # rows and columns sampled per cell without numpy
+    THRESHOLD    = 1.       # mean signature distance of a near duplicate
+    SIDECAR_EXT  = '.dups'
+    VERSION      = 1
+
+    def __init__(self, **kwargs):
+
+        self._filename  = kwargs.get('filename', None)
+        self._format    = kwargs.get('format', YUV_CHROMA_FORMAT[1])
+        self._ysize     = list(kwargs.get('size', [0, 0]))
+        self._bitdepth  = kwargs.get('bitdepth', 8)
+        self._grid      = kwargs.get('grid', self.GRID)
+        self._threshold = kwargs.get('threshold', self.THRESHOLD)
+        self._sidecar   = kwargs.get('sidecar', self._filename + self.SIDECAR_EXT)
+
+        width, height = self._ysize
+        if self._grid < 1 or self._grid > min(width, height):
+            raise Exception("Not support signature grid %d" % self._grid)
+
+        reader = ReaderYuv(filename=self._filename, format=self._format,
+                           size=self._ysize, bitdepth=self._bitdepth)
+        self._frames = reader.frames
+        reader.close()
+
+        # cell boundaries, the last cells take the remainder
+        self._rows = [y * height // self._grid for y in xrange(self._grid)]
+        self._cols = [x * width // self._grid for x in xrange(self._grid)]
+
+        self._seen = {}
+        self._last = None
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def sidecar(self):
+        return self._sidecar
+
+    @property
+    def frames(self):
+        return self._frames
+
+    @property
+    def grid(self):
+        return self._grid
+
+    @property
+    def threshold(self):
+        return self._threshold
+
+    def key(self):
+        # the index is only valid for the same file and the same geometry
+        info = stat(self._filename)
+        return dict(version=self.VERSION, path=abspath(self._filename),
+                    mtime=int(info.st_mtime), filesize=info.st_size,
+                    format=self._format, size=self._ysize,
+                    bitdepth=self._bitdepth, grid=self._grid,
+                    threshold=self._threshold)
+
+    def compute(self, planes):
+        # a crc of every plane and the luma cell means scaled to 8 bits
+        hashes = ['%08x' % (crc32(plane) & 0xffffffff) if plane else ''
+                  for plane in planes]
+        if numpy is not None:
+            signature = self._signature_numpy(planes[0])
+        else:
+            signature = self._signature_array(planes[0])
+        return hashes, signature
+
+    def _signature_numpy(self, plane):
+        width, height = self._ysize
+        dtype = '<u2' if self._bitdepth > 8 else 'u1'
+        data  = numpy.frombuffer(plane, dtype=dtype, count=width * height)
+        data  = data.reshape(height, width).astype(numpy.uint32)
+        sums  = numpy.add.reduceat(numpy.add.reduceat(data, self._rows, axis=0),
+                                   self._cols, axis=1)
+        rows  = numpy.diff(self._rows + [height])
+        cols  = numpy.diff(self._cols + [width])
+        means = sums / numpy.outer(rows, cols).astype(numpy.float64)
+        means = means / (1 << (self._bitdepth - 8))
+        return numpy.clip(numpy.rint(means), 0, 255).astype('u1').tostring()
+
+    def _signature_array(self, plane):
+        # a few rows and columns of every cell stand for the whole cell
+        width, height = self._ysize
+        samples = array('H' if self._bitdepth > 8 else 'B', str(plane))
+        if self._bitdepth > 8 and sys.byteorder != 'little':
+            samples.byteswap()
+        shift = float(1 << (self._bitdepth - 8))
+        rows  = self._rows + [height]
+        cols  = self._cols + [width]
+
+        signature = array('B')
+        for gy in xrange(self._grid):
+            top, bottom = rows[gy], rows[gy + 1]
+            step_y = max(1, (bottom - top) // self.SAMPLES)
+            lines  = [samples[row * width:(row + 1) * width]
+                      for row in xrange(top, bottom, step_y)]
+            for gx in xrange(self._grid):
+                left, right = cols[gx], cols[gx + 1]
+                step_x = max(1, (right - left) // self.SAMPLES)
+                total, count = 0, 0
+                for line in lines:
+                    part = line[left:right:step_x]
+                    total += sum(part)
+                    count += len(part)
+                signature.append(min(255, int(total / shift / count + .5)))
+        return signature.tostring()
+
+    @staticmethod
+    def distance(a, b):
+        # mean absolute difference of two signatures in 8 bit levels
+        a, b = array('B', a), array('B', b)
+        return sum(abs(x - y) for x, y in zip(a, b)) / float(max(len(a), 1))
+
+    def flag(self, nframe, hashes, signature):
+        # frames must come in order, an exact duplicate may repeat any
+        # earlier frame, a near duplicate is close to the one before
+        key = tuple(hashes)
+        duplicate = self._seen.setdefault(key, nframe)
+        duplicate = duplicate if duplicate != nframe else None
+
+        near, distance = None, None
+        if self._last is not None:
+            distance = self.distance(self._last[1], signature)
+            if duplicate is None and distance <= self._threshold:
+                near = self._last[0]
+        self._last = nframe, signature
+
+        return dict(frame=nframe, hash=hashes, duplicate=duplicate, near=near,
+                    distance=round(distance, 3) if distance is not None else None)
+
+    def load(self):
+        # flagged records of the index, None if there is no valid index
+        try:
+            fp = open(self._sidecar, 'r')
+        except IOError:
+            return None
+        with fp:
+            try:
+                header = json.loads(fp.readline())
+            except ValueError:
+                return None
+            if not isinstance(header, dict):
+                return None
+            # any threshold and grid will do for showing what was flagged
+            key = self.key()
+            for name in ('grid', 'threshold'):
+                key.pop(name)
+                header.pop(name, None)
+            if header != key:
+                return None
+            records = []
+            for line in fp:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record.get('duplicate') is not None or \
+                   record.get('near') is not None:
+                    records.append(record)
+        return records
+
+    def markers(self, records):
+        # runs of flagged frames as (first, last, kind), duplicates win
+        markers = []
+        for record in records:
+            kind  = 'duplicate' if record.get('duplicate') is not None else 'near'
+            frame = record['frame']
+            if markers and markers[-1][1] == frame - 1 and markers[-1][2] == kind:
+                markers[-1] = markers[-1][0], frame, kind
+            else:
+                markers.append((frame, frame, kind))
+        return markers
+
+
+if __name__ == '__main__':
+
+    from timeit import default_timer
+
+    if len(sys.argv) < 4:
+        print 'usage: %s file width height [format] [bitdepth]' % sys.argv[0]
+        sys.exit(1)
+
+    format   = sys.argv[4] if len(sys.argv) > 4 else YUV_CHROMA_FORMAT[1]
+    bitdepth = int(sys.argv[5]) if len(sys.argv) > 5 else 8
+    size     = [int(sys.argv[2]), int(sys.argv[3])]
+
+    reader = ReaderYuv(filename=sys.argv[1], format=format, size=size,
+                       bitdepth=bitdepth)
+    hasher = HashYuv(filename=sys.argv[1], format=format, size=size,
+                     bitdepth=bitdepth)
+
+    start = default_timer()
+    flagged = 0
+    for nframe in xrange(reader.frames):
+        record = hasher.flag(nframe, *hasher.compute(reader.read_planar(nframe)))
+        if record['duplicate'] is not None or record['near'] is not None:
+            flagged += 1
+            print 'frame %d duplicate %s near %s distance %s' % (
+                nframe, record['duplicate'], record['near'], record['distance'])
+    elapsed = default_timer() - start
+
+    print '%d of %d frames flagged in %.2f s (%.2f fps)' % (
+        flagged, reader.frames, elapsed, reader.frames / max(elapsed, 1e-6))
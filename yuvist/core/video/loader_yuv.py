@@ -20,23 +20,40 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 __all__ = ('LoaderYuv', )
 
-from os import SEEK_SET
-from os.path import getsize
-from threading import Lock
+from collections import deque, OrderedDict
+from threading import Lock, Condition, Thread
 
 from kivy.clock import Clock
 from kivy.event import EventDispatcher
 
-from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, OUT_COLOR_FORMAT
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_CHROMA_LAYOUT, YUV_COLOR_MATRIX, YUV_COLOR_RANGE, YUV_CHROMA_FILTER, \
+        YUV_CHROMA_SITING, OUT_COLOR_FORMAT, PLAYBACK_POLICY
+from yuvist.core.video.cache_yuv import frame_cache
+from yuvist.core.video.clock_yuv import ClockYuv
 from yuvist.core.video.convert_yuv import ConvertYuv
+from yuvist.core.video.profile_yuv import profiler
+from yuvist.core.video.reader_yuv import ReaderYuv
+from yuvist.core.video.stats_yuv import StatsYuv
 
 
 class LoaderYuv(EventDispatcher):
 
+    STATS_KEEP = 16     # analyzed frames kept around the shown one
+
     def __init__(self, **kwargs):
         self._buffer_lock = Lock()
         self._buffer = None
-        self._file = None
+        self._reader = None
+        self._stats  = None
+        self._frame_stats = OrderedDict()
+
+        self._ring_cond = Condition(Lock())
+        self._ring = deque()
+        self._thread = None
+        self._prefetch = 0
+        self._serial   = 0
+        self._quit     = False
 
         super(LoaderYuv, self).__init__()
 
@@ -44,10 +61,23 @@ class LoaderYuv(EventDispatcher):
         self._colorfmt = kwargs.get('colorfmt', OUT_COLOR_FORMAT[1])
         self._size     = kwargs.get('size', [0, 0])
         self._fps      = kwargs.get('fps', 30.)
+        self._bitdepth = kwargs.get('bitdepth', 8)
+        self._matrix   = kwargs.get('matrix', YUV_COLOR_MATRIX[0])
+        self._range    = kwargs.get('range', YUV_COLOR_RANGE[0])
+        self._filter   = kwargs.get('filter', YUV_CHROMA_FILTER[0])
+        self._siting   = kwargs.get('siting', YUV_CHROMA_SITING[0])
+        self._depth    = kwargs.get('buffer_depth', 4)
+        self._region   = kwargs.get('region', None)
+        self._mmap     = kwargs.get('mmap', False)
+        self._cache    = kwargs.get('cache', frame_cache)
+        self._clock    = ClockYuv(fps=self._fps,
+                                  policy=kwargs.get('policy', PLAYBACK_POLICY[0]))
 
         self._filename = kwargs.get('filename', None)
         self._position = 0.
         self._duration = 0.
+        self._frames   = 0
+        self._nframe   = -1
         self._volume   = 1.
         self._eos      = False
         self._state    = ''
@@ -55,6 +85,8 @@ class LoaderYuv(EventDispatcher):
         if self._filename is not None:
             self._init_image()
 
+        self.stats = kwargs.get('stats', False)
+
     @property
     def width(self):
         return self._size[0]
@@ -67,6 +99,11 @@ class LoaderYuv(EventDispatcher):
     def size(self):
         return self._size[0], self._size[1]
 
+    @property
+    def region(self):
+        # aligned crop of the frame [x, y, width, height], None for all of it
+        return self._region
+
     @property
     def format(self):
         return self._format
@@ -75,6 +112,70 @@ class LoaderYuv(EventDispatcher):
     def colorfmt(self):
         return self._colorfmt
 
+    @property
+    def bitdepth(self):
+        return self._bitdepth
+
+    def _get_color(self):
+        return self._matrix, self._range
+
+    def _set_color(self, color):
+        if tuple(color) == (self._matrix, self._range):
+            return
+        self._matrix, self._range = color
+        if self._reader is None:
+            return
+
+        self._convert = self._create_convert()
+        if self._stats is not None and self._stats.range != self._range:
+            self._stats = self._create_stats()
+            self._reload_image()
+        elif self._colorfmt == OUT_COLOR_FORMAT[0]:
+            # read ahead frames were converted with the old colors
+            self._reload_image()
+
+    color = property(lambda self: self._get_color(),
+            lambda self, x: self._set_color(x),
+            doc='Get/set the color matrix and range of rgb conversion')
+
+    def _get_chroma(self):
+        return self._filter, self._siting
+
+    def _set_chroma(self, chroma):
+        if tuple(chroma) == (self._filter, self._siting):
+            return
+        self._filter, self._siting = chroma
+        if self._reader is None:
+            return
+
+        self._convert = self._create_convert()
+        if self._colorfmt == OUT_COLOR_FORMAT[0]:
+            # read ahead frames were upsampled with the old filter
+            self._reload_image()
+
+    chroma = property(lambda self: self._get_chroma(),
+            lambda self, x: self._set_chroma(x),
+            doc='Get/set the chroma filter and siting of rgb conversion')
+
+    def _get_stats(self):
+        return self._stats is not None
+
+    def _set_stats(self, stats):
+        if bool(stats) == (self._stats is not None):
+            return
+        self._stats = self._create_stats() if stats else None
+        if stats:
+            self._reload_image()
+
+    stats = property(lambda self: self._get_stats(),
+            lambda self, x: self._set_stats(x),
+            doc='Get/set whether every read frame is analyzed')
+
+    @property
+    def frame_stats(self):
+        with self._buffer_lock:
+            return self._frame_stats.get(self._nframe)
+
     def _get_fps(self):
         return self._fps
 
@@ -82,6 +183,7 @@ class LoaderYuv(EventDispatcher):
         if fps == self._fps:
             return
         self._fps = fps
+        self._clock.fps = fps
 
     fps = property(lambda self: self._get_fps(),
             lambda self, x: self._set_fps(x),
@@ -110,7 +212,9 @@ class LoaderYuv(EventDispatcher):
         else:
             self._position = position
             self._eos = False
-            self._read_image(int(position * self._fps))
+            self._show_image(int(position * self._fps))
+            if self._clock.running:
+                self._clock.start(self._nframe)
 
     position = property(lambda self: self._get_position(),
             lambda self, x: self._set_position(x),
@@ -140,6 +244,10 @@ class LoaderYuv(EventDispatcher):
     state = property(lambda self: self._get_state(),
             doc='Get the yuv playing status')
 
+    @property
+    def playback(self):
+        return self._clock
+
     @property
     def eos(self):
         return self._eos
@@ -152,31 +260,90 @@ class LoaderYuv(EventDispatcher):
             self._buffer = None
         return buf
 
+    @property
+    def frame_index(self):
+        return self._nframe
+
+    @property
+    def buffer_fill(self):
+        # frames read ahead and the read ahead depth
+        with self._ring_cond:
+            return len(self._ring), self._depth
+
     @property
     def frame_size(self):
-        if self._file is None:
+        if self._reader is None:
             return self._size, self._size, self._size
-        return self._ysize, self._csize, self._csize
+        return self._reader.frame_size
+
+    @property
+    def frame_samples(self):
+        # samples per texel of each plane, the shader splits pairs apart
+        if self._reader is None:
+            return 1, 1, 1
+        return self._reader.frame_samples
 
     def play(self):
         Clock.unschedule(self._progress)
-        Clock.schedule_interval(self._progress, 1 / float(self._fps))
+        # tick every frame, the playback clock decides when a frame is due
+        self._clock.start(max(self._nframe, 0))
+        Clock.schedule_interval(self._progress, 0)
         self._state = 'playing'
 
     def stop(self):
         Clock.unschedule(self._progress)
+        self._clock.stop()
+        self._clock.reset()
         self.position = 0
         self._state = ''
 
     def pause(self):
         Clock.unschedule(self._progress)
+        self._clock.stop()
         self._state = 'paused'
 
     def seek(self, percent):
         self.position = percent * self.duration
 
+    def seek_frame(self, nframe):
+        if nframe < 0 or nframe >= self._frames or nframe == self._nframe:
+            return
+        self._position = nframe / float(self._fps)
+        self._eos = False
+        self._show_image(nframe)
+
+    def unload(self, block=True):
+        Clock.unschedule(self._progress)
+        self._clock.stop()
+        self._state = ''
+        if block:
+            self._close_image()
+            return
+        # a read stuck on a slow mount must not hold up the caller
+        thread = Thread(target=self._close_image,
+                        name='LoaderYuv close %s' % self._filename)
+        thread.daemon = True
+        thread.start()
+
     def _progress(self, dt):
-        self.position += 1 / float(self.fps)
+        clock = self._clock
+        last  = self._nframe
+
+        nframe = clock.next(last)
+        if nframe is None:
+            return
+        if nframe >= self._frames:
+            self.position = self._duration
+            return
+
+        # hold keeps the last frame up rather than wait for a slow read
+        block = clock.policy != PLAYBACK_POLICY[1]
+        if not self._show_image(nframe, block):
+            clock.held(nframe, last)
+            return
+
+        self._position = nframe / float(self._fps)
+        clock.shown(nframe, last)
 
     def _init_image(self, *largs):
         format   = self._format
@@ -184,56 +351,202 @@ class LoaderYuv(EventDispatcher):
         ysize    = self._size
         filename = self._filename
 
-        try:
-            fp = open(filename, 'rb')
-        except IOError:
-            raise Exception("Can't open file %s" % filename)
-        filesize = getsize(filename)
-
-        if format not in YUV_CHROMA_SUBPIXEL:
-            raise Exception("Not support chroma format")
         if colorfmt not in OUT_COLOR_FORMAT:
             raise Exception("Not support color format")
 
-        subpixel = YUV_CHROMA_SUBPIXEL[format]
-        csize = ysize[0] // subpixel[0], ysize[1] // subpixel[1]
-        if format in YUV_CHROMA_FORMAT[0]:
-            csize = (0, 0)
+        reader = ReaderYuv(filename=filename, format=format, size=ysize,
+                           bitdepth=self._bitdepth, mmap=self._mmap,
+                           region=self._region)
 
-        self._ysize = ysize
-        self._csize = csize
-        self._file  = fp
-        self._ydata = ysize[0] * ysize[1]
-        self._cdata = csize[0] * csize[1]
-        self._pdata = self._ydata + self._cdata * 2
+        self._reader = reader
+        self._region = reader.region
 
-        self._duration = (filesize // self._pdata) / float(self._fps)
+        self._frames   = reader.frames
+        self._duration = self._frames / float(self._fps)
         self._position = 0.
 
-        self._convert = ConvertYuv(format=format, size=ysize, type='float')
+        self._convert = self._create_convert()
+
+        if self._depth > 0:
+            self._prefetch = 0
+            self._serial   = 0
+            self._quit     = False
+            self._thread   = Thread(target=self._prefetch_image,
+                                    name='LoaderYuv %s' % filename)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _create_stats(self):
+        with self._buffer_lock:
+            self._frame_stats.clear()
+        return StatsYuv(bitdepth=self._bitdepth, range=self._range)
+
+    def _create_convert(self):
+        # a region converts as a frame of its own size
+        size = self._reader.size if self._reader is not None else self._size
+        return ConvertYuv(format=self._format, size=size, type='lut',
+                          bitdepth=self._bitdepth,
+                          matrix=self._matrix, range=self._range,
+                          filter=self._filter, siting=self._siting)
 
     def _close_image(self):
-        if self._file is None:
+        if self._thread is not None:
+            with self._ring_cond:
+                self._quit = True
+                self._ring.clear()
+                self._ring_cond.notify_all()
+            self._thread.join()
+            self._thread = None
+        if self._reader is None:
             return
-        self._file.close()
-        self._file = None
+        self._reader.close()
+        self._reader = None
+
+    def _reload_image(self):
+        # drop the read ahead frames and read the shown one again
+        if self._thread is not None:
+            with self._ring_cond:
+                self._ring.clear()
+                self._prefetch = max(self._nframe, 0)
+                self._serial  += 1
+                self._ring_cond.notify_all()
+        if self._nframe >= 0:
+            self._show_image(self._nframe)
+
+    def _show_image(self, nframe, block=True):
+        nframe = min(nframe, self._frames - 1)
+        if self._thread is not None:
+            buf = self._fetch_image(nframe, block)
+        else:
+            buf = self._read_image(nframe)
+        if buf is None:
+            return False
 
-    def _read_image(self, nframe):
-        if self._file is None:
-            return
+        # the latest frame wins, the display only ever shows the newest one
+        with self._buffer_lock:
+            self._buffer = buf
+        self._nframe = nframe
+        return True
+
+    def _fetch_image(self, nframe, block=True):
+        cond = self._ring_cond
+        ring = self._ring
+
+        with cond:
+            while ring and ring[0][0] < nframe:
+                ring.popleft()
+
+            if not block and not (ring and ring[0][0] == nframe):
+                # let the producer catch up unless it went past nframe
+                # or is too far behind to reach it soon
+                pending = ring[0][0] if ring else self._prefetch
+                if pending > nframe or nframe - pending > self._depth:
+                    ring.clear()
+                    self._prefetch = nframe
+                    self._serial  += 1
+                cond.notify_all()
+                return None
+
+            # restart the producer unless it is already at nframe
+            if ring and ring[0][0] != nframe or \
+               not ring and self._prefetch != nframe:
+                ring.clear()
+                self._prefetch = nframe
+                self._serial  += 1
+                cond.notify_all()
+
+            while not ring and not self._quit:
+                cond.wait()
+            if not ring:
+                return None
+
+            buf = ring.popleft()[1]
+            cond.notify_all()
+        return buf
 
-        self._file.seek(nframe * self._pdata, SEEK_SET)
+    def _prefetch_image(self):
+        cond = self._ring_cond
+        ring = self._ring
+
+        while True:
+            with cond:
+                while not self._quit and (len(ring) >= self._depth or
+                                          self._prefetch >= self._frames):
+                    cond.wait()
+                if self._quit:
+                    return
+                nframe = self._prefetch
+                serial = self._serial
+
+            buf = self._read_image(nframe)
+
+            with cond:
+                # drop the frame if a seek restarted the producer or an
+                # unload stopped it meanwhile
+                if serial == self._serial and not self._quit:
+                    ring.append((nframe, buf))
+                    self._prefetch = nframe + 1
+                    cond.notify_all()
 
-        y, u, v = None, None, None
-        if self._ydata > 0:
-            y = self._file.read(self._ydata)
-        if self._cdata > 0:
-            u = self._file.read(self._cdata)
-            v = self._file.read(self._cdata)
+    def _read_image(self, nframe):
+        if self._reader is None:
+            return None
+
+        # key and colors come from one converter, it may be swapped meanwhile
+        convert = self._convert
+
+        # mapped planes already live in the page cache, only cache copies
+        cache = self._cache
+        if cache is not None and cache.limit > 0 and \
+           (not self._reader.mapped or self.colorfmt == OUT_COLOR_FORMAT[0]):
+            key = (self._filename, nframe, self._format, self._colorfmt,
+                   tuple(self._size), self._bitdepth,
+                   tuple(self._region) if self._region else None)
+            if self.colorfmt == OUT_COLOR_FORMAT[0]:
+                key += (convert.matrix, convert.range, convert.filter,
+                        convert.siting)
+        else:
+            cache, key = None, None
 
-        if self.colorfmt == OUT_COLOR_FORMAT[0]:
-            y, u, v = self._convert.convert((y, u, v))
+        if cache is not None:
+            buf = cache.get(key)
+            if buf is not None:
+                self._analyze_image(nframe)
+                return buf
 
+        if self.colorfmt == OUT_COLOR_FORMAT[0]:
+            with profiler.measure('read'):
+                planes = self._reader.read_planar(nframe)
+            with profiler.measure('convert'):
+                y, u, v = convert.convert(planes)
+        else:
+            planes  = None
+            with profiler.measure('read'):
+                y, u, v = self._reader.read(nframe)
+            if YUV_CHROMA_LAYOUT[self._format] == 'planar':
+                planes = y, u, v
+        self._analyze_image(nframe, planes)
+
+        if cache is not None:
+            cache.put(key, (y, u, v))
+
+        return y, u, v
+
+    def _analyze_image(self, nframe, planes=None):
+        # runs next to the read, on the producer thread when reading ahead
+        stats = self._stats
+        if stats is None:
+            return
+        with self._buffer_lock:
+            if nframe in self._frame_stats:
+                return
+        if planes is None:
+            planes = self._reader.read_planar(nframe)
+        result = stats.compute(planes)
         with self._buffer_lock:
-            if self._buffer is None:
-                self._buffer = y, u, v
+            # a range switch meanwhile started over with new statistics
+            if stats is not self._stats:
+                return
+            self._frame_stats[nframe] = result
+            while len(self._frame_stats) > self.STATS_KEEP:
+                self._frame_stats.popitem(last=False)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('PlaylistYuv', )
+
+import sys
+import json
+from os import stat, remove, rename
+from os.path import abspath, dirname, exists, isabs, join, relpath
+
+from yuvist.core.video import YUV_CHROMA_FORMAT, OUT_COLOR_FORMAT
+from yuvist.core.video.detect_yuv import DetectYuv
+from yuvist.core.video.reader_yuv import ReaderYuv
+from yuvist.core.video.thumbnail_yuv import ThumbnailYuv
+
+
+# json lines playlist, a header line then one item per line
+#   {"yuvist-playlist": 1}
+#   {"source": "foo_1920x1080.yuv", "format": "yuv420", "colorfmt": "luminance",
+#    "size": [1920, 1080], "fps": 30.0, "bitdepth": 8, "frames": 300,
+#    "filesize": 933120000, "mtime": 1356998400, "detected": true,
+#    "thumbnail": "foo_1920x1080.yuv.thumbs"}
+# items are trusted as written, files are only probed when an item is added,
+# lacks its geometry or changed its geometry
+class PlaylistYuv(object):
+
+    HEADER  = 'yuvist-playlist'
+    VERSION = 1
+    FIELDS  = ('source', 'format', 'colorfmt', 'size', 'fps', 'bitdepth')
+    META    = ('frames', 'filesize', 'mtime', 'detected', 'thumbnail')
+    PATHS   = ('source', 'thumbnail')
+
+    def __init__(self, **kwargs):
+
+        self._filename = kwargs.get('filename', None)
+        self._format   = kwargs.get('format', YUV_CHROMA_FORMAT[1])
+        self._colorfmt = kwargs.get('colorfmt', OUT_COLOR_FORMAT[1])
+        self._size     = kwargs.get('size', [1920, 1080])
+        self._fps      = kwargs.get('fps', 30.)
+        self._bitdepth = kwargs.get('bitdepth', 8)
+
+        self._entries = []
+        self._dirty   = False
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def entries(self):
+        return self._entries
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def playitems(self):
+        return [[entry[field] for field in self.FIELDS] for entry in self._entries]
+
+    def info(self):
+        # cached metadata by source
+        return dict((entry['source'],
+                     dict((field, entry.get(field)) for field in self.META))
+                    for entry in self._entries)
+
+    def load(self):
+        if not exists(self._filename):
+            return False
+
+        base = dirname(abspath(self._filename))
+        entries = []
+        with open(self._filename) as fp:
+            try:
+                header = json.loads(fp.readline())
+            except ValueError:
+                raise Exception("Not support playlist %s" % self._filename)
+            if not isinstance(header, dict) or \
+               header.get(self.HEADER) != self.VERSION:
+                raise Exception("Not support playlist %s" % self._filename)
+
+            for line in fp:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict) or not entry.get('source'):
+                    continue
+                for field in self.PATHS:
+                    path = entry.get(field)
+                    if path and not isabs(path):
+                        entry[field] = join(base, path)
+                entries.append(entry)
+
+        self._entries = [self._complete(entry) for entry in entries]
+        return True
+
+    def save(self):
+        # written next to the playlist and renamed over it, never half written
+        base = dirname(abspath(self._filename))
+        temp = self._filename + '.tmp'
+        with open(temp, 'w') as fp:
+            fp.write(json.dumps({self.HEADER: self.VERSION}) + '\n')
+            for entry in self._entries:
+                entry = dict(entry)
+                for field in self.PATHS:
+                    path = entry.get(field) and abspath(entry[field])
+                    if path and path.startswith(join(base, '')):
+                        entry[field] = relpath(path, base)
+                fp.write(json.dumps(entry, sort_keys=True) + '\n')
+        if exists(self._filename) and sys.platform == 'win32':
+            remove(self._filename)
+        rename(temp, self._filename)
+        self._dirty = False
+
+    def add(self, source, **kwargs):
+        # a new item, given fields win over detected ones
+        source = abspath(source)
+        for entry in self._entries:
+            if entry['source'] == source:
+                return entry
+        entry = dict((field, kwargs.get(field)) for field in self.FIELDS[1:])
+        entry['source'] = source
+        entry = self._complete(entry)
+        self._entries.append(entry)
+        self._dirty = True
+        return entry
+
+    def update(self, playitems):
+        # take over the playitems, keeping the metadata of unchanged items
+        cached  = dict((entry['source'], entry) for entry in self._entries)
+        entries = []
+        for playitem in playitems:
+            entry = dict(zip(self.FIELDS, playitem))
+            entry['size'] = list(entry['size'])
+            last = cached.get(entry['source'])
+            if last is not None and all(last.get(field) == entry[field]
+                                        for field in self.FIELDS):
+                entries.append(last)
+                continue
+            if last is not None and all(last.get(field) == entry[field]
+                                        for field in ('format', 'size', 'bitdepth')):
+                entry.update((field, last.get(field)) for field in self.META)
+            else:
+                self.probe(entry)
+            entries.append(entry)
+
+        if entries != self._entries:
+            self._entries = entries
+            self._dirty = True
+
+    def stale(self, entry):
+        # whether the file changed since its metadata was taken
+        try:
+            info = stat(entry['source'])
+        except OSError:
+            return True
+        return entry.get('filesize') != info.st_size or \
+               entry.get('mtime') != int(info.st_mtime)
+
+    def probe(self, entry):
+        # the one place a file is touched
+        source = entry['source']
+        entry.update((field, None) for field in self.META if field != 'detected')
+        entry.setdefault('detected', False)
+        try:
+            info = stat(source)
+        except OSError:
+            return entry
+        entry['filesize'] = info.st_size
+        entry['mtime']    = int(info.st_mtime)
+
+        if not source.lower().endswith('.yuv'):
+            return entry
+        try:
+            reader = ReaderYuv(filename=source, format=entry['format'],
+                               size=entry['size'], bitdepth=entry['bitdepth'])
+        except Exception:
+            return entry
+        entry['frames'] = reader.frames
+        reader.close()
+
+        sidecar = source + ThumbnailYuv.SIDECAR_EXT
+        if exists(sidecar):
+            entry['thumbnail'] = sidecar
+        return entry
+
+    def _complete(self, entry):
+        # hand written items may list just a source, fill and probe them once
+        if all(entry.get(field) is not None for field in self.FIELDS):
+            entry['size'] = list(entry['size'])
+            return entry
+
+        format   = entry.get('format')
+        size     = entry.get('size')
+        bitdepth = entry.get('bitdepth')
+        detected = None
+        if entry['source'].lower().endswith('.yuv') and \
+           not (format and size and bitdepth):
+            try:
+                detected = DetectYuv(filename=entry['source'], format=format,
+                                     size=size, bitdepth=bitdepth).detect()
+            except Exception:
+                detected = None
+        if detected is not None:
+            format, size, bitdepth = detected
+
+        entry['format']   = format or self._format
+        entry['colorfmt'] = entry.get('colorfmt') or self._colorfmt
+        entry['size']     = list(size or self._size)
+        entry['fps']      = entry.get('fps') or self._fps
+        entry['bitdepth'] = bitdepth or self._bitdepth
+        self.probe(entry)
+        entry['detected'] = detected is not None
+        self._dirty = True
+        return entry
+
+
+if __name__ == '__main__':
+
+    from timeit import default_timer
+
+    if len(sys.argv) < 2:
+        print 'usage: %s playlist [file ...]' % sys.argv[0]
+        sys.exit(1)
+
+    playlist = PlaylistYuv(filename=sys.argv[1])
+    start = default_timer()
+    playlist.load()
+    print 'loaded %d items (%.1f ms)' % (
+        len(playlist.entries), (default_timer() - start) * 1000.)
+
+    for source in sys.argv[2:]:
+        playlist.add(source)
+
+    for entry in playlist.entries:
+        print '%s %s %dx%d %d bit %s frames%s' % (
+            entry['source'], entry['format'], entry['size'][0], entry['size'][1],
+            entry['bitdepth'], entry['frames'],
+            ' (stale)' if playlist.stale(entry) else '')
+    if playlist.dirty:
+        playlist.save()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('ProfileYuv', 'profiler')
+
+import json
+from collections import deque
+from threading import Lock
+from timeit import default_timer
+
+
+class _Timer(object):
+
+    __slots__ = ('_profile', '_name', '_start')
+
+    def __init__(self, profile, name):
+        self._profile = profile
+        self._name    = name
+
+    def __enter__(self):
+        self._start = default_timer()
+        return self
+
+    def __exit__(self, *largs):
+        self._profile.add(self._name, default_timer() - self._start)
+        return False
+
+
+class _NullTimer(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *largs):
+        return False
+
+
+_null_timer = _NullTimer()
+
+
+# rolling timings of the hot paths, shared by the loader thread and the ui
+#   read    - frame read from the file or the page cache
+#   convert - yuv to rgb conversion
+#   update  - one video update on the ui thread, uploads included
+#   upload  - texture uploads of one frame
+#   frame   - time between two kivy frames
+class ProfileYuv(object):
+
+    STAGES      = ('read', 'convert', 'update', 'upload', 'frame')
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, **kwargs):
+        self._window  = kwargs.get('window', 240)
+        self._enabled = kwargs.get('enabled', False)
+        self._lock    = Lock()
+        self._samples = {}
+        self._counts  = {}
+
+    def _get_enabled(self):
+        return self._enabled
+
+    def _set_enabled(self, enabled):
+        self._enabled = enabled
+
+    enabled = property(lambda self: self._get_enabled(),
+            lambda self, x: self._set_enabled(x),
+            doc='Get/set whether timings are recorded')
+
+    @property
+    def window(self):
+        return self._window
+
+    def measure(self, name):
+        # costs one attribute lookup while disabled
+        if not self._enabled:
+            return _null_timer
+        return _Timer(self, name)
+
+    def add(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self._window)
+                self._counts[name] = 0
+            samples.append(seconds)
+            self._counts[name] += 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def summary(self):
+        # milliseconds per stage over the window, nearest rank percentiles
+        with self._lock:
+            windows = dict((name, sorted(samples))
+                           for name, samples in self._samples.iteritems())
+            counts  = dict(self._counts)
+
+        result = {}
+        for name, samples in windows.iteritems():
+            if not samples:
+                continue
+            stage = dict(count=counts[name], window=len(samples),
+                         mean=sum(samples) * 1000. / len(samples),
+                         max=samples[-1] * 1000.)
+            for percent in self.PERCENTILES:
+                index = min(len(samples) - 1,
+                            max(0, -(-len(samples) * percent // 100) - 1))
+                stage['p%d' % percent] = samples[index] * 1000.
+            result[name] = stage
+        return result
+
+    def dump(self, filename, **extra):
+        info = dict(extra)
+        info['stages'] = self.summary()
+        with open(filename, 'w') as fp:
+            json.dump(info, fp, indent=1, sort_keys=True)
+
+
+profiler = ProfileYuv()
+
+
+if __name__ == '__main__':
+
+    from random import random
+
+    profile = ProfileYuv(enabled=True, window=100)
+    for i in xrange(1000):
+        profile.add('read', random() / 100.)
+        with profile.measure('convert'):
+            sum(xrange(1000))
+
+    for name, stage in sorted(profile.summary().items()):
+        print '%-8s %6d mean %.3f p50 %.3f p90 %.3f p99 %.3f max %.3f ms' % (
+            name, stage['count'], stage['mean'], stage['p50'], stage['p90'],
+            stage['p99'], stage['max'])
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('ReaderYuv', )
+
+from array import array
+from mmap import mmap, ACCESS_READ
+from os import SEEK_SET
+from os.path import getsize
+
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_CHROMA_LAYOUT
+
+
+class ReaderYuv(object):
+
+    def __init__(self, **kwargs):
+
+        format   = kwargs.get('format', YUV_CHROMA_FORMAT[1])
+        ysize    = kwargs.get('size', [0, 0])
+        filename = kwargs.get('filename', None)
+        use_mmap = kwargs.get('mmap', False)
+        bitdepth = kwargs.get('bitdepth', 8)
+        region   = kwargs.get('region', None)
+
+        if format not in YUV_CHROMA_SUBPIXEL:
+            raise Exception("Not support chroma format")
+
+        try:
+            fp = open(filename, 'rb')
+        except IOError:
+            raise Exception("Can't open file %s" % filename)
+        filesize = getsize(filename)
+
+        subpixel = YUV_CHROMA_SUBPIXEL[format]
+        csize = ysize[0] // subpixel[0], ysize[1] // subpixel[1]
+        if format in YUV_CHROMA_FORMAT[0]:
+            csize = (0, 0)
+
+        # samples above 8 bits are stored as 16 bit little-endian words
+        sample = 2 if bitdepth > 8 else 1
+
+        # semi-planar chroma keeps u,v pairs in one plane, packed 4:2:2
+        # pairs each luma sample with one chroma sample in a single plane
+        layout = YUV_CHROMA_LAYOUT[format]
+        if layout == 'packed' and ysize[0] % 2:
+            raise Exception("Not support odd width in packed format")
+        if layout == 'semiplanar':
+            sizes   = ysize, csize, (0, 0)
+            samples = 1, 2, 0
+        elif layout == 'packed':
+            sizes   = ysize, (0, 0), (0, 0)
+            samples = 2, 0, 0
+        else:
+            sizes   = ysize, csize, csize
+            samples = 1, 1, 1
+
+        self._filename = filename
+        self._format   = format
+        self._layout   = layout
+        self._bitdepth = bitdepth
+        self._file     = fp
+        self._mmap     = None
+        self._ysize    = ysize
+        self._csize    = csize
+        self._sizes    = sizes
+        self._samples  = tuple(n if w > 0 else 0 for n, (w, h) in zip(samples, sizes))
+        self._data     = tuple(w * h * n * sample for n, (w, h) in zip(samples, sizes))
+        self._pdata    = sum(self._data)
+        self._filesize = filesize
+        self._frames   = filesize // self._pdata if self._pdata > 0 else 0
+
+        # a region reads only the rows it covers, its planes come out as the
+        # planes of a frame the size of the region
+        self._region = None
+        self._spans  = None
+        if region is not None:
+            self._set_region(region, subpixel, samples, sample)
+
+        # mapping an empty file fails, fall back to plain reads
+        if use_mmap and filesize > 0:
+            self._mmap = mmap(fp.fileno(), 0, access=ACCESS_READ)
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def format(self):
+        return self._format
+
+    @property
+    def size(self):
+        return self._ysize[0], self._ysize[1]
+
+    @property
+    def bitdepth(self):
+        return self._bitdepth
+
+    @property
+    def frames(self):
+        return self._frames
+
+    @property
+    def frame_size(self):
+        return self._sizes
+
+    @property
+    def frame_samples(self):
+        return self._samples
+
+    @property
+    def planar_size(self):
+        return self._ysize, self._csize, self._csize
+
+    @property
+    def plane_bytes(self):
+        return self._data
+
+    @property
+    def frame_bytes(self):
+        return self._pdata
+
+    @property
+    def region(self):
+        return self._region
+
+    @property
+    def read_bytes(self):
+        # bytes taken from the file per frame
+        if self._spans is None:
+            return self._pdata
+        return sum((rows - 1) * stride + cols if cols > 0 else 0
+                   for offset, stride, rows, cols in self._spans)
+
+    @property
+    def mapped(self):
+        return self._mmap is not None
+
+    def close(self):
+        # buffers handed out by read() keep the mapping alive on their own
+        self._mmap = None
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+
+    def _set_region(self, region, subpixel, samples, sample):
+        # aligned to the chroma subsampling and clipped to the frame
+        sx, sy = subpixel
+        width, height = self._ysize
+        x = min(max(int(region[0]), 0), width) // sx * sx
+        y = min(max(int(region[1]), 0), height) // sy * sy
+        w = min(-(-int(region[2]) // sx) * sx, width - x)
+        h = min(-(-int(region[3]) // sy) * sy, height - y)
+        if w <= 0 or h <= 0:
+            raise Exception("Not support empty region")
+
+        ysize = [w, h]
+        csize = (w // sx, h // sy) if self._csize[0] > 0 else (0, 0)
+        if self._layout == 'semiplanar':
+            sizes = ysize, csize, (0, 0)
+        elif self._layout == 'packed':
+            sizes = ysize, (0, 0), (0, 0)
+        else:
+            sizes = ysize, csize, csize
+
+        # (first byte, row stride, rows, bytes per row) of every plane
+        spans  = []
+        offset = 0
+        for i, data in enumerate(self._data):
+            scale  = (1, 1) if i == 0 else (sx, sy)
+            stride = self._sizes[i][0] * samples[i] * sample
+            texel  = samples[i] * sample
+            start  = offset + (y // scale[1]) * stride + (x // scale[0]) * texel
+            spans.append((start, stride, sizes[i][1], sizes[i][0] * texel))
+            offset += data
+
+        self._region = [x, y, w, h]
+        self._spans  = tuple(spans)
+        self._ysize  = ysize
+        self._csize  = csize
+        self._sizes  = sizes
+
+    def _read_region(self, nframe):
+        base   = nframe * self._pdata
+        planes = [None, None, None]
+
+        for i, (start, stride, rows, cols) in enumerate(self._spans):
+            if cols <= 0 or rows <= 0:
+                continue
+            start += base
+            if cols == stride:
+                # whole rows, one contiguous span
+                if self._mmap is not None:
+                    planes[i] = buffer(self._mmap, start, rows * stride)
+                elif self._file is not None:
+                    self._file.seek(start, SEEK_SET)
+                    planes[i] = self._file.read(rows * stride)
+                continue
+            if self._mmap is not None:
+                data, first = self._mmap, start
+            elif self._file is not None:
+                # one read from the first to the last byte of the region
+                self._file.seek(start, SEEK_SET)
+                data, first = self._file.read((rows - 1) * stride + cols), 0
+            else:
+                continue
+            planes[i] = ''.join(data[first + row * stride:first + row * stride + cols]
+                                for row in xrange(rows))
+        return tuple(planes)
+
+    def read(self, nframe):
+
+        if self._spans is not None:
+            return self._read_region(nframe)
+
+        offset = nframe * self._pdata
+        planes = [None, None, None]
+
+        if self._mmap is not None:
+            for i, data in enumerate(self._data):
+                if data > 0:
+                    planes[i] = buffer(self._mmap, offset, data)
+                    offset += data
+            return tuple(planes)
+
+        if self._file is None:
+            return tuple(planes)
+
+        self._file.seek(offset, SEEK_SET)
+        for i, data in enumerate(self._data):
+            if data > 0:
+                planes[i] = self._file.read(data)
+        return tuple(planes)
+
+    def read_planar(self, nframe):
+
+        y, u, v = self.read(nframe)
+        if self._layout == 'planar':
+            return y, u, v
+
+        # only reorders whole samples, so the byte order is left untouched
+        typecode = 'H' if self._bitdepth > 8 else 'B'
+
+        if self._layout == 'semiplanar':
+            chroma = array(typecode, str(u))
+            u, v = chroma[0::2], chroma[1::2]
+            if self._format == 'nv21':
+                u, v = v, u
+        else:
+            packed = array(typecode, str(y))
+            if self._format == 'uyvy':
+                y, u, v = packed[1::2], packed[0::4], packed[2::4]
+            else:
+                y, u, v = packed[0::2], packed[1::4], packed[3::4]
+            y = y.tostring()
+
+        return y, u.tostring(), v.tostring()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('StatsYuv', )
+
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yuvist.core.video import YUV_BITDEPTH, YUV_COLOR_RANGE
+
+
+class StatsYuv(object):
+
+    PLANE_NAMES = ('y', 'u', 'v')
+    FIELDS      = ('mean', 'variance', 'min', 'max', 'clip_low', 'clip_high')
+
+    def __init__(self, **kwargs):
+
+        bitdepth = kwargs.get('bitdepth', YUV_BITDEPTH[0])
+        range    = kwargs.get('range', YUV_COLOR_RANGE[0])
+        bins     = kwargs.get('bins', 256)
+
+        if numpy is None:
+            raise Exception("Not support statistics without numpy")
+        if range not in YUV_COLOR_RANGE:
+            raise Exception("Not support color range")
+        if bins < 1 or bins > (1 << bitdepth) or bins & (bins - 1):
+            raise Exception("Not support histogram bins %d" % bins)
+
+        peak  = (1 << bitdepth) - 1
+        shift = bitdepth - 8
+
+        # limited range clips outside the nominal levels, full range at
+        # the code extremes
+        if range == YUV_COLOR_RANGE[0]:
+            bounds = ((16 << shift, 235 << shift), (16 << shift, 240 << shift),
+                      (16 << shift, 240 << shift))
+        else:
+            bounds = ((1, peak - 1), ) * 3
+
+        self._bitdepth = bitdepth
+        self._range    = range
+        self._bins     = bins
+        self._peak     = peak
+        self._bounds   = bounds
+        self._dtype    = '<u2' if bitdepth > 8 else 'u1'
+
+    @property
+    def bitdepth(self):
+        return self._bitdepth
+
+    @property
+    def range(self):
+        return self._range
+
+    @property
+    def bins(self):
+        return self._bins
+
+    def compute(self, planes):
+        # one bincount per plane in C, everything else comes from the counts
+        values = numpy.arange(self._peak + 1, dtype=numpy.float64)
+        result = []
+        for i, plane in enumerate(planes):
+            if plane is None or len(plane) == 0:
+                break
+            data   = numpy.frombuffer(plane, dtype=self._dtype)
+            counts = numpy.bincount(data, minlength=self._peak + 1)
+            if len(counts) > self._peak + 1:
+                # samples above the bit depth count as the peak code
+                counts[self._peak] += counts[self._peak + 1:].sum()
+                counts = counts[:self._peak + 1]
+            total  = float(data.size)
+
+            mean     = counts.dot(values) / total
+            variance = max(counts.dot(values * values) / total - mean * mean, 0.)
+            used     = numpy.flatnonzero(counts)
+            low, high = self._bounds[i]
+
+            result.append(dict(plane=self.PLANE_NAMES[i],
+                               samples=data.size,
+                               mean=mean,
+                               variance=variance,
+                               min=int(used[0]),
+                               max=int(used[-1]),
+                               clip_low=int(counts[:low].sum()),
+                               clip_high=int(counts[high + 1:].sum()),
+                               histogram=counts.reshape(self._bins, -1)
+                                               .sum(1).tolist()))
+        return result
+
+
+if __name__ == '__main__':
+
+    from timeit import default_timer
+    from yuvist.core.video.reader_yuv import ReaderYuv
+
+    if len(sys.argv) < 4:
+        print 'usage: %s file width height [format] [bitdepth]' % sys.argv[0]
+        sys.exit(1)
+
+    format   = sys.argv[4] if len(sys.argv) > 4 else 'yuv420'
+    bitdepth = int(sys.argv[5]) if len(sys.argv) > 5 else 8
+
+    reader = ReaderYuv(filename=sys.argv[1], format=format,
+                       size=[int(sys.argv[2]), int(sys.argv[3])],
+                       bitdepth=bitdepth)
+    stats  = StatsYuv(bitdepth=bitdepth)
+
+    start = default_timer()
+    for nframe in xrange(reader.frames):
+        result = stats.compute(reader.read_planar(nframe))
+    elapsed = default_timer() - start
+
+    for plane in result:
+        print '%s mean %.2f variance %.2f min %d max %d clip %d/%d' % (
+            plane['plane'].upper(), plane['mean'], plane['variance'],
+            plane['min'], plane['max'], plane['clip_low'], plane['clip_high'])
+    print '%d frames in %.2f s (%.2f fps)' % (
+        reader.frames, elapsed, reader.frames / max(elapsed, 1e-6))
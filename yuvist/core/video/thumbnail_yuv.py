@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('ThumbnailYuv', )
+
+import sys
+import json
+from array import array
+from os import stat
+from os.path import abspath
+from threading import Lock, Thread
+
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_COLOR_MATRIX, \
+        YUV_COLOR_RANGE
+from yuvist.core.video.convert_yuv import ConvertYuv
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+# one builder writes a sidecar at a time, a builder stopped without
+# blocking may still be appending its last thumbnails
+_sidecar_locks = {}
+_sidecar_locks_lock = Lock()
+
+
+def _sidecar_lock(sidecar):
+    with _sidecar_locks_lock:
+        return _sidecar_locks.setdefault(abspath(sidecar), Lock())
+
+
+class ThumbnailYuv(object):
+
+    THUMB_WIDTH  = 160      # longest side of a thumbnail
+    THUMB_COUNT  = 240      # thumbnails indexed over the whole file
+    FLUSH_COUNT  = 16       # thumbnails appended to the sidecar at once
+    SIDECAR_EXT  = '.thumbs'
+    VERSION      = 1
+
+    def __init__(self, **kwargs):
+
+        self._filename = kwargs.get('filename', None)
+        self._format   = kwargs.get('format', YUV_CHROMA_FORMAT[1])
+        self._ysize    = list(kwargs.get('size', [0, 0]))
+        self._bitdepth = kwargs.get('bitdepth', 8)
+        self._matrix   = kwargs.get('matrix', YUV_COLOR_MATRIX[0])
+        self._range    = kwargs.get('range', YUV_COLOR_RANGE[0])
+        self._sidecar  = kwargs.get('sidecar', self._filename + self.SIDECAR_EXT)
+
+        reader = ReaderYuv(filename=self._filename, format=self._format,
+                           size=self._ysize, bitdepth=self._bitdepth)
+        self._frames = reader.frames
+        reader.close()
+
+        # integer decimation keeps every thumbnail pixel on a source sample
+        width, height = self._ysize
+        self._step = max(1, -(-max(width, height) // self.THUMB_WIDTH))
+        self._size = max(1, width // self._step), max(1, height // self._step)
+        self._interval = max(1, -(-self._frames // self.THUMB_COUNT))
+        self._record = self._size[0] * self._size[1] * 3
+
+        self._lock   = Lock()
+        self._thumbs = self._load() or []
+        self._thread = None
+        self._quit   = False
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def sidecar(self):
+        return self._sidecar
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def frames(self):
+        return self._frames
+
+    @property
+    def count(self):
+        return -(-self._frames // self._interval)
+
+    @property
+    def built(self):
+        return len(self._thumbs)
+
+    @property
+    def done(self):
+        return len(self._thumbs) >= self.count
+
+    def key(self):
+        # the sidecar is only valid for the same file and the same geometry
+        info = stat(self._filename)
+        return dict(version=self.VERSION, path=abspath(self._filename),
+                    mtime=int(info.st_mtime), filesize=info.st_size,
+                    format=self._format, size=self._ysize,
+                    bitdepth=self._bitdepth, matrix=self._matrix,
+                    range=self._range, thumb=list(self._size),
+                    interval=self._interval)
+
+    def get(self, nframe):
+        # rgb bytes of the indexed frame at or before nframe, None if not built
+        with self._lock:
+            index = min(max(nframe, 0) // self._interval, len(self._thumbs) - 1)
+            if index < 0:
+                return None
+            return self._thumbs[index]
+
+    def frame_of(self, index):
+        return index * self._interval
+
+    def start(self):
+        # a builder stopped without blocking may still be on its last frame
+        if self.done or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._quit   = False
+        self._thread = Thread(target=self._build,
+                              name='ThumbnailYuv %s' % self._filename)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, block=True):
+        if self._thread is None:
+            return
+        self._quit = True
+        # a read stuck on a slow mount must not hold up the caller, the
+        # builder leaves on its own once the frame it is on is done
+        if not block:
+            return
+        self._thread.join()
+        self._thread = None
+
+    def _load(self):
+        # thumbnails of a valid sidecar, None if there is none
+        try:
+            fp = open(self._sidecar, 'rb')
+        except IOError:
+            return None
+        with fp:
+            try:
+                header = json.loads(fp.readline())
+            except ValueError:
+                return None
+            if header != self.key():
+                return None
+            thumbs = []
+            while len(thumbs) < self.count:
+                data = fp.read(self._record)
+                if len(data) < self._record:
+                    break
+                thumbs.append(data)
+        return thumbs
+
+    def _open_sidecar(self):
+        # resume where the last run stopped, or start a new sidecar
+        try:
+            if self._thumbs:
+                fp = open(self._sidecar, 'r+b')
+                fp.readline()
+                fp.seek(fp.tell() + len(self._thumbs) * self._record)
+                fp.truncate()
+            else:
+                fp = open(self._sidecar, 'wb')
+                fp.write(json.dumps(self.key(), sort_keys=True) + '\n')
+        except (IOError, OSError):
+            return None
+        return fp
+
+    def _build(self):
+        # waits here, off the ui thread, for an earlier builder of the sidecar
+        with _sidecar_lock(self._sidecar):
+            if self._quit:
+                return
+            # and takes over what it wrote meanwhile
+            thumbs = self._load()
+            with self._lock:
+                if thumbs is None:
+                    self._thumbs = []
+                elif len(thumbs) > len(self._thumbs):
+                    self._thumbs = thumbs
+            self._build_sidecar()
+
+    def _build_sidecar(self):
+        reader = ReaderYuv(filename=self._filename, format=self._format,
+                           size=self._ysize, bitdepth=self._bitdepth)
+        convert = ConvertYuv(format=YUV_CHROMA_FORMAT[4], size=self._size,
+                             bitdepth=8, matrix=self._matrix, range=self._range)
+        fp = self._open_sidecar()
+        pending = []
+        try:
+            while not self._quit and len(self._thumbs) < self.count:
+                nframe = self.frame_of(len(self._thumbs))
+                thumb  = self._thumbnail(reader, convert, nframe)
+                with self._lock:
+                    self._thumbs.append(thumb)
+                pending.append(thumb)
+                if fp is not None and len(pending) >= self.FLUSH_COUNT:
+                    fp.write(''.join(pending))
+                    fp.flush()
+                    pending = []
+        finally:
+            if fp is not None:
+                fp.write(''.join(pending))
+                fp.close()
+            reader.close()
+
+    def _thumbnail(self, reader, convert, nframe):
+        step  = self._step
+        width, height = self._size
+        shift = self._bitdepth - 8
+        typecode = 'H' if self._bitdepth > 8 else 'B'
+
+        planes = []
+        for plane, size in zip(reader.read_planar(nframe), reader.planar_size):
+            if not size[0] or not size[1]:
+                planes.append(None)
+                continue
+            samples = array(typecode, str(plane))
+            if shift > 0 and sys.byteorder != 'little':
+                samples.byteswap()
+            # nearest sample of the plane under every thumbnail pixel
+            cols = [x * step * size[0] // self._ysize[0] for x in xrange(width)]
+            rows = [y * step * size[1] // self._ysize[1] for y in xrange(height)]
+            thumb = array('B')
+            for row in rows:
+                line = samples[row * size[0]:(row + 1) * size[0]]
+                thumb.extend(line[col] >> shift if shift > 0 else line[col]
+                             for col in cols)
+            planes.append(thumb.tostring())
+
+        if planes[1] is None:
+            planes[1] = planes[2] = chr(128) * (width * height)
+        return str(convert.convert(planes)[0])
+
+
+if __name__ == '__main__':
+
+    from time import sleep
+    from timeit import default_timer
+
+    if len(sys.argv) < 4:
+        print 'usage: %s file width height [format] [bitdepth]' % sys.argv[0]
+        sys.exit(1)
+
+    format   = sys.argv[4] if len(sys.argv) > 4 else YUV_CHROMA_FORMAT[1]
+    bitdepth = int(sys.argv[5]) if len(sys.argv) > 5 else 8
+
+    start = default_timer()
+    thumbs = ThumbnailYuv(filename=sys.argv[1], format=format,
+                          size=[int(sys.argv[2]), int(sys.argv[3])],
+                          bitdepth=bitdepth)
+    print 'loaded %d/%d thumbnails %dx%d from %s (%.1f ms)' % (
+        thumbs.built, thumbs.count, thumbs.size[0], thumbs.size[1],
+        thumbs.sidecar, (default_timer() - start) * 1000.)
+
+    start = default_timer()
+    thumbs.start()
+    while not thumbs.done:
+        sleep(.01)
+    thumbs.stop()
+    print 'built %d thumbnails (%.1f ms)' % (
+        thumbs.built, (default_timer() - start) * 1000.)
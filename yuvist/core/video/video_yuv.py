@@ -20,22 +20,51 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 __all__ = ('VideoYuv', )
 
+import struct
+from functools import partial
+from threading import Thread
+
+from kivy.clock import Clock
 from kivy.core.video import VideoBase
 from kivy.graphics.texture import Texture
 
-from yuvist.core.video import YUV_CHROMA_FORMAT, OUT_COLOR_FORMAT
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_CHROMA_LAYOUT, YUV_COLOR_MATRIX, YUV_COLOR_RANGE, YUV_CHROMA_FILTER, \
+        YUV_CHROMA_SITING, OUT_COLOR_FORMAT, PLAYBACK_POLICY
 from yuvist.core.video.loader_yuv import LoaderYuv
+from yuvist.core.video.profile_yuv import profiler
 
 
 class VideoYuv(VideoBase):
 
+    # texture format by the number of bytes in a texel, and back
+    TEXTURE_COLORFMT = {1: 'luminance', 2: 'luminance_alpha', 4: 'rgba'}
+    TEXTURE_BYTES    = {'luminance': 1, 'luminance_alpha': 2, 'rgb': 3, 'rgba': 4}
+
     def __init__(self, **kwargs):
         self._player   = None
+        self._compare  = None
+        self._opening  = False
+        self._serial   = 0
+        self._planes   = [None] * 6
 
         self._format   = kwargs.get('format', YUV_CHROMA_FORMAT[1])
         self._colorfmt = kwargs.get('colorfmt', OUT_COLOR_FORMAT[1])
         self._size     = kwargs.get('size', [0, 0])
         self._fps      = kwargs.get('fps', 30.)
+        self._bitdepth = kwargs.get('bitdepth', 8)
+        self._matrix   = kwargs.get('matrix', YUV_COLOR_MATRIX[0])
+        self._range    = kwargs.get('range', YUV_COLOR_RANGE[0])
+        self._filter   = kwargs.get('filter', YUV_CHROMA_FILTER[0])
+        self._siting   = kwargs.get('siting', YUV_CHROMA_SITING[0])
+        self._depth    = kwargs.get('buffer_depth', 4)
+        self._policy   = kwargs.get('policy', PLAYBACK_POLICY[0])
+        self._mmap     = kwargs.get('mmap', False)
+        self._stats    = kwargs.get('stats', False)
+        self._region   = kwargs.get('region', None)
+        self._compare_filename = kwargs.get('compare', None)
+
+        self.register_event_type('on_open')
 
         super(VideoYuv, self).__init__(**kwargs)
 
@@ -46,28 +75,105 @@ class VideoYuv(VideoBase):
     def unload(self):
         self.stop()
 
+    def _create_loader(self, filename, stats=False):
+        return LoaderYuv(filename=filename,
+                         format=self._format,
+                         colorfmt=self._colorfmt,
+                         size=self._size,
+                         fps=self._fps,
+                         bitdepth=self._bitdepth,
+                         matrix=self._matrix,
+                         range=self._range,
+                         filter=self._filter,
+                         siting=self._siting,
+                         buffer_depth=self._depth,
+                         policy=self._policy,
+                         mmap=self._mmap,
+                         region=self._region,
+                         stats=stats)
+
+    @property
+    def loading(self):
+        return self._opening
+
+    def open(self):
+        if self._player is None:
+            self._open()
+
     def play(self):
+        self._state = 'playing'
         if self._player is None:
-            self._player = LoaderYuv(filename=self.filename,
-                                     format=self._format,
-                                     colorfmt=self._colorfmt,
-                                     size=self._size,
-                                     fps=self._fps)
+            self._open()
+            return
         self._player.play()
-        self._state = 'playing'
 
     def stop(self):
+        # a newer open or none at all, an outstanding one is thrown away
+        self._serial += 1
+        self._opening = False
         if self._player:
             self._player.stop()
+            self._player.unload(block=False)
             self._player = None
+        if self._compare:
+            self._compare.unload(block=False)
+            self._compare = None
         self._state = ''
 
     def pause(self):
         if self._player is None:
+            if self._opening:
+                self._state = 'paused'
             return
         self._player.pause()
         self._state = 'paused'
 
+    def _open(self):
+        # open, size check and first frame read happen off the ui thread
+        if self._opening:
+            return
+        self._opening = True
+        thread = Thread(target=self._open_loaders, args=(self._serial, ),
+                        name='VideoYuv open %s' % self.filename)
+        thread.daemon = True
+        thread.start()
+
+    def _open_loaders(self, serial):
+        player, compare, error = None, None, None
+        try:
+            player = self._create_loader(self.filename, self._stats)
+            # the compare loader never plays, it follows the player frame by frame
+            if self._compare_filename and serial == self._serial:
+                compare = self._create_loader(self._compare_filename)
+            if serial == self._serial:
+                player.seek_frame(0)
+        except Exception as e:
+            error = e
+        Clock.schedule_once(partial(self._on_open_loaders, serial, player,
+                                    compare, error))
+
+    def _on_open_loaders(self, serial, player, compare, error, *largs):
+        if serial != self._serial or error is not None:
+            for loader in (player, compare):
+                if loader is not None:
+                    loader.unload(block=False)
+            if serial != self._serial:
+                return
+        self._opening = False
+        if error is not None:
+            self._state = ''
+            self.dispatch('on_open', error)
+            return
+
+        self._player  = player
+        self._compare = compare
+        if self._state == 'playing':
+            player.play()
+        self.dispatch('on_open', None)
+
+    def on_open(self, error):
+        pass
+
     def seek(self, percent):
         if self._player is None:
             return
@@ -83,6 +189,111 @@ class VideoYuv(VideoBase):
             return 0
         return self._player.position
 
+    @property
+    def region(self):
+        if self._player is None:
+            return self._region
+        return self._player.region
+
+    @property
+    def playback(self):
+        if self._player is None:
+            return None
+        return self._player.playback
+
+    def _get_color(self):
+        return self._matrix, self._range
+
+    def _set_color(self, color):
+        self._matrix, self._range = color
+        for loader in (self._player, self._compare):
+            if loader is not None:
+                loader.color = color
+
+    color = property(lambda self: self._get_color(),
+            lambda self, x: self._set_color(x),
+            doc='Get/set the color matrix and range of rgb conversion')
+
+    def _get_chroma(self):
+        return self._filter, self._siting
+
+    def _set_chroma(self, chroma):
+        self._filter, self._siting = chroma
+        for loader in (self._player, self._compare):
+            if loader is not None:
+                loader.chroma = chroma
+
+    chroma = property(lambda self: self._get_chroma(),
+            lambda self, x: self._set_chroma(x),
+            doc='Get/set the chroma filter and siting of rgb conversion')
+
+    def _get_stats(self):
+        return self._stats
+
+    def _set_stats(self, stats):
+        self._stats = stats
+        if self._player is not None:
+            self._player.stats = stats
+
+    stats = property(lambda self: self._get_stats(),
+            lambda self, x: self._set_stats(x),
+            doc='Get/set whether the frames shown are analyzed')
+
+    @property
+    def frame_stats(self):
+        if self._player is None:
+            return None
+        return self._player.frame_stats
+
+    @property
+    def buffer_fill(self):
+        if self._player is None:
+            return 0, self._depth
+        return self._player.buffer_fill
+
+    def pixel(self, x, y, compare=False):
+        # samples at a luma position of the shown frame or region, read from
+        # the planes on screen, nothing is converted or read again
+        planes = self._planes[3:6] if compare else self._planes[0:3]
+        region = self.region
+        width, height = region[2:4] if region else self._size
+        if planes[0] is None or not (0 <= x < width and 0 <= y < height):
+            return None
+
+        if self._colorfmt == OUT_COLOR_FORMAT[0]:
+            return zip('RGB', struct.unpack_from('BBB', planes[0], (y * width + x) * 3))
+
+        sample = 2 if self._bitdepth > 8 else 1
+        code   = '<H' if sample == 2 else 'B'
+        value  = lambda buf, index: struct.unpack_from(code, buf, index * sample)[0]
+
+        layout = YUV_CHROMA_LAYOUT[self._format]
+        sx, sy = YUV_CHROMA_SUBPIXEL[self._format]
+        chroma = (y // sy) * (width // sx) + x // sx
+
+        if layout == 'packed':
+            # texel pairs of a row hold y0 c0 y1 c1, the chroma alternates u and v
+            base = y * width * 2
+            pair = base + (x - x % 2) * 2
+            if self._format == 'yuyv':
+                return zip('YUV', (value(planes[0], base + x * 2),
+                                   value(planes[0], pair + 1),
+                                   value(planes[0], pair + 3)))
+            return zip('YUV', (value(planes[0], base + x * 2 + 1),
+                               value(planes[0], pair),
+                               value(planes[0], pair + 2)))
+
+        luma = value(planes[0], y * width + x)
+        if self._format == YUV_CHROMA_FORMAT[0]:
+            return [('Y', luma)]
+        if layout == 'semiplanar':
+            u, v = value(planes[1], chroma * 2), value(planes[1], chroma * 2 + 1)
+            if self._format == 'nv21':
+                u, v = v, u
+        else:
+            u, v = value(planes[1], chroma), value(planes[2], chroma)
+        return zip('YUV', (luma, u, v))
+
     def _get_volume(self):
         if self._player is None:
             return 0
@@ -95,6 +306,10 @@ class VideoYuv(VideoBase):
         self._player.volume = volume
 
     def _update(self, dt):
+        with profiler.measure('update'):
+            self._update_frame()
+
+    def _update_frame(self):
         player = self._player
         if player is None:
             return
@@ -106,29 +321,89 @@ class VideoYuv(VideoBase):
         frame = player.frame
         if frame is None:
             return
-        self._buffer = frame
 
-        size = player.frame_size
-        colorfmt = player.colorfmt
+        compare = None
+        if self._compare is not None:
+            self._compare.seek_frame(player.frame_index)
+            compare = self._compare.frame
+        planes = frame + (compare or (None, None, None))
+
+        size = player.frame_size * 2
+        colorfmt = (player.colorfmt, ) * 6
+
+        # 16 bit samples go up as two 8 bit channels and interleaved planes
+        # keep their sample pairs in one texel, the shader splits them apart
+        if player.colorfmt == OUT_COLOR_FORMAT[1]:
+            sample = 2 if player.bitdepth > 8 else 1
+            colorfmt = tuple(self.TEXTURE_COLORFMT.get(n * sample)
+                             for n in player.frame_samples) * 2
 
         if self._texture is None:
 
             def create_texture(index, size, colorfmt):
                 def populate_texture(texture):
                     texture.flip_vertical()
-                    texture.blit_buffer(self._buffer[index], size=size, colorfmt=colorfmt)
+                    if self._planes[index] is not None:
+                        texture.blit_buffer(self._planes[index], size=size, colorfmt=colorfmt)
                 texture = Texture.create(size=size, colorfmt=colorfmt)
                 texture.add_reload_observer(populate_texture)
                 texture.flip_vertical()
                 return texture
 
-            texture = [None, None, None]
+            # planes 0-2 show the player, planes 3-5 the compare loader
+            texture = [None] * 6
             for i in xrange(len(frame)):
-                if size[i] > 0:
-                    texture[i] = create_texture(i, size=size[i], colorfmt=colorfmt)
+                if size[i][0] > 0:
+                    texture[i] = create_texture(i, size=size[i], colorfmt=colorfmt[i])
+                if size[i][0] > 0 and self._compare is not None:
+                    texture[i+3] = create_texture(i+3, size=size[i], colorfmt=colorfmt[i])
             self._texture = texture
+            self._planes  = [None] * 6
             self.dispatch('on_load')
 
-        for i in xrange(len(frame)):
-            self._texture[i].blit_buffer(self._buffer[i], size=size[i], colorfmt=colorfmt)
-            self.dispatch('on_frame')
+        # planes of a mapped file are zero-copy buffers into the page cache
+        with profiler.measure('upload'):
+            for i in xrange(len(planes)):
+                if self._texture[i] is None or planes[i] is None:
+                    continue
+                self._upload(i, planes[i], size[i], colorfmt[i])
+        self.dispatch('on_frame')
+
+    def _upload(self, index, buf, size, colorfmt):
+        texture = self._texture[index]
+        last    = self._planes[index]
+        self._planes[index] = buf
+
+        if last is buf:
+            return
+        if last is None or len(last) != len(buf):
+            texture.blit_buffer(buf, size=size, colorfmt=colorfmt)
+            return
+
+        # still regions stay on the texture, only changed rows go up
+        stride = size[0] * self.TEXTURE_BYTES[colorfmt]
+        rows = self._changed_rows(last, buf, stride, size[1])
+        if rows is None:
+            return
+        top, bottom = rows
+        if top == 0 and bottom == size[1]:
+            texture.blit_buffer(buf, size=size, colorfmt=colorfmt)
+        else:
+            texture.blit_buffer(buf[top * stride:bottom * stride],
+                                size=(size[0], bottom - top),
+                                colorfmt=colorfmt, pos=(0, top))
+
+    def _changed_rows(self, last, buf, stride, height):
+        if last == buf:
+            return None
+
+        top = 0
+        while top < height and \
+              last[top * stride:(top + 1) * stride] == buf[top * stride:(top + 1) * stride]:
+            top += 1
+        bottom = height
+        while bottom > top and \
+              last[(bottom - 1) * stride:bottom * stride] == buf[(bottom - 1) * stride:bottom * stride]:
+            bottom -= 1
+
+        return top, bottom
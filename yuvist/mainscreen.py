@@ -32,6 +32,9 @@ from kivy.properties import StringProperty, ListProperty, \
 from kivy.uix.floatlayout import FloatLayout
 
 from yuvist.uix.messagebox import MessageBox
+from yuvist.uix.statsbox import StatsBox
+from yuvist.uix.profilebox import ProfileBox
+from yuvist.uix.pixelbox import PixelBox
 from yuvist.uix.frontpanel import FrontPanel
 from yuvist.uix.controller import Controller
 from yuvist.uix.popup_playitem import PlayitemPopup
@@ -42,6 +45,9 @@ from yuvist.uix.popup_yuvparam import YuvParamPopup
 Builder.load_string('''
 <MainScreen>:
     msgbox: msgbox
+    statsbox: statsbox
+    profilebox: profilebox
+    pixelbox: pixelbox
     display: display
     front: front
 
@@ -56,6 +62,27 @@ Builder.load_string('''
         id: msgbox
         pos: 10, root.height - self.height - 10
 
+    StatsBox:
+        id: statsbox
+        opacity: 0
+        pos: root.width - self.width - 10, root.height - self.height - 10
+
+    Label:
+        opacity: 1 if root.loading else 0
+        size_hint: (None, None)
+        size: self.texture_size
+        center: display.center
+        text: 'loading...'
+
+    ProfileBox:
+        id: profilebox
+        opacity: 0
+        pos: 10, display.y + 10
+
+    PixelBox:
+        id: pixelbox
+        opacity: 0
+
     FrontPanel:
         id: front
 ''')
@@ -64,6 +91,9 @@ Builder.load_string('''
 class MainScreen(FloatLayout):
 
     msgbox     = ObjectProperty(None)
+    statsbox   = ObjectProperty(None)
+    profilebox = ObjectProperty(None)
+    pixelbox   = ObjectProperty(None)
     display    = ObjectProperty(None)
     front      = ObjectProperty(None)
     controller = ObjectProperty(None, allownone=True)
@@ -72,6 +102,7 @@ class MainScreen(FloatLayout):
     playpath   = StringProperty('.')
     playlist   = ListProperty([])
 
+    loading          = BooleanProperty(False)
     fullscreen       = BooleanProperty(False)
     allow_fullscreen = BooleanProperty(True)
 
@@ -82,6 +113,13 @@ class MainScreen(FloatLayout):
         self.controller = Controller(display=self.display,
                                      playlist=self.playlist)
         self.controller.bind(message=self._on_message,
+                             show_stats=self._on_show_stats,
+                             frame_stats=self.statsbox.setter('stats'),
+                             show_profile=self._on_show_profile,
+                             loading=self.setter('loading'),
+                             show_pixel=self._on_show_pixel,
+                             pixel_info=self.pixelbox.setter('text'),
+                             profile=self.profilebox.setter('text'),
                              on_fullscreen=self._on_fullscreen,
                              on_customsize=self._on_customsize,
                              on_close=self._on_close,
@@ -90,6 +128,7 @@ class MainScreen(FloatLayout):
                              on_config_yuvparam=self._on_config_yuvparam)
 
         self.front.controller = self.controller
+        self.bind(playlist=self._on_playlist)
 
         window = EventLoop.window
         self._keyboard = window.request_keyboard(self._on_keyboard_closed, window)
@@ -161,9 +200,45 @@ class MainScreen(FloatLayout):
             self.front.show()
         return super(MainScreen, self).on_touch_down(touch)
 
+    def _on_playlist(self, instance, value):
+        # the controller shares the list, items added, removed or replaced
+        # in place only fire the property here
+        self.controller.property('playlist').dispatch(self.controller)
+
     def _on_message(self, instance, value):
         self.msgbox.show(value)
 
+    def _on_show_stats(self, instance, value):
+        if value:
+            self.statsbox.show()
+        else:
+            self.statsbox.hide()
+
+    def _on_show_profile(self, instance, value):
+        if value:
+            self.profilebox.show()
+        else:
+            self.profilebox.hide()
+
+    def _on_show_pixel(self, instance, value):
+        window = EventLoop.window
+        if value:
+            window.bind(mouse_pos=self._on_mouse_pos)
+            instance.bind(position=self._on_pixel_position)
+            self._on_mouse_pos(window, window.mouse_pos)
+        else:
+            window.unbind(mouse_pos=self._on_mouse_pos)
+            instance.unbind(position=self._on_pixel_position)
+            self.pixelbox.hide()
+
+    def _on_mouse_pos(self, window, pos):
+        self.controller.inspect_pixel(pos)
+        self.pixelbox.show_at(self.to_widget(*pos), self.size)
+
+    def _on_pixel_position(self, instance, value):
+        # samples under a still cursor change with the frame
+        self._on_mouse_pos(EventLoop.window, EventLoop.window.mouse_pos)
+
     def _on_fullscreen(self, instance, *largs):
         if self.allow_fullscreen:
             self.fullscreen = not self.fullscreen
@@ -243,7 +318,9 @@ class MainScreen(FloatLayout):
 
         window = EventLoop.window
         size = (window.size[0] - 160, window.size[1] - 100)
-        self.popup = PlaylistPopup(playlist=self.playlist, confirm=confirm, size=size)
+        self.popup = PlaylistPopup(playlist=self.playlist,
+                                   info=self.controller.playlist_info,
+                                   confirm=confirm, size=size)
         self.popup.bind(on_dismiss=dismiss)
         self.popup.open()
 
@@ -254,17 +331,18 @@ class MainScreen(FloatLayout):
         if self.popup is not None:
             self.popup.dismiss()
 
-        source, format, colorfmt, yuv_size, yuv_fps = instance.playitem
+        source, format, colorfmt, yuv_size, yuv_fps, bitdepth = instance.playitem
 
-        def confirm(format, yuv_size):
-            playitem = [source, format, colorfmt, yuv_size, yuv_fps]
-            self.dispatch('on_open_playitem', playitem)
+        def confirm(format, yuv_size, bitdepth):
+            playitem = [source, format, colorfmt, yuv_size, yuv_fps, bitdepth]
+            self.controller.dispatch('on_open_playitem', playitem)
             self.msgbox.show('play video')
 
         def dismiss(*largs):
             self.popup = None
 
-        self.popup = YuvParamPopup(format=format, yuv_size=yuv_size, confirm=confirm)
+        self.popup = YuvParamPopup(format=format, yuv_size=yuv_size,
+                                   bitdepth=bitdepth, confirm=confirm)
         self.popup.bind(on_dismiss=dismiss)
         self.popup.open()
 
@@ -338,6 +416,43 @@ class MainScreen(FloatLayout):
             controller.dispatch('on_config_yuvparam')
             return True
 
+        if keycode[1] == 'c' and 'meta' not in modifiers:
+            controller.dispatch('on_next_compare')
+            return True
+        if keycode[1] == 'm' and 'meta' not in modifiers:
+            controller.dispatch('on_next_matrix')
+            return True
+        if keycode[1] == 'r' and 'meta' not in modifiers:
+            controller.dispatch('on_next_range')
+            return True
+        if keycode[1] == 'u' and 'meta' not in modifiers:
+            controller.dispatch('on_next_chroma')
+            return True
+        if keycode[1] == 'i' and 'meta' not in modifiers:
+            controller.dispatch('on_show_playback')
+            return True
+        if keycode[1] == 's' and 'meta' not in modifiers:
+            controller.dispatch('on_toggle_stats')
+            return True
+        if keycode[1] == 'p' and 'meta' not in modifiers:
+            controller.dispatch('on_toggle_profile')
+            return True
+        if keycode[1] == 'v' and 'meta' not in modifiers:
+            controller.dispatch('on_toggle_pixel')
+            return True
+        if keycode[1] == '=' and 'meta' not in modifiers:
+            controller.dispatch('on_zoom_in')
+            return True
+        if keycode[1] == '-' and 'meta' not in modifiers:
+            controller.dispatch('on_zoom_out')
+            return True
+        if keycode[1] == '0' and 'meta' not in modifiers:
+            controller.dispatch('on_zoom_reset')
+            return True
+        if keycode[1] == 'x' and 'meta' not in modifiers:
+            controller.dispatch('on_toggle_region')
+            return True
+
         if keycode[1] == 'q' and 'meta' in modifiers:
             controller.dispatch('on_close')
             return True
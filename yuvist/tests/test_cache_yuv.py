@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from yuvist.core.video.cache_yuv import CacheYuv
+
+
+def frame(nbytes):
+    # a 4:2:0 like frame, the third plane left out as packed formats do
+    return 'y' * nbytes, 'u' * (nbytes // 2), None
+
+
+class CacheYuvTestCase(unittest.TestCase):
+
+    def test_get_put(self):
+        cache = CacheYuv(limit=1000)
+        self.assertEqual(cache.get('a'), None)
+        cache.put('a', frame(100))
+        self.assertEqual(cache.get('a'), frame(100))
+        self.assertEqual((len(cache), cache.used), (1, 150))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evict_oldest(self):
+        cache = CacheYuv(limit=450)
+        for key in 'abc':
+            cache.put(key, frame(100))
+        cache.put('d', frame(100))
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual([key for key in 'bcd' if cache.get(key)], list('bcd'))
+        self.assertEqual(cache.used, 450)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_evict_least_recent(self):
+        # a hit moves the entry to the back of the queue
+        cache = CacheYuv(limit=450)
+        for key in 'abc':
+            cache.put(key, frame(100))
+        cache.get('a')
+        cache.put('d', frame(100))
+        self.assertEqual(cache.get('b'), None)
+        self.assertNotEqual(cache.get('a'), None)
+
+    def test_info(self):
+        cache = CacheYuv(limit=350)
+        for key in 'abc':
+            cache.put(key, frame(100))
+        cache.get('a')
+        cache.get('c')
+        self.assertEqual(cache.info(), dict(entries=2, used=300, limit=350,
+                                            hits=1, misses=1, evictions=1))
+
+    def test_replace(self):
+        cache = CacheYuv(limit=450)
+        cache.put('a', frame(100))
+        cache.put('a', frame(200))
+        self.assertEqual((len(cache), cache.used), (1, 300))
+
+    def test_too_large(self):
+        cache = CacheYuv(limit=100)
+        cache.put('a', frame(100))
+        self.assertEqual((len(cache), cache.used), (0, 0))
+
+    def test_limit(self):
+        # lowering the cap evicts at once, zero disables the cache
+        cache = CacheYuv(limit=450)
+        for key in 'abc':
+            cache.put(key, frame(100))
+        cache.limit = 300
+        self.assertEqual((len(cache), cache.used), (2, 300))
+        self.assertEqual(cache.get('a'), None)
+        cache.limit = 0
+        self.assertEqual((len(cache), cache.used), (0, 0))
+        cache.put('e', frame(1))
+        self.assertEqual(len(cache), 0)
+
+    def test_clear(self):
+        cache = CacheYuv(limit=450)
+        cache.put('a', frame(100))
+        cache.clear()
+        self.assertEqual((len(cache), cache.used, cache.get('a')), (0, 0, None))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
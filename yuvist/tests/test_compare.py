@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import sys
+import json
+import unittest
+from math import log10
+from random import Random
+from shutil import rmtree
+from StringIO import StringIO
+from tempfile import mkdtemp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yuvist.tools import compare
+
+
+SIZE   = [32, 16]
+FRAMES = 3
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class CompareTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = mkdtemp()
+        rand = Random(5)
+        # levels kept off the ends so an offset never clips
+        self.clip = bytearray(rand.randrange(16, 236)
+                              for i in xrange(SIZE[0] * SIZE[1] * 3 // 2 * FRAMES))
+        self.reference = self.write('reference.yuv', self.clip)
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def write(self, name, data):
+        filename = os.path.join(self.path, name)
+        with open(filename, 'wb') as fp:
+            fp.write(str(data))
+        return filename
+
+    def compare(self, distorted, *args):
+        # the summary goes to stdout, the report is read back from the file
+        output = os.path.join(self.path, 'report.json')
+        args = ['--format', 'yuv420', '--size', str(SIZE[0]), str(SIZE[1]),
+                '--bitdepth', '8', '-j', '1', '-o', output] + list(args) + \
+               [self.reference, distorted]
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+        try:
+            result = compare.main(args)
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+        if result != 0:
+            return result, None
+        with open(output) as fp:
+            return result, json.load(fp)
+
+    def test_identical(self):
+        distorted = self.write('distorted.yuv', self.clip)
+        result, report = self.compare(distorted)
+        self.assertEqual(result, 0)
+        self.assertEqual([frame['frame'] for frame in report['frames']], range(FRAMES))
+        for plane in compare.PLANE_NAMES:
+            summary = report['summary'][plane]
+            self.assertEqual(summary['psnr_avg'], float('inf'))
+            self.assertEqual(summary['psnr_global'], float('inf'))
+            self.assertAlmostEqual(summary['ssim_avg'], 1.)
+            for frame in report['frames']:
+                self.assertEqual(frame[plane]['mse'], 0.)
+                self.assertAlmostEqual(frame[plane]['ssim'], 1.)
+
+    def test_offset(self):
+        distorted = self.write('distorted.yuv', bytearray(c + 4 for c in self.clip))
+        result, report = self.compare(distorted, '--no-ssim')
+        self.assertEqual(result, 0)
+        expected = 10. * log10(255. * 255. / 16.)
+        for plane in compare.PLANE_NAMES:
+            summary = report['summary'][plane]
+            self.assertAlmostEqual(summary['psnr_avg'], expected)
+            self.assertAlmostEqual(summary['psnr_global'], expected)
+            self.assertAlmostEqual(summary['psnr_min'], expected)
+            self.assertEqual(summary['ssim_avg'], None)
+            for frame in report['frames']:
+                self.assertEqual(frame[plane]['mse'], 16.)
+
+    def test_frame_count(self):
+        frame = SIZE[0] * SIZE[1] * 3 // 2
+        distorted = self.write('distorted.yuv', self.clip[:-frame])
+        self.assertEqual(self.compare(distorted)[0], 1)
+
+    def test_size(self):
+        # a clip of another size does not split into whole frames
+        distorted = self.write('distorted.yuv', self.clip + bytearray(100))
+        self.assertEqual(self.compare(distorted)[0], 1)
+
+    def test_ssim(self):
+        a = numpy.arange(256, dtype=numpy.uint8).reshape(16, 16)
+        self.assertAlmostEqual(compare.plane_ssim(a, a), 1.)
+        self.assertTrue(compare.plane_ssim(a, a[::-1]) < .5)
+        self.assertEqual(compare.plane_psnr(0.), float('inf'))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+from random import Random
+from struct import pack
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_CONVERT_TYPE, YUV_CHROMA_FILTER, YUV_CHROMA_SITING
+from yuvist.core.video.convert_yuv import ConvertYuv
+
+
+SIZE = [16, 8]
+
+
+def random_plane(rand, size, bitdepth):
+    count = size[0] * size[1]
+    if bitdepth <= 8:
+        return str(bytearray(rand.randrange(256) for i in xrange(count)))
+    top = 1 << bitdepth
+    return pack('<%dH' % count, *[rand.randrange(top) for i in xrange(count)])
+
+
+def random_frame(rand, format, size, bitdepth):
+    subpixel = YUV_CHROMA_SUBPIXEL[format]
+    csize = size[0] // subpixel[0], size[1] // subpixel[1]
+    if format == YUV_CHROMA_FORMAT[0]:
+        csize = (0, 0)
+    return random_plane(rand, size, bitdepth), \
+           random_plane(rand, csize, bitdepth), \
+           random_plane(rand, csize, bitdepth)
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class ConvertArrayTestCase(unittest.TestCase):
+
+    def check(self, format, bitdepth, **kwargs):
+        buf = random_frame(Random(format), format, SIZE, bitdepth)
+        for type in YUV_CONVERT_TYPE:
+            convert = ConvertYuv(type=type, format=format, size=SIZE,
+                                 bitdepth=bitdepth, **kwargs)
+            self.assertEqual(convert.convert_array(buf), convert.convert_raster(buf),
+                             '%s %s %dbit %r' % (type, format, bitdepth, kwargs))
+
+    def test_formats(self):
+        for format in YUV_CHROMA_SUBPIXEL:
+            self.check(format, 8)
+
+    def test_bitdepths(self):
+        for format in (YUV_CHROMA_FORMAT[1], YUV_CHROMA_FORMAT[4]):
+            for bitdepth in (10, 12, 16):
+                self.check(format, bitdepth)
+
+    def test_chroma_filters(self):
+        for format in YUV_CHROMA_SUBPIXEL:
+            for siting in YUV_CHROMA_SITING:
+                self.check(format, 8, filter=YUV_CHROMA_FILTER[1], siting=siting)
+        self.check(YUV_CHROMA_FORMAT[1], 10, filter=YUV_CHROMA_FILTER[1])
+
+
+def legacy_rgb(type, y, u, v):
+    # the bt601 limited converter yuvist started with, pixel by pixel
+    clip = lambda value: min(max(0, value), 255)
+    if type == 'float':
+        r = 1.164 * (y-16)                   + 1.596 * (v-128)
+        g = 1.164 * (y-16) - 0.391 * (u-128) - 0.813 * (v-128)
+        b = 1.164 * (y-16) + 2.018 * (u-128)
+        return clip(int(r)), clip(int(g)), clip(int(b))
+    if type == 'int':
+        r = 298 * (y-16)                 + 409 * (v-128)
+        g = 298 * (y-16) - 100 * (u-128) - 208 * (v-128)
+        b = 298 * (y-16) + 516 * (u-128)
+        return clip((r+128)>>8), clip((g+128)>>8), clip((b+128)>>8)
+    # type == 'table'
+    half = 1 << 15
+    r = y + ((89858 * (v-128) + half) >> 16)
+    g = y + ((-45773 * (v-128) - 22014 * (u-128) + half) >> 16)
+    b = y + ((113618 * (u-128) + half) >> 16)
+    return tuple(clip(((c-16) * 76283 + half) >> 16) for c in (r, g, b))
+
+
+class ConvertLegacyTestCase(unittest.TestCase):
+
+    def test_default_output(self):
+        # every pixel of a 4:2:0 frame against the original constants
+        ybuf, ubuf, vbuf = random_frame(Random('legacy'), YUV_CHROMA_FORMAT[1],
+                                        SIZE, 8)
+        ybuf, ubuf, vbuf = bytearray(ybuf), bytearray(ubuf), bytearray(vbuf)
+        width, cwidth = SIZE[0], SIZE[0] // 2
+
+        for type in YUV_CONVERT_TYPE:
+            expected = bytearray()
+            for posy in xrange(SIZE[1]):
+                for posx in xrange(width):
+                    p = cwidth * (posy // 2) + posx // 2
+                    expected.extend(legacy_rgb('table' if type == 'lut' else type,
+                                               ybuf[width * posy + posx],
+                                               ubuf[p], vbuf[p]))
+            convert = ConvertYuv(type=type, size=SIZE)
+            self.assertEqual(convert.convert(map(str, (ybuf, ubuf, vbuf)))[0],
+                             str(expected), type)
+
+    def test_every_sample(self):
+        # all 2^24 inputs are too many, a grid reaching both ends of each
+        convert = dict((type, ConvertYuv(type=type, size=SIZE))
+                       for type in ('float', 'int', 'table'))
+        for y in xrange(0, 256, 3):
+            for u in xrange(0, 256, 15):
+                for v in xrange(0, 256, 17):
+                    for type, instance in convert.iteritems():
+                        self.assertEqual(getattr(instance, 'rgb_' + type)(y, u, v),
+                                         legacy_rgb(type, y, u, v),
+                                         '%s %d %d %d' % (type, y, u, v))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
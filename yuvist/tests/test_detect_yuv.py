@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import unittest
+from math import sin, cos
+from random import Random
+from shutil import rmtree
+from struct import pack
+from tempfile import mkdtemp
+
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_BITDEPTH, YUV_SIZE_LIST
+from yuvist.core.video.detect_yuv import DetectYuv
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+def samples(values, bitdepth):
+    if bitdepth > 8:
+        return pack('<%dH' % len(values), *values)
+    return str(bytearray(values))
+
+
+def luma(rand, size, nframe, bitdepth):
+    # smooth detail drifting slowly from frame to frame, with some noise
+    width, height = size
+    top = (1 << bitdepth) - 1
+    values = []
+    for y in xrange(height):
+        for x in xrange(width):
+            level = .5 + .4 * sin(x * .11 + nframe * .05) * cos(y * .07 - nframe * .03)
+            noise = rand.randrange(-top // 32, top // 32 + 1)
+            values.append(min(max(int(level * top) + noise, 0), top))
+    return samples(values, bitdepth)
+
+
+def chroma(size, nframe, bitdepth):
+    # chroma stays near the middle, luma carries the detail
+    width, height = size
+    mid = 1 << (bitdepth - 1)
+    return samples([int(mid + mid // 8 * sin(x * .05 + y * .03 + nframe * .2))
+                    for y in xrange(height) for x in xrange(width)], bitdepth)
+
+
+class DetectYuvTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def write(self, name, format, size, bitdepth=8, frames=3, flat=False):
+        filename = os.path.join(self.path, name)
+        sx, sy = YUV_CHROMA_SUBPIXEL[format]
+        csize = size[0] // sx, size[1] // sy
+        rand = Random(name)
+        with open(filename, 'wb') as fp:
+            for nframe in xrange(frames):
+                if flat:
+                    fp.write('\0' * DetectYuv.frame_bytes(format, size, bitdepth))
+                    continue
+                fp.write(luma(rand, size, nframe, bitdepth))
+                if format != YUV_CHROMA_FORMAT[0]:
+                    fp.write(chroma(csize, nframe, bitdepth))
+                    fp.write(chroma(csize, nframe + 5, bitdepth))
+        return filename
+
+    def test_frame_bytes(self):
+        filename = self.write('any.yuv', 'yuv420', [16, 16], flat=True)
+        sizes = [size for size, name in YUV_SIZE_LIST] + [(15, 9), (7, 4)]
+        for format in YUV_CHROMA_SUBPIXEL:
+            for size in sizes:
+                for bitdepth in YUV_BITDEPTH:
+                    try:
+                        reader = ReaderYuv(filename=filename, format=format,
+                                           size=list(size), bitdepth=bitdepth)
+                    except Exception:
+                        expected = 0
+                    else:
+                        expected = reader.frame_bytes
+                        reader.close()
+                    self.assertEqual(DetectYuv.frame_bytes(format, list(size), bitdepth),
+                                     expected, '%s %r %dbit' % (format, size, bitdepth))
+
+    def test_parse_name(self):
+        names = {
+            'foreman_352x288.yuv'         : (None, [352, 288], None),
+            'clip_cif_420p.yuv'           : ('yuv420', [352, 288], None),
+            'park_1280x720_yuv420p.yuv'   : ('yuv420', [1280, 720], None),
+            'tears_2160p_yuv420p10le.yuv' : ('yuv420', [3840, 2160], 10),
+            'seq_1280x720_420p10.yuv'     : ('yuv420', [1280, 720], 10),
+            'movie_1080p_nv12.yuv'        : ('nv12', [1920, 1080], None),
+            'cam-qcif-yuy2-8bit.yuv'      : ('yuyv', [176, 144], 8),
+            'ffmpeg_422_176x144.yuv'      : ('yuv422v', [176, 144], None),
+            'noname.yuv'                  : (None, None, None)
+        }
+        for name, expected in names.iteritems():
+            filename = self.write(name, 'yuv400', [16, 16], flat=True)
+            self.assertEqual(DetectYuv(filename=filename).parse_name(), expected, name)
+
+    def test_detect_name(self):
+        clips = (
+            ('clip_176x144_nv12.yuv', 'nv12', [176, 144], 8),
+            ('clip_qcif_444.yuv', 'yuv444', [176, 144], 8),
+            ('clip_cif_420p.yuv', 'yuv420', [352, 288], 8),
+            ('seq_176x144_420p10.yuv', 'yuv420', [176, 144], 10),
+            ('cam_352x288_uyvy.yuv', 'uyvy', [352, 288], 8)
+        )
+        for name, format, size, bitdepth in clips:
+            filename = self.write(name, format, size, bitdepth, frames=2, flat=True)
+            self.assertEqual(DetectYuv(filename=filename).detect(),
+                             (format, size, bitdepth), name)
+
+    def test_detect_content(self):
+        clips = (
+            ('yuv420', [176, 144], 8),
+            ('yuv444', [176, 144], 8),
+            ('yuv420', [176, 144], 10)
+        )
+        for format, size, bitdepth in clips:
+            filename = self.write('noname.yuv', format, size, bitdepth)
+            self.assertEqual(DetectYuv(filename=filename).detect(),
+                             (format, size, bitdepth),
+                             '%s %r %dbit' % (format, size, bitdepth))
+
+    def test_missing(self):
+        self.assertRaises(Exception, DetectYuv,
+                          filename=os.path.join(self.path, 'missing.yuv'))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
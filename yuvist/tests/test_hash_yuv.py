@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import json
+import unittest
+from random import Random
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from yuvist.core.video.hash_yuv import HashYuv
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+SIZE = [64, 48]
+
+
+class HashYuvTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = mkdtemp()
+        self.filename = os.path.join(self.path, 'clip.yuv')
+
+        rand = Random(7)
+        frame = lambda: bytearray(rand.randrange(256)
+                                  for i in xrange(SIZE[0] * SIZE[1] * 3 // 2))
+        a, b, c, d, e = [frame() for i in xrange(5)]
+        # a sample off by a few levels hashes apart but looks the same
+        near = bytearray(c)
+        near[100] = (near[100] + 3) % 256
+
+        # 2 repeats 0, 4 is close to 3, 6 repeats 5
+        self.frames = a, b, a, c, near, d, d, e
+        with open(self.filename, 'wb') as fp:
+            for data in self.frames:
+                fp.write(str(data))
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def scan(self, **kwargs):
+        reader = ReaderYuv(filename=self.filename, format='yuv420', size=SIZE)
+        hasher = HashYuv(filename=self.filename, format='yuv420', size=SIZE,
+                         **kwargs)
+        records = [hasher.flag(nframe, *hasher.compute(reader.read_planar(nframe)))
+                   for nframe in xrange(reader.frames)]
+        reader.close()
+        return hasher, records
+
+    def test_flag(self):
+        hasher, records = self.scan()
+        self.assertEqual(hasher.frames, len(self.frames))
+        self.assertEqual([record['duplicate'] for record in records],
+                         [None, None, 0, None, None, None, 5, None])
+        self.assertEqual([record['near'] for record in records],
+                         [None, None, None, None, 3, None, None, None])
+        self.assertEqual(records[0]['distance'], None)
+        self.assertEqual(records[6]['distance'], 0)
+        self.assertNotEqual(records[3]['hash'], records[4]['hash'])
+
+    def test_threshold(self):
+        # nothing is near at a zero threshold, exact duplicates still are
+        hasher, records = self.scan(threshold=0.)
+        self.assertEqual([record['near'] for record in records], [None] * 8)
+        self.assertEqual(records[2]['duplicate'], 0)
+
+    def test_load(self):
+        hasher, records = self.scan()
+        with open(hasher.sidecar, 'w') as fp:
+            fp.write(json.dumps(hasher.key(), sort_keys=True) + '\n')
+            for record in records:
+                fp.write(json.dumps(record, sort_keys=True) + '\n')
+
+        # any grid reads the index back, only flagged frames come out
+        loaded = HashYuv(filename=self.filename, format='yuv420', size=SIZE,
+                         grid=8).load()
+        self.assertEqual([record['frame'] for record in loaded], [2, 4, 6])
+        self.assertEqual(hasher.markers(loaded),
+                         [(2, 2, 'duplicate'), (4, 4, 'near'), (6, 6, 'duplicate')])
+
+        # a changed file leaves the index stale
+        with open(self.filename, 'ab') as fp:
+            fp.write(str(self.frames[0]))
+        self.assertEqual(hasher.load(), None)
+
+    def test_markers(self):
+        records = [dict(frame=3, duplicate=1, near=None),
+                   dict(frame=4, duplicate=2, near=None),
+                   dict(frame=5, duplicate=None, near=4),
+                   dict(frame=9, duplicate=None, near=8),
+                   dict(frame=10, duplicate=None, near=9)]
+        hasher = HashYuv(filename=self.filename, format='yuv420', size=SIZE)
+        self.assertEqual(hasher.markers(records),
+                         [(3, 4, 'duplicate'), (5, 5, 'near'), (9, 10, 'near')])
+
+    def test_grid(self):
+        self.assertRaises(Exception, HashYuv, filename=self.filename,
+                          format='yuv420', size=SIZE, grid=0)
+        self.assertRaises(Exception, HashYuv, filename=self.filename,
+                          format='yuv420', size=SIZE, grid=49)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import time
+import unittest
+from tempfile import mkstemp
+from threading import Event, Timer
+
+from yuvist.core.video import OUT_COLOR_FORMAT
+from yuvist.core.video.loader_yuv import LoaderYuv
+
+
+SIZE   = [16, 8]
+FRAMES = 12
+
+
+class GatedLoaderYuv(LoaderYuv):
+    # holds the read of one frame until the gate opens
+
+    def __init__(self, **kwargs):
+        self.gate   = Event()
+        self.gated  = kwargs.pop('gated', None)
+        self.reads  = []
+        self.inside = Event()
+        super(GatedLoaderYuv, self).__init__(**kwargs)
+
+    def _read_image(self, nframe):
+        if nframe == self.gated:
+            self.inside.set()
+            self.gate.wait(10)
+        self.reads.append(nframe)
+        return super(GatedLoaderYuv, self)._read_image(nframe)
+
+
+class LoaderYuvTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = mkstemp(suffix='.yuv')
+        # every byte of frame n is n, a frame tells where it came from
+        with os.fdopen(fd, 'wb') as fp:
+            for n in xrange(FRAMES):
+                fp.write(chr(n) * (SIZE[0] * SIZE[1] * 3 // 2))
+        self.loaders = []
+
+    def tearDown(self):
+        for loader in self.loaders:
+            loader.gate.set()
+            loader.unload()
+        os.remove(self.filename)
+
+    def open(self, gated=None, depth=4):
+        loader = GatedLoaderYuv(filename=self.filename, format='yuv420',
+                                colorfmt=OUT_COLOR_FORMAT[1], size=SIZE,
+                                buffer_depth=depth, cache=None, gated=gated)
+        self.loaders.append(loader)
+        return loader
+
+    def shown(self, loader):
+        buf = loader.frame
+        self.assertNotEqual(buf, None)
+        values = set(str(buf[0]))
+        self.assertEqual(len(values), 1)
+        return ord(values.pop())
+
+    def test_seek_unloaded(self):
+        loader = LoaderYuv()
+        loader.seek_frame(3)
+        self.assertEqual(loader.frame_index, -1)
+        self.assertEqual(loader.frame, None)
+
+    def test_order(self):
+        loader = self.open()
+        for nframe in xrange(FRAMES):
+            loader.seek_frame(nframe)
+            self.assertEqual(self.shown(loader), nframe)
+        # the producer stops at the last frame
+        self.assertEqual(loader.buffer_fill[0], 0)
+
+    def test_depth(self):
+        loader = self.open()
+        loader.seek_frame(0)
+        deadline = time.time() + 10
+        while loader.buffer_fill[0] < 4 and time.time() < deadline:
+            time.sleep(.01)
+        self.assertEqual(loader.buffer_fill, (4, 4))
+        self.assertEqual([n for n, buf in loader._ring], [1, 2, 3, 4])
+
+    def test_seek_serial(self):
+        # the frame read before the seek is dropped, not shown or kept
+        loader = self.open(gated=1)
+        loader.seek_frame(0)
+        self.assertTrue(loader.inside.wait(10))
+        Timer(.05, loader.gate.set).start()
+        loader.seek_frame(8)
+        self.assertEqual(self.shown(loader), 8)
+        self.assertEqual(loader.reads[:3], [0, 1, 8])
+        with loader._ring_cond:
+            self.assertTrue(all(n > 8 for n, buf in loader._ring))
+
+    def test_unload_reading(self):
+        loader = self.open(gated=1)
+        loader.seek_frame(0)
+        self.assertTrue(loader.inside.wait(10))
+        start = time.time()
+        loader.unload(block=False)
+        self.assertLess(time.time() - start, 1)
+        loader.gate.set()
+        deadline = time.time() + 10
+        while loader._thread is not None and time.time() < deadline:
+            time.sleep(.01)
+        self.assertEqual(loader._thread, None)
+        self.assertEqual(loader._reader, None)
+        self.assertEqual(loader.buffer_fill[0], 0)
+
+    def test_unload_blocking(self):
+        loader = self.open(gated=1)
+        loader.seek_frame(0)
+        self.assertTrue(loader.inside.wait(10))
+        Timer(.05, loader.gate.set).start()
+        loader.unload()
+        self.assertEqual(loader._thread, None)
+        self.assertEqual(loader.buffer_fill[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import unittest
+from random import Random
+from tempfile import mkstemp
+
+from yuvist.core.video import YUV_CHROMA_SUBPIXEL
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+SIZE   = [24, 12]
+FRAMES = 3
+
+
+def crop(plane, width, sample, x, y, w, h):
+    stride = width * sample
+    return ''.join(plane[row * stride + x * sample:row * stride + (x + w) * sample]
+                   for row in xrange(y, y + h))
+
+
+class ReaderRegionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = mkstemp(suffix='.yuv')
+        rand = Random(1)
+        # the largest frame of the formats below, 16 bit 4:4:4
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(str(bytearray(rand.randrange(256) for i in
+                                   xrange(SIZE[0] * SIZE[1] * 6 * FRAMES))))
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def check(self, format, bitdepth, region, mmap=False):
+        full = ReaderYuv(filename=self.filename, format=format, size=SIZE,
+                         bitdepth=bitdepth)
+        part = ReaderYuv(filename=self.filename, format=format, size=SIZE,
+                         bitdepth=bitdepth, region=region, mmap=mmap)
+        try:
+            x, y, w, h = part.region
+            sx, sy = YUV_CHROMA_SUBPIXEL[format]
+            sample = 2 if bitdepth > 8 else 1
+            self.assertTrue(part.read_bytes <= full.frame_bytes)
+
+            for nframe in xrange(full.frames):
+                planes = full.read_planar(nframe)
+                for i, plane in enumerate(part.read_planar(nframe)):
+                    size = full.planar_size[i]
+                    if not size[0]:
+                        self.assertFalse(plane)
+                        continue
+                    scale = (1, 1) if i == 0 else (sx, sy)
+                    expected = crop(str(planes[i]), size[0], sample,
+                                    x // scale[0], y // scale[1],
+                                    w // scale[0], h // scale[1])
+                    self.assertEqual(str(plane), expected, '%s %dbit %r plane %d '
+                                     'frame %d' % (format, bitdepth, region, i, nframe))
+        finally:
+            full.close()
+            part.close()
+
+    def test_formats(self):
+        for format in YUV_CHROMA_SUBPIXEL:
+            self.check(format, 8, [4, 2, 8, 6])
+            self.check(format, 8, [4, 2, 8, 6], mmap=True)
+
+    def test_bitdepths(self):
+        for format in ('yuv420', 'nv12', 'yuyv'):
+            self.check(format, 10, [6, 4, 10, 4])
+            self.check(format, 16, [6, 4, 10, 4], mmap=True)
+
+    def test_alignment(self):
+        # odd corners move out to the chroma grid, the frame clips the rest
+        reader = ReaderYuv(filename=self.filename, format='yuv420', size=SIZE,
+                           region=[3, 5, 30, 30])
+        reader.close()
+        self.assertEqual(reader.region, [2, 4, 22, 8])
+        for region in ([3, 5, 7, 3], [0, 0, 24, 12], [20, 10, 30, 30]):
+            self.check('yuv420', 8, region)
+            self.check('yuv422v', 8, region)
+
+    def test_empty(self):
+        self.assertRaises(Exception, ReaderYuv, filename=self.filename,
+                          size=SIZE, region=[24, 0, 4, 4])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import time
+import unittest
+from random import Random
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from yuvist.core.video.thumbnail_yuv import ThumbnailYuv
+
+
+SIZE   = [64, 48]
+FRAMES = 40
+
+
+class ThumbnailYuvTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = mkdtemp()
+        self.filename = os.path.join(self.path, 'clip.yuv')
+        rand = Random(11)
+        with open(self.filename, 'wb') as fp:
+            fp.write(str(bytearray(rand.randrange(256) for i in
+                                   xrange(SIZE[0] * SIZE[1] * 3 // 2 * FRAMES))))
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def thumbnails(self):
+        return ThumbnailYuv(filename=self.filename, format='yuv420', size=SIZE)
+
+    def build(self, thumbs):
+        thumbs.start()
+        deadline = time.time() + 10
+        while not thumbs.done and time.time() < deadline:
+            time.sleep(.01)
+        # the builder flushes the sidecar as it leaves
+        thumbs.stop()
+        return [thumbs.get(thumbs.frame_of(i)) for i in xrange(thumbs.count)]
+
+    def test_build(self):
+        thumbs = self.thumbnails()
+        expected = self.build(thumbs)
+        self.assertTrue(thumbs.done)
+        self.assertEqual(len(expected), FRAMES)
+        self.assertEqual(len(expected[0]), thumbs.size[0] * thumbs.size[1] * 3)
+
+        # the sidecar gives back the same thumbnails without building
+        loaded = self.thumbnails()
+        self.assertTrue(loaded.done)
+        self.assertEqual([loaded.get(loaded.frame_of(i)) for i in xrange(loaded.count)],
+                         expected)
+
+    def test_restart(self):
+        # a builder stopped without waiting is still on its last thumbnail
+        # when a new one starts on the same sidecar, the new one waits
+        expected = self.build(self.thumbnails())
+        os.remove(self.filename + ThumbnailYuv.SIDECAR_EXT)
+
+        events = []
+
+        class Recorded(ThumbnailYuv):
+            def _thumbnail(self, reader, convert, nframe):
+                if self.name == 'old':
+                    time.sleep(.05)
+                thumb = ThumbnailYuv._thumbnail(self, reader, convert, nframe)
+                events.append((self.name, nframe))
+                return thumb
+
+        old = Recorded(filename=self.filename, format='yuv420', size=SIZE)
+        old.name = 'old'
+        old.start()
+        time.sleep(.02)
+        old.stop(block=False)
+
+        new = Recorded(filename=self.filename, format='yuv420', size=SIZE)
+        new.name = 'new'
+        self.assertEqual(self.build(new), expected)
+
+        names = [name for name, nframe in events]
+        self.assertEqual(names, sorted(names, reverse=True))
+        self.assertTrue('old' in names)
+
+        loaded = self.thumbnails()
+        self.assertTrue(loaded.done)
+        self.assertEqual([loaded.get(loaded.frame_of(i))
+                          for i in xrange(loaded.count)], expected)
+
+if __name__ == '__main__':
+
+    unittest.main()
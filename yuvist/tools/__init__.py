@@ -18,4 +18,17 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-__all__ = ()
+__all__ = ('TOOLS', 'run_tool')
+
+from importlib import import_module
+
+
+# headless subcommands, each one is a module with main(args) in this package
+TOOLS = ('convert', 'compare', 'stats', 'dups', 'benchmark')
+
+
+def run_tool(name, args):
+    if name not in TOOLS:
+        raise ValueError('unknown tool %r' % name)
+    tool = import_module('yuvist.tools.%s' % name)
+    return tool.main(args)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('synthetic_file', 'measure', 'main')
+
+import sys
+import json
+import platform
+from os import urandom, remove
+from os.path import join, exists
+from shutil import rmtree
+from tempfile import mkdtemp
+from timeit import default_timer
+from zlib import crc32
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yuvist.command import BenchmarkCommand
+from yuvist.core.video import YUV_CONVERT_TYPE, OUT_COLOR_FORMAT
+from yuvist.core.video.convert_yuv import ConvertYuv
+from yuvist.core.video.loader_yuv import LoaderYuv
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+CONVERT_METHODS = YUV_CONVERT_TYPE
+FRAMES          = 2     # frames per synthetic file, reads alternate between them
+
+
+def synthetic_file(path, format, size, bitdepth, frames=FRAMES):
+    # random samples within the bit depth, every frame different
+    filename = join(path, 'bench_%s_%dx%d_%dbit.yuv' % (
+        format, size[0], size[1], bitdepth))
+    open(filename, 'wb').close()
+    reader = ReaderYuv(filename=filename, format=format, size=size,
+                       bitdepth=bitdepth)
+    nbytes = reader.frame_bytes
+    reader.close()
+
+    with open(filename, 'wb') as fp:
+        for nframe in xrange(frames):
+            data = urandom(nbytes)
+            if bitdepth > 8:
+                samples = numpy.frombuffer(data, dtype='<u2') >> (16 - bitdepth)
+                data = samples.astype('<u2').tostring()
+            fp.write(data)
+    return filename
+
+
+def measure(run, seconds):
+    # median time of one call over at least three calls and seconds in total
+    times = []
+    begin = default_timer()
+    while len(times) < 3 or default_timer() - begin < seconds:
+        start = default_timer()
+        run(len(times))
+        times.append(default_timer() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def _consume(planes):
+    # mapped planes are only slices until read, both read stages go over
+    # every byte so they time the same work
+    return [crc32(plane) for plane in planes if plane is not None]
+
+
+def _loader(filename, format, size, bitdepth, **kwargs):
+    # no read ahead and no frame cache, every call reads the file
+    return LoaderYuv(filename=filename, format=format, size=size,
+                     bitdepth=bitdepth, buffer_depth=0, cache=None, **kwargs)
+
+
+def _stages(filename, format, size, bitdepth):
+    # (name, setup) pairs, setup returns a callable taking the call count
+    # and the object to close afterwards
+
+    def read(mmap):
+        def setup():
+            loader = _loader(filename, format, size, bitdepth,
+                             colorfmt=OUT_COLOR_FORMAT[1], mmap=mmap)
+            return lambda n: _consume(loader._read_image(n % FRAMES)), loader
+        return setup
+
+    def convert(method):
+        def setup():
+            reader  = ReaderYuv(filename=filename, format=format, size=size,
+                                bitdepth=bitdepth)
+            frames  = [reader.read_planar(n) for n in xrange(FRAMES)]
+            convert = ConvertYuv(format=format, size=size, type=method,
+                                 bitdepth=bitdepth)
+            return lambda n: convert.convert(frames[n % FRAMES]), reader
+        return setup
+
+    def frame():
+        loader = _loader(filename, format, size, bitdepth,
+                         colorfmt=OUT_COLOR_FORMAT[0])
+        return lambda n: loader._read_image(n % FRAMES), loader
+
+    return [('read', read(False)), ('read_mmap', read(True))] + \
+           [('convert_%s' % method, convert(method))
+            for method in CONVERT_METHODS] + \
+           [('frame', frame)]
+
+
+def _close(target):
+    if isinstance(target, LoaderYuv):
+        target.unload()
+    else:
+        target.close()
+
+
+def main(args):
+
+    command = BenchmarkCommand().parse(args)
+
+    if numpy is None:
+        sys.stderr.write('benchmark needs numpy\n')
+        return 1
+
+    bitdepth = command['bitdepth']
+    seconds  = max(0., command['time'])
+
+    baseline = {}
+    if command['baseline'] is not None:
+        with open(command['baseline']) as fp:
+            for result in json.load(fp)['results']:
+                key = (result['format'], tuple(result['size']),
+                       result['bitdepth'], result['stage'])
+                baseline[key] = result
+
+    path = command['dir'] or mkdtemp(prefix='yuvist-bench-')
+    temporary = command['dir'] is None
+
+    print '%-8s %-10s %-14s %10s %10s %10s %8s' % (
+        'format', 'size', 'stage', 'ms', 'fps', 'MB/s', 'vs base')
+
+    results = []
+    try:
+        for size in command['sizes']:
+            for format in command['formats']:
+                try:
+                    filename = synthetic_file(path, format, size, bitdepth)
+                except Exception as e:
+                    sys.stderr.write('skip %s %dx%d: %s\n' % (
+                        format, size[0], size[1], e))
+                    continue
+
+                reader = ReaderYuv(filename=filename, format=format, size=size,
+                                   bitdepth=bitdepth)
+                nbytes = reader.frame_bytes
+                reader.close()
+
+                for stage, setup in _stages(filename, format, size, bitdepth):
+                    run, target = setup()
+                    try:
+                        elapsed = measure(run, seconds)
+                    finally:
+                        _close(target)
+
+                    result = dict(format=format, size=size, bitdepth=bitdepth,
+                                  stage=stage, ms=elapsed * 1000.,
+                                  fps=1. / max(elapsed, 1e-9),
+                                  mbps=nbytes / max(elapsed, 1e-9) / 1e6)
+                    results.append(result)
+
+                    base = baseline.get((format, tuple(size), bitdepth, stage))
+                    ratio = '%7.2fx' % (result['fps'] / base['fps']) \
+                            if base else '       -'
+                    print '%-8s %-10s %-14s %10.3f %10.2f %10.1f %8s' % (
+                        format, '%dx%d' % tuple(size), stage, result['ms'],
+                        result['fps'], result['mbps'], ratio)
+                    sys.stdout.flush()
+
+                remove(filename)
+    finally:
+        if temporary and exists(path):
+            rmtree(path)
+
+    if command['output'] is not None:
+        with open(command['output'], 'w') as fp:
+            json.dump(dict(environment=dict(python=platform.python_version(),
+                                            platform=platform.platform(),
+                                            machine=platform.machine(),
+                                            numpy=numpy.__version__),
+                           seconds=seconds,
+                           results=results), fp, indent=1, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main(sys.argv[1:]))
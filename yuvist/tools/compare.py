@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('plane_mse', 'plane_psnr', 'plane_ssim', 'main')
+
+import sys
+import json
+from math import log10
+from os.path import getsize
+from multiprocessing import Pool
+from timeit import default_timer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yuvist.command import CompareCommand
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+PLANE_NAMES = ('y', 'u', 'v')
+SSIM_WINDOW = 8
+SSIM_K1     = .01
+SSIM_K2     = .03
+
+
+def plane_mse(a, b):
+    d = a.astype(numpy.int64) - b
+    return float(numpy.mean(d * d))
+
+
+def plane_psnr(mse, peak=255.):
+    # identical planes have no noise at all
+    if mse == 0:
+        return float('inf')
+    return 10. * log10(peak * peak / mse)
+
+
+def plane_ssim(a, b, window=SSIM_WINDOW, peak=255.):
+    window = min(window, a.shape[0], a.shape[1])
+    if window == 0:
+        return 1.
+
+    a = a.astype(numpy.float64)
+    b = b.astype(numpy.float64)
+
+    # sums over every window x window block from an integral image
+    def box(x):
+        s = numpy.zeros((x.shape[0] + 1, x.shape[1] + 1))
+        s[1:, 1:] = x.cumsum(0).cumsum(1)
+        return s[window:, window:] - s[:-window, window:] \
+             - s[window:, :-window] + s[:-window, :-window]
+
+    c1 = (SSIM_K1 * peak) ** 2
+    c2 = (SSIM_K2 * peak) ** 2
+
+    n = float(window * window)
+    mu_a  = box(a) / n
+    mu_b  = box(b) / n
+    var_a = box(a * a) / n - mu_a * mu_a
+    var_b = box(b * b) / n - mu_b * mu_b
+    cov   = box(a * b) / n - mu_a * mu_b
+
+    ssim = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / \
+           ((mu_a * mu_a + mu_b * mu_b + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+
+_worker = None
+
+
+def _init_worker(reference, distorted, format, size, bitdepth, ssim):
+    global _worker
+    _worker = (ReaderYuv(filename=reference, format=format, size=size,
+                         bitdepth=bitdepth),
+               ReaderYuv(filename=distorted, format=format, size=size,
+                         bitdepth=bitdepth),
+               ssim)
+
+
+def _compare_frame(nframe):
+    reference, distorted, ssim = _worker
+
+    bitdepth = reference.bitdepth
+    dtype = '<u2' if bitdepth > 8 else 'u1'
+    peak  = float((1 << bitdepth) - 1)
+
+    planes = []
+    for a, b, size in zip(reference.read_planar(nframe),
+                          distorted.read_planar(nframe),
+                          reference.planar_size):
+        if a is None:
+            break
+        a = numpy.frombuffer(a, dtype=dtype).reshape(size[1], size[0])
+        b = numpy.frombuffer(b, dtype=dtype).reshape(size[1], size[0])
+        mse = plane_mse(a, b)
+        planes.append((mse, plane_psnr(mse, peak),
+                       plane_ssim(a, b, peak=peak) if ssim else None))
+    return nframe, planes
+
+
+def main(args):
+
+    command = CompareCommand().parse(args)
+
+    if numpy is None:
+        sys.stderr.write('compare needs numpy\n')
+        return 1
+
+    reference = command['reference']
+    distorted = command['distorted']
+    format    = command['format']
+    size      = command['yuv_size']
+    bitdepth  = command['bitdepth']
+    output    = command['output']
+    ssim      = command['ssim']
+    jobs      = max(1, command['jobs'])
+
+    # a partial frame means the file is not of the given geometry
+    frames = []
+    for filename in (reference, distorted):
+        reader = ReaderYuv(filename=filename, format=format, size=size,
+                           bitdepth=bitdepth)
+        frames.append(reader.frames)
+        reader.close()
+        if reader.frame_bytes == 0 or getsize(filename) % reader.frame_bytes:
+            sys.stderr.write('%s is not a whole number of %dx%d %s frames\n' %
+                             (filename, size[0], size[1], format))
+            return 1
+    if frames[0] != frames[1]:
+        sys.stderr.write('frame count differs (%d, %d)\n' % tuple(frames))
+        return 1
+
+    start = max(0, command['start'])
+    stop  = frames[0]
+    if command['frames'] is not None:
+        stop = min(stop, start + command['frames'])
+    if start >= stop:
+        sys.stderr.write('no frames to compare\n')
+        return 1
+
+    report = None
+    if output is not None:
+        report = 'json' if output.lower().endswith('.json') else 'csv'
+        stream = open(output, 'w')
+        if report == 'csv':
+            stream.write('frame,%s\n' % ','.join(
+                '%s_%s' % (plane, metric) for plane in PLANE_NAMES
+                for metric in ('mse', 'psnr', 'ssim')))
+        else:
+            stream.write('{"reference": %s, "distorted": %s, "format": %s,'
+                         ' "size": %s, "bitdepth": %d, "frames": [' % (
+                         json.dumps(reference), json.dumps(distorted),
+                         json.dumps(format), json.dumps(size), bitdepth))
+
+    initargs = reference, distorted, format, size, bitdepth, ssim
+    begin = default_timer()
+
+    if jobs == 1:
+        _init_worker(*initargs)
+        results = (_compare_frame(nframe) for nframe in xrange(start, stop))
+    else:
+        pool = Pool(jobs, _init_worker, initargs)
+        chunk = max(1, min(16, (stop - start) // (jobs * 4)))
+        results = pool.imap(_compare_frame, xrange(start, stop), chunk)
+
+    # frames are written as they come, only the summary is kept in memory
+    total = [[0., 0., float('inf'), 0.] for plane in PLANE_NAMES]
+    count = 0
+
+    for nframe, planes in results:
+        for i, (mse, psnr, value) in enumerate(planes):
+            total[i][0] += mse
+            total[i][1] += psnr
+            total[i][2]  = min(total[i][2], psnr)
+            total[i][3] += value if value is not None else 0.
+        if report == 'csv':
+            stream.write('%d,%s\n' % (nframe, ','.join(
+                '%.4f,%.4f,%s' % (mse, psnr, '%.6f' % value
+                                  if value is not None else '')
+                for mse, psnr, value in planes)))
+        elif report == 'json':
+            stream.write('%s\n %s' % (',' if count else '', json.dumps(
+                dict(frame=nframe, **dict(
+                    (PLANE_NAMES[i], dict(mse=mse, psnr=psnr, ssim=value))
+                    for i, (mse, psnr, value) in enumerate(planes))),
+                sort_keys=True)))
+        count += 1
+
+    if jobs > 1:
+        pool.close()
+        pool.join()
+
+    summary = {}
+    for i, plane in enumerate(PLANE_NAMES[:len(planes)]):
+        mse, psnr, psnr_min, value = total[i]
+        summary[plane] = dict(psnr_avg=psnr / count,
+                              psnr_global=plane_psnr(mse / count,
+                                                     (1 << bitdepth) - 1.),
+                              psnr_min=psnr_min,
+                              ssim_avg=value / count if ssim else None)
+
+    if report == 'json':
+        stream.write('\n], "summary": %s}\n' % json.dumps(summary, sort_keys=True))
+    if report is not None:
+        stream.close()
+
+    elapsed = default_timer() - begin
+    print 'compared %d frames in %.2f s (%.2f fps)' % (
+        count, elapsed, count / max(elapsed, 1e-6))
+    print '%-5s %10s %12s %10s %10s' % (
+        'plane', 'PSNR avg', 'PSNR global', 'PSNR min', 'SSIM avg')
+    for plane in PLANE_NAMES[:len(planes)]:
+        result = summary[plane]
+        print '%-5s %10.4f %12.4f %10.4f %10s' % (
+            plane.upper(), result['psnr_avg'], result['psnr_global'],
+            result['psnr_min'], '%.6f' % result['ssim_avg']
+                                if ssim else '-')
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main(sys.argv[1:]))
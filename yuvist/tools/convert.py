@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('encode_ppm', 'encode_png', 'main')
+
+import sys
+import zlib
+from collections import deque
+from multiprocessing import Pool
+from struct import pack
+from timeit import default_timer
+
+from yuvist.command import ConvertCommand
+from yuvist.core.video.convert_yuv import ConvertYuv
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+def encode_ppm(rgb, size):
+    return 'P6\n%d %d\n255\n' % tuple(size) + rgb
+
+
+def encode_png(rgb, size):
+
+    def chunk(tag, data):
+        crc = zlib.crc32(tag + data) & 0xffffffff
+        return pack('>I', len(data)) + tag + data + pack('>I', crc)
+
+    stride = size[0] * 3
+    rows = [rgb[i:i+stride] for i in xrange(0, stride * size[1], stride)]
+    data = '\0' + '\0'.join(rows)   # filter type none for every row
+
+    return '\x89PNG\r\n\x1a\n' + \
+           chunk('IHDR', pack('>IIBBBBB', size[0], size[1], 8, 2, 0, 0, 0)) + \
+           chunk('IDAT', zlib.compress(data, 6)) + \
+           chunk('IEND', '')
+
+
+ENCODERS = {
+    'rgb': lambda rgb, size: rgb,
+    'ppm': encode_ppm,
+    'png': encode_png
+}
+
+_worker = None
+
+
+def _init_worker(filename, format, size, bitdepth, method, color, chroma, type):
+    global _worker
+    reader  = ReaderYuv(filename=filename, format=format, size=size,
+                        bitdepth=bitdepth)
+    convert = ConvertYuv(format=format, size=size, type=method,
+                         bitdepth=bitdepth, matrix=color[0], range=color[1],
+                         filter=chroma[0], siting=chroma[1])
+    _worker = reader, convert, ENCODERS[type]
+
+
+def _convert_frame(nframe):
+    reader, convert, encode = _worker
+    rgb = convert.convert(reader.read_planar(nframe))[0]
+    return nframe, encode(rgb, reader.size)
+
+
+def main(args):
+
+    command = ConvertCommand().parse(args)
+
+    filename = command['playitem']
+    format   = command['format']
+    size     = command['yuv_size']
+    bitdepth = command['bitdepth']
+    output   = command['output']
+    type     = command['type']
+    jobs     = max(1, command['jobs'])
+
+    reader = ReaderYuv(filename=filename, format=format, size=size,
+                       bitdepth=bitdepth)
+    start  = max(0, command['start'])
+    stop   = reader.frames
+    if command['frames'] is not None:
+        stop = min(stop, start + command['frames'])
+    reader.close()
+
+    if start >= stop:
+        sys.stderr.write('no frames to convert in %s\n' % filename)
+        return 1
+
+    per_frame = '%' in output
+    if type == 'png' and not per_frame and stop - start > 1:
+        sys.stderr.write('png output of several frames needs a %d pattern\n')
+        return 1
+
+    stream = None
+    if not per_frame:
+        stream = sys.stdout if output == '-' else open(output, 'wb')
+
+    def write(nframe, data):
+        if per_frame:
+            with open(output % nframe, 'wb') as fp:
+                fp.write(data)
+        else:
+            stream.write(data)
+
+    color    = command['color_matrix'], command['color_range']
+    chroma   = command['chroma_filter'], command['chroma_siting']
+    initargs = filename, format, size, bitdepth, command['method'], color, \
+               chroma, type
+    begin = default_timer()
+
+    if jobs == 1:
+        _init_worker(*initargs)
+        for nframe in xrange(start, stop):
+            write(*_convert_frame(nframe))
+    else:
+        # keep a bounded window of frames in flight and write them in order
+        pool = Pool(jobs, _init_worker, initargs)
+        pending = deque()
+        for nframe in xrange(start, stop):
+            pending.append(pool.apply_async(_convert_frame, (nframe, )))
+            if len(pending) >= jobs * 2:
+                write(*pending.popleft().get())
+        while pending:
+            write(*pending.popleft().get())
+        pool.close()
+        pool.join()
+
+    if stream is not None and stream is not sys.stdout:
+        stream.close()
+
+    elapsed = default_timer() - begin
+    sys.stderr.write('converted %d frames in %.2f s (%.2f fps)\n' % (
+        stop - start, elapsed, (stop - start) / max(elapsed, 1e-6)))
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('main', )
+
+import sys
+import json
+from multiprocessing import Pool
+from timeit import default_timer
+
+from yuvist.command import DupsCommand
+from yuvist.core.video.hash_yuv import HashYuv
+from yuvist.core.video.reader_yuv import ReaderYuv
+
+
+_worker = None
+
+
+def _init_worker(filename, format, size, bitdepth, grid):
+    global _worker
+    _worker = (ReaderYuv(filename=filename, format=format, size=size,
+                         bitdepth=bitdepth),
+               HashYuv(filename=filename, format=format, size=size,
+                       bitdepth=bitdepth, grid=grid))
+
+
+def _hash_frame(nframe):
+    reader, hasher = _worker
+    hashes, signature = hasher.compute(reader.read_planar(nframe))
+    return nframe, hashes, signature
+
+
+def main(args):
+
+    command = DupsCommand().parse(args)
+
+    filename = command['playitem']
+    format   = command['format']
+    size     = command['yuv_size']
+    bitdepth = command['bitdepth']
+    grid     = command['grid']
+    output   = command['output'] or filename + HashYuv.SIDECAR_EXT
+    jobs     = max(1, command['jobs'])
+
+    try:
+        hasher = HashYuv(filename=filename, format=format, size=size,
+                         bitdepth=bitdepth, grid=grid,
+                         threshold=command['threshold'], sidecar=output)
+    except Exception as e:
+        sys.stderr.write('%s\n' % e)
+        return 1
+
+    start = max(0, command['start'])
+    stop  = hasher.frames
+    if command['frames'] is not None:
+        stop = min(stop, start + command['frames'])
+
+    if start >= stop:
+        sys.stderr.write('no frames to scan in %s\n' % filename)
+        return 1
+
+    stream = sys.stdout if output == '-' else open(output, 'w')
+    stream.write(json.dumps(hasher.key(), sort_keys=True) + '\n')
+
+    initargs = filename, format, size, bitdepth, grid
+    begin = default_timer()
+
+    if jobs == 1:
+        _init_worker(*initargs)
+        results = (_hash_frame(nframe) for nframe in xrange(start, stop))
+    else:
+        # large chunks keep every worker reading long runs of the file
+        pool = Pool(jobs, _init_worker, initargs)
+        chunk = max(1, min(64, (stop - start) // (jobs * 4)))
+        results = pool.imap(_hash_frame, xrange(start, stop), chunk)
+
+    # records are written in frame order as they come
+    count, duplicates, nears = 0, 0, 0
+    for nframe, hashes, signature in results:
+        record = hasher.flag(nframe, hashes, signature)
+        stream.write(json.dumps(record, sort_keys=True) + '\n')
+        count += 1
+        if record['duplicate'] is not None:
+            duplicates += 1
+        elif record['near'] is not None:
+            nears += 1
+
+    if jobs > 1:
+        pool.close()
+        pool.join()
+
+    if stream is not sys.stdout:
+        stream.close()
+
+    # keep stdout clean when the index goes there
+    out = sys.stderr if output == '-' else sys.stdout
+    elapsed = default_timer() - begin
+    out.write('scanned %d frames in %.2f s (%.2f fps)\n' % (
+        count, elapsed, count / max(elapsed, 1e-6)))
+    out.write('%d exact duplicates, %d near duplicates\n' % (duplicates, nears))
+    if output != '-':
+        out.write('index written to %s\n' % output)
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('main', )
+
+import sys
+import json
+from multiprocessing import Pool
+from timeit import default_timer
+
+from yuvist.command import StatsCommand
+from yuvist.core.video.reader_yuv import ReaderYuv
+from yuvist.core.video.stats_yuv import StatsYuv
+
+
+_worker = None
+
+
+def _init_worker(filename, format, size, bitdepth, range, bins):
+    global _worker
+    _worker = (ReaderYuv(filename=filename, format=format, size=size,
+                         bitdepth=bitdepth),
+               StatsYuv(bitdepth=bitdepth, range=range, bins=bins))
+
+
+def _stats_frame(nframe):
+    reader, stats = _worker
+    return nframe, stats.compute(reader.read_planar(nframe))
+
+
+def main(args):
+
+    command = StatsCommand().parse(args)
+
+    filename = command['playitem']
+    format   = command['format']
+    size     = command['yuv_size']
+    bitdepth = command['bitdepth']
+    output   = command['output']
+    jobs     = max(1, command['jobs'])
+
+    try:
+        StatsYuv(bitdepth=bitdepth, range=command['color_range'],
+                 bins=command['bins'])
+    except Exception as e:
+        sys.stderr.write('%s\n' % e)
+        return 1
+
+    reader = ReaderYuv(filename=filename, format=format, size=size,
+                       bitdepth=bitdepth)
+    start  = max(0, command['start'])
+    stop   = reader.frames
+    if command['frames'] is not None:
+        stop = min(stop, start + command['frames'])
+    reader.close()
+
+    if start >= stop:
+        sys.stderr.write('no frames to analyze in %s\n' % filename)
+        return 1
+
+    report, stream = None, None
+    if output is not None:
+        report = 'json' if output.lower().endswith('.json') else 'csv'
+        stream = sys.stdout if output == '-' else open(output, 'w')
+    if report == 'json':
+        stream.write('{"filename": %s, "format": %s, "size": %s, "bitdepth": %d,'
+                     ' "frames": [' % (json.dumps(filename), json.dumps(format),
+                                       json.dumps(size), bitdepth))
+
+    initargs = filename, format, size, bitdepth, command['color_range'], \
+               command['bins']
+    begin = default_timer()
+
+    if jobs == 1:
+        _init_worker(*initargs)
+        results = (_stats_frame(nframe) for nframe in xrange(start, stop))
+    else:
+        pool = Pool(jobs, _init_worker, initargs)
+        chunk = max(1, min(16, (stop - start) // (jobs * 4)))
+        results = pool.imap(_stats_frame, xrange(start, stop), chunk)
+
+    # frames are written as they come, only the summary is kept in memory
+    total = {}
+    count = 0
+
+    for nframe, planes in results:
+        if report == 'csv' and count == 0:
+            stream.write('frame,%s\n' % ','.join(
+                '%s_%s' % (plane['plane'], field) for plane in planes
+                for field in StatsYuv.FIELDS))
+        if report == 'csv':
+            stream.write('%d,%s\n' % (nframe, ','.join(
+                '%.4f,%.4f,%d,%d,%d,%d' % tuple(plane[field]
+                                                for field in StatsYuv.FIELDS)
+                for plane in planes)))
+        elif report == 'json':
+            stream.write('%s\n %s' % (',' if count else '', json.dumps(
+                dict(frame=nframe, planes=planes), sort_keys=True)))
+
+        count += 1
+        for plane in planes:
+            name = plane['plane']
+            if name not in total:
+                total[name] = dict(mean=0., variance=0., min=plane['min'],
+                                   max=plane['max'], clip_low=0, clip_high=0,
+                                   samples=0)
+            # sums of the samples and of their squares, the variance of the
+            # whole clip is not the mean of the per-frame ones
+            summary = total[name]
+            samples = plane['samples']
+            summary['mean']      += plane['mean'] * samples
+            summary['variance']  += (plane['variance'] + plane['mean'] ** 2) * samples
+            summary['min']        = min(summary['min'], plane['min'])
+            summary['max']        = max(summary['max'], plane['max'])
+            summary['clip_low']  += plane['clip_low']
+            summary['clip_high'] += plane['clip_high']
+            summary['samples']   += plane['samples']
+
+    if jobs > 1:
+        pool.close()
+        pool.join()
+
+    for summary in total.values():
+        samples = max(summary['samples'], 1)
+        summary['mean']     /= samples
+        summary['variance']  = max(summary['variance'] / samples -
+                                   summary['mean'] ** 2, 0.)
+
+    if report == 'json':
+        stream.write('\n], "summary": %s}\n' % json.dumps(total, sort_keys=True))
+    if stream is not None and stream is not sys.stdout:
+        stream.close()
+
+    # keep stdout clean when the report goes there
+    out = sys.stderr if output == '-' else sys.stdout
+    elapsed = default_timer() - begin
+    out.write('analyzed %d frames in %.2f s (%.2f fps)\n' % (
+        count, elapsed, count / max(elapsed, 1e-6)))
+    out.write('%-5s %10s %10s %6s %6s %10s %10s\n' % (
+        'plane', 'mean', 'variance', 'min', 'max', 'clip low', 'clip high'))
+    for name in StatsYuv.PLANE_NAMES:
+        if name not in total:
+            continue
+        summary = total[name]
+        out.write('%-5s %10.4f %10.4f %6d %6d %10d %10d\n' % (
+            name.upper(), summary['mean'], summary['variance'],
+            summary['min'], summary['max'],
+            summary['clip_low'], summary['clip_high']))
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main(sys.argv[1:]))
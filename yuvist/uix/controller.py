@@ -21,8 +21,11 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 __all__ = ('Controller', )
 
+from functools import partial
 from os.path import basename
+from threading import Thread
 
+from kivy.clock import Clock
 from kivy.resources import resource_find
 from kivy.base import EventLoop
 from kivy.event import EventDispatcher
@@ -31,7 +34,15 @@ from kivy.properties import NumericProperty, StringProperty, ListProperty, \
         OptionProperty, ReferenceListProperty, DictProperty
 from kivy.uix.video import Video
 
-from yuvist.core.video import YUV_CHROMA_FORMAT, OUT_COLOR_FORMAT
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_BITDEPTH, \
+        YUV_CHROMA_SUBPIXEL, YUV_COLOR_MATRIX, YUV_COLOR_RANGE, YUV_CHROMA_FILTER, \
+        YUV_CHROMA_SITING, OUT_COLOR_FORMAT, COMPARE_MODE, PLAYBACK_POLICY
+from yuvist.core.video.cache_yuv import frame_cache
+from yuvist.core.video.detect_yuv import DetectYuv
+from yuvist.core.video.hash_yuv import HashYuv
+from yuvist.core.video.profile_yuv import profiler
+from yuvist.core.video.stats_yuv import StatsYuv
+from yuvist.core.video.thumbnail_yuv import ThumbnailYuv
 from yuvist.uix.yuvvideo import YuvVideo
 
 
@@ -49,11 +60,44 @@ class Controller(EventDispatcher):
     colorfmt = OptionProperty(OUT_COLOR_FORMAT[1], options=OUT_COLOR_FORMAT)
     yuv_size = ListProperty([1920, 1080])
     yuv_fps  = NumericProperty(30.)
-    playitem = ReferenceListProperty(source, format, colorfmt, yuv_size, yuv_fps)
+    bitdepth = OptionProperty(YUV_BITDEPTH[0], options=YUV_BITDEPTH)
+    playitem = ReferenceListProperty(source, format, colorfmt, yuv_size, yuv_fps,
+                                     bitdepth)
+
+    color_matrix = OptionProperty(YUV_COLOR_MATRIX[0], options=YUV_COLOR_MATRIX)
+    color_range  = OptionProperty(YUV_COLOR_RANGE[0], options=YUV_COLOR_RANGE)
+
+    chroma_filter = OptionProperty(YUV_CHROMA_FILTER[0], options=YUV_CHROMA_FILTER)
+    chroma_siting = OptionProperty(YUV_CHROMA_SITING[0], options=YUV_CHROMA_SITING)
+
+    buffer_depth = NumericProperty(4)
+    use_mmap     = BooleanProperty(False)
+
+    playback_policy = OptionProperty(PLAYBACK_POLICY[0], options=PLAYBACK_POLICY)
+
+    compare_source = StringProperty('')
+    compare_mode   = OptionProperty(COMPARE_MODE[1], options=COMPARE_MODE)
+
+    thumbnails = ObjectProperty(None, allownone=True)
+    markers    = ListProperty([])
+    loading    = BooleanProperty(False)
+
+    preload_size = NumericProperty(256)
+
+    show_stats  = BooleanProperty(False)
+    frame_stats = ObjectProperty(None, allownone=True)
+
+    profiling    = BooleanProperty(False)
+    show_profile = BooleanProperty(False)
+    profile      = StringProperty('')
+
+    show_pixel = BooleanProperty(False)
+    pixel_info = StringProperty('')
 
     message  = StringProperty('')
     display  = ObjectProperty(None)
     playlist = ObjectProperty(None)
+    playlist_info = DictProperty({})
 
     def __init__(self, **kwargs):
 
@@ -68,12 +112,32 @@ class Controller(EventDispatcher):
         self.register_event_type('on_prev_frame')
         self.register_event_type('on_next_frame')
         self.register_event_type('on_play_pause')
+        self.register_event_type('on_next_compare')
+        self.register_event_type('on_next_matrix')
+        self.register_event_type('on_next_range')
+        self.register_event_type('on_next_chroma')
+        self.register_event_type('on_show_playback')
+        self.register_event_type('on_toggle_stats')
+        self.register_event_type('on_toggle_profile')
+        self.register_event_type('on_toggle_pixel')
+        self.register_event_type('on_zoom_in')
+        self.register_event_type('on_zoom_out')
+        self.register_event_type('on_zoom_reset')
+        self.register_event_type('on_toggle_region')
 
         self.register_event_type('on_select_playitem')
         self.register_event_type('on_select_playlist')
         self.register_event_type('on_config_yuvparam')
 
         self._video = None
+        self._video_key = None
+        self._preloaded = {}
+        self._region = []
+        self._region_source = None
+        self._resume = None
+        self._playlist_index = None
+        self._thumbnail_serial = 0
+        self._detect_serial = 0
 
         super(Controller, self).__init__(**kwargs)
 
@@ -82,18 +146,65 @@ class Controller(EventDispatcher):
             return
         self._video.seek(percent)
 
+    @staticmethod
+    def _detect_file(source, format=None, yuv_size=None, bitdepth=None):
+        # what the filename and the file contents tell, reads the file so
+        # it is safe to call off the ui thread
+        filename = resource_find(source)
+        if filename is not None and filename.lower().endswith('.yuv'):
+            try:
+                detected = DetectYuv(filename=filename, format=format,
+                                     size=yuv_size, bitdepth=bitdepth).detect()
+            except Exception:
+                detected = None
+            if detected is not None:
+                return detected
+        return format, yuv_size, bitdepth
+
+    def default_yuv(self, format=None, yuv_size=None, bitdepth=None):
+        # falling back to the current settings for what is still unknown
+        return (format or self.format,
+                list(yuv_size or self.yuv_size),
+                bitdepth or self.bitdepth)
+
+    def detect_yuv(self, source, format=None, yuv_size=None, bitdepth=None):
+        # fill what is left out from the filename and the file contents
+        return self.default_yuv(*self._detect_file(source, format,
+                                                   yuv_size, bitdepth))
+
+    def open_detected(self, sources, format=None, yuv_size=None, bitdepth=None,
+                      **kwargs):
+        # detection reads the files, a large one or a slow mount would
+        # freeze the window, so the sources are detected in the background
+        # and then listed, the first one opens with the region and the state
+        # given in kwargs, an item opened meanwhile wins
+        self._detect_serial += 1
+        thread = Thread(target=self._load_detected,
+                        args=(self._detect_serial, list(sources),
+                              (format, yuv_size, bitdepth), kwargs),
+                        name='Controller detect %s' % sources[0])
+        thread.daemon = True
+        thread.start()
+
     def on_open_playitem(self, playitem):
         if type(playitem) is tuple or type(playitem) is list:
-            if len(playitem) != 5:
-                raise ValueError('playitem must have 5 components'
-                                 ' - source, format, colorfmt, size, fps'
+            if len(playitem) == 5:
+                playitem = list(playitem) + [YUV_BITDEPTH[0]]
+            if len(playitem) != 6:
+                raise ValueError('playitem must have 6 components'
+                                 ' - source, format, colorfmt, size, fps, bitdepth'
                                  ' (got %r)' % playitem)
+            # an item opened meanwhile wins over a detection still running
+            self._detect_serial += 1
             self.playitem = playitem[:]
             self.state = 'play'
             return
         if type(playitem) is str or type(playitem) is unicode:
-            self.source = playitem
-            self.state = 'play'
+            index = self.playlist_index(playitem)
+            if index is not None:
+                self.dispatch('on_open_playitem', self.playlist[index])
+                return
+            self.open_detected([playitem])
             return
         raise ValueError('playitem have an invalid format (got %r)' % type(playitem))
 
@@ -110,22 +221,16 @@ class Controller(EventDispatcher):
         pass
 
     def on_prev_video(self, *largs):
-        playitem = self.playitem
-        playlist = self.playlist[:]
-        for i in xrange(len(playlist)):
-            if playlist[i][0] == playitem[0] and i > 0:
-                self.dispatch('on_open_playitem', playlist[i-1])
-                self.message = 'prev video'
-                return
+        index = self.playlist_index(self.source)
+        if index is not None and index > 0:
+            self.dispatch('on_open_playitem', self.playlist[index-1])
+            self.message = 'prev video'
 
     def on_next_video(self, *largs):
-        playitem = self.playitem
-        playlist = self.playlist[:]
-        for i in xrange(len(playlist)):
-            if playlist[i][0] == playitem[0] and i < len(playlist)-1:
-                self.dispatch('on_open_playitem', playlist[i+1])
-                self.message = 'next video'
-                return
+        index = self.playlist_index(self.source)
+        if index is not None and index < len(self.playlist)-1:
+            self.dispatch('on_open_playitem', self.playlist[index+1])
+            self.message = 'next video'
 
     def on_prev_frame(self, *largs):
         if self.duration == 0:
@@ -153,6 +258,129 @@ class Controller(EventDispatcher):
             self.state = 'play'
         self.message = self.state
 
+    def on_next_compare(self, *largs):
+        if not self.compare_source:
+            self.message = 'no compare video'
+            return
+        index = COMPARE_MODE.index(self.compare_mode)
+        self.compare_mode = COMPARE_MODE[(index + 1) % len(COMPARE_MODE)]
+        self.message = 'compare %s' % self.compare_mode
+
+    def on_next_matrix(self, *largs):
+        index = YUV_COLOR_MATRIX.index(self.color_matrix)
+        self.color_matrix = YUV_COLOR_MATRIX[(index + 1) % len(YUV_COLOR_MATRIX)]
+        self.message = 'matrix %s' % self.color_matrix
+
+    def on_next_range(self, *largs):
+        index = YUV_COLOR_RANGE.index(self.color_range)
+        self.color_range = YUV_COLOR_RANGE[(index + 1) % len(YUV_COLOR_RANGE)]
+        self.message = 'range %s' % self.color_range
+
+    def on_next_chroma(self, *largs):
+        # nearest, then bilinear with each siting
+        modes = [(YUV_CHROMA_FILTER[0], self.chroma_siting)] + \
+                [(YUV_CHROMA_FILTER[1], siting) for siting in YUV_CHROMA_SITING]
+        if self.chroma_filter == YUV_CHROMA_FILTER[0]:
+            index = 0
+        else:
+            index = 1 + YUV_CHROMA_SITING.index(self.chroma_siting)
+        self.chroma_filter, self.chroma_siting = modes[(index + 1) % len(modes)]
+        if self.chroma_filter == YUV_CHROMA_FILTER[0]:
+            self.message = 'chroma %s' % self.chroma_filter
+        else:
+            self.message = 'chroma %s %s' % (self.chroma_filter, self.chroma_siting)
+
+    def on_show_playback(self, *largs):
+        if not isinstance(self._video, YuvVideo) or self._video.playback is None:
+            self.message = 'no playback'
+            return
+        self.message = str(self._video.playback)
+
+    def on_toggle_stats(self, *largs):
+        if not self.show_stats:
+            try:
+                StatsYuv()
+            except Exception:
+                self.message = 'no statistics'
+                return
+        self.show_stats = not self.show_stats
+        self.message = 'statistics %s' % ('on' if self.show_stats else 'off')
+
+    def on_toggle_profile(self, *largs):
+        self.show_profile = not self.show_profile
+        self.message = 'profile %s' % ('on' if self.show_profile else 'off')
+
+    def on_toggle_pixel(self, *largs):
+        self.show_pixel = not self.show_pixel
+        self.pixel_info = ''
+        self.message = 'pixel inspector %s' % ('on' if self.show_pixel else 'off')
+
+    def on_zoom_in(self, *largs):
+        self._zoom(2.)
+
+    def on_zoom_out(self, *largs):
+        self._zoom(.5)
+
+    def on_zoom_reset(self, *largs):
+        self._zoom(0.)
+
+    def _zoom(self, factor):
+        if not isinstance(self._video, YuvVideo):
+            self.message = 'no zoom'
+            return
+        self._video.zoom_at(self._video.zoom * factor)
+        self.message = 'zoom %dx' % self._video.zoom
+
+    def on_toggle_region(self, *largs):
+        if not isinstance(self._video, YuvVideo):
+            self.message = 'no region'
+            return
+        if self._region:
+            self.set_region([])
+            self.message = 'region off'
+            return
+        if self._video.zoom <= 1.:
+            self.message = 'zoom in to pick a region'
+            return
+        self.set_region(self._video.view_region())
+        self.message = 'region %dx%d at %d,%d' % tuple(self._region[2:] + self._region[:2])
+
+    def set_region(self, region, source=None):
+        # the region belongs to one item, it reopens at the same position
+        self._region = list(region or [])
+        self._region_source = source or self.source
+        if isinstance(self._video, YuvVideo) and self._region_source == self.source:
+            self._resume = self.position
+            self.on_playitem(self, self.playitem)
+
+    def inspect_pixel(self, pos):
+        # samples under a window position, straight from the shown planes
+        result = None
+        if isinstance(self._video, YuvVideo) and self._video.parent is not None:
+            result = self._video.pixel_at(self._video.to_widget(*pos))
+        if result is None:
+            self.pixel_info = ''
+            return
+        x, y, samples, other = result
+        lines = ['x %d y %d' % (x, y),
+                 '  '.join('%s %d' % sample for sample in samples)]
+        if other is not None:
+            lines.append('  '.join('%s %d' % sample for sample in other))
+        self.pixel_info = '\n'.join(lines)
+
+    def profile_info(self):
+        # what the timings alone do not tell, the read ahead and the frame rate
+        info = dict(source=self.source, format=self.format,
+                    size=list(self.yuv_size), bitdepth=self.bitdepth,
+                    colorfmt=self.colorfmt, target_fps=self.yuv_fps,
+                    cache=frame_cache.info())
+        if isinstance(self._video, YuvVideo) and self._video.playback is not None:
+            playback = self._video.playback
+            info.update(buffer=list(self._video.buffer_fill), fps=playback.rate,
+                        displayed=playback.displayed, dropped=playback.dropped,
+                        repeated=playback.repeated, slipped=playback.slipped)
+        return info
+
     def on_select_playitem(self, *largs):
         pass
 
@@ -176,32 +404,147 @@ class Controller(EventDispatcher):
             return
         self._video.volume = value
 
+    def on_compare_mode(self, instance, value):
+        if not isinstance(self._video, YuvVideo):
+            return
+        self._video.compare_mode = value
+
+    def on_show_stats(self, instance, value):
+        if not value:
+            self.frame_stats = None
+        if not isinstance(self._video, YuvVideo):
+            return
+        self._video.show_stats = value
+
+    def on_profiling(self, instance, value):
+        self._update_profiling()
+
+    def on_show_profile(self, instance, value):
+        self._update_profiling()
+        Clock.unschedule(self._update_profile)
+        if value:
+            self._update_profile()
+            Clock.schedule_interval(self._update_profile, .5)
+        else:
+            self.profile = ''
+
+    def _update_profiling(self):
+        enabled = self.profiling or self.show_profile
+        if enabled == profiler.enabled:
+            return
+        Clock.unschedule(self._profile_frame)
+        if enabled:
+            profiler.reset()
+            Clock.schedule_interval(self._profile_frame, 0)
+        profiler.enabled = enabled
+
+    def _profile_frame(self, dt):
+        profiler.add('frame', dt)
+
+    def _update_profile(self, *largs):
+        stages = profiler.summary()
+        lines  = ['%-7s %7s %7s %7s %7s' % ('ms', 'p50', 'p90', 'p99', 'max')]
+        for name in profiler.STAGES:
+            if name not in stages:
+                continue
+            stage = stages[name]
+            lines.append('%-7s %7.2f %7.2f %7.2f %7.2f' % (
+                name, stage['p50'], stage['p90'], stage['p99'], stage['max']))
+
+        info = self.profile_info()
+        if 'buffer' in info:
+            lines.append('buffer  %d/%d' % tuple(info['buffer']))
+            lines.append('video   %.2f/%.2f fps' % (info['fps'], info['target_fps']))
+        cache = info['cache']
+        if cache['limit']:
+            lines.append('cache   %d/%d MB' % (cache['used'] >> 20, cache['limit'] >> 20))
+            lines.append('        hit %d miss %d evict %d' % (
+                cache['hits'], cache['misses'], cache['evictions']))
+        if 'frame' in stages:
+            lines.append('kivy    %.2f fps' % (1000. / max(stages['frame']['mean'], 1e-3)))
+        self.profile = '\n'.join(lines)
+
+    def on_color_matrix(self, instance, value):
+        if not isinstance(self._video, YuvVideo):
+            return
+        self._video.color_matrix = value
+
+    def on_color_range(self, instance, value):
+        if not isinstance(self._video, YuvVideo):
+            return
+        self._video.color_range = value
+
+    def on_chroma_filter(self, instance, value):
+        if not isinstance(self._video, YuvVideo):
+            return
+        self._video.chroma_filter = value
+
+    def on_chroma_siting(self, instance, value):
+        if not isinstance(self._video, YuvVideo):
+            return
+        self._video.chroma_siting = value
+
     def on_playitem(self, instance, value):
 
+        if self._region and self._region_source != self.source:
+            self._region = []
+        key = self._preload_key(self.playitem, self._region)
+
         if self._video is not None:
-            self._video.state = 'stop'
-            self._video.unbind(on_load=self._on_load_video,
-                               texture=self._on_load_video,
-                               state=self.setter('state'),
-                               duration=self.setter('duration'),
-                               position=self.setter('position'),
-                               volume=self.setter('volume'))
+            video = self._video
+            video.unbind(on_load=self._on_load_video,
+                         texture=self._on_load_video,
+                         state=self.setter('state'),
+                         duration=self.setter('duration'),
+                         position=self.setter('position'),
+                         volume=self.setter('volume'))
+            if isinstance(video, YuvVideo):
+                video.unbind(frame_stats=self.setter('frame_stats'),
+                             loading=self.setter('loading'),
+                             open_error=self._on_open_error)
+            # the item left stays warm as a neighbour, rewound to its start
+            if isinstance(video, YuvVideo) and self.preload_size > 0 and \
+               not video.region and \
+               self._video_key != key and self._video_key not in self._preloaded:
+                video.state = 'pause'
+                video.seek(0)
+                if video.parent is not None:
+                    video.parent.remove_widget(video)
+                self._preloaded[self._video_key] = video
+            else:
+                video.state = 'stop'
             self._video = None
+            self._video_key = None
+            self.frame_stats = None
+            self.loading = False
+
+        self._thumbnail_serial += 1
+        if self.thumbnails is not None:
+            self.thumbnails.stop(block=False)
+            self.thumbnails = None
+        self.markers = []
 
         filename = resource_find(self.source)
         if filename is None:
             return
 
-        cls = YuvVideo if filename.lower().endswith('.yuv') else Video
-        self._video = cls(format=self.format,
-                          colorfmt=self.colorfmt,
-                          yuv_size=self.yuv_size,
-                          yuv_fps=self.yuv_fps,
-                          source=filename,
-                          state=self.state,
-                          volume=self.volume,
-                          pos_hint={'x':0, 'y':0},
-                          **self.options)
+        video = self._preloaded.pop(key, None)
+        if video is not None:
+            # settings switched live since the preload started
+            video.color_matrix = self.color_matrix
+            video.color_range  = self.color_range
+            video.chroma_filter = self.chroma_filter
+            video.chroma_siting = self.chroma_siting
+            video.show_stats   = self.show_stats
+            video.compare_mode = self.compare_mode
+            video.volume       = self.volume
+            video.state        = self.state
+        else:
+            video = self._create_video(self.playitem, filename, state=self.state,
+                                       region=list(self._region))
+        self._video = video
+        self._video_key = key
+
         self._video.bind(on_load=self._on_load_video,
                          texture=self._on_load_video,
                          state=self.setter('state'),
@@ -209,14 +552,212 @@ class Controller(EventDispatcher):
                          position=self.setter('position'),
                          volume=self.setter('volume'))
 
+        if isinstance(video, YuvVideo):
+            self._video.bind(frame_stats=self.setter('frame_stats'),
+                             loading=self.setter('loading'),
+                             open_error=self._on_open_error)
+            self.loading = self._video.loading
+            self._open_thumbnails(filename)
+            self._open_markers(filename)
+
+        # a preloaded video has its first frame up already
+        if video.texture is not None:
+            self._on_load_video()
+
+    def _create_video(self, playitem, filename, **kwargs):
+        source, format, colorfmt, yuv_size, yuv_fps, bitdepth = playitem
+        cls = YuvVideo if filename.lower().endswith('.yuv') else Video
+        return cls(format=format,
+                   colorfmt=colorfmt,
+                   yuv_size=yuv_size,
+                   yuv_fps=yuv_fps,
+                   bitdepth=bitdepth,
+                   color_matrix=self.color_matrix,
+                   color_range=self.color_range,
+                   chroma_filter=self.chroma_filter,
+                   chroma_siting=self.chroma_siting,
+                   buffer_depth=self.buffer_depth,
+                   playback_policy=self.playback_policy,
+                   use_mmap=self.use_mmap,
+                   show_stats=self.show_stats,
+                   compare_source=self.compare_source,
+                   compare_mode=self.compare_mode,
+                   source=filename,
+                   volume=self.volume,
+                   pos_hint={'x':0, 'y':0},
+                   **dict(self.options, **kwargs))
+
+    def _preload_key(self, playitem, region=()):
+        # everything a video can not switch once it is opened
+        source, format, colorfmt, yuv_size, yuv_fps, bitdepth = playitem
+        return (source, format, colorfmt, tuple(yuv_size), yuv_fps, bitdepth,
+                self.buffer_depth, self.playback_policy, self.use_mmap,
+                self.compare_source, tuple(region))
+
+    def _preload_bytes(self, playitem):
+        # frame buffers of the read ahead, the shown frame and the textures
+        source, format, colorfmt, yuv_size, yuv_fps, bitdepth = playitem
+        if colorfmt == OUT_COLOR_FORMAT[0]:
+            pixel = 3.
+        else:
+            sx, sy = YUV_CHROMA_SUBPIXEL[format]
+            pixel  = 1. if format == YUV_CHROMA_FORMAT[0] else 1. + 2. / (sx * sy)
+            pixel *= 2 if bitdepth > 8 else 1
+        return int(yuv_size[0] * yuv_size[1] * pixel) * (self.buffer_depth + 2)
+
+    def _update_preload(self, *largs):
+        # keep the next and the previous item opened within the budget
+        wanted = {}
+        index  = self.playlist_index(self.source)
+        if index is not None and self._video is not None:
+            budget = self.preload_size * 1024 * 1024
+            for i in (index + 1, index - 1):
+                if i < 0 or i >= len(self.playlist):
+                    continue
+                playitem = self.playlist[i]
+                if not playitem[0].lower().endswith('.yuv'):
+                    continue
+                cost = self._preload_bytes(playitem)
+                if cost > budget:
+                    continue
+                budget -= cost
+                wanted[self._preload_key(playitem)] = playitem
+
+        for key in self._preloaded.keys():
+            if key not in wanted:
+                self._preloaded.pop(key).state = 'stop'
+
+        for key, playitem in wanted.iteritems():
+            if key in self._preloaded:
+                continue
+            filename = resource_find(playitem[0])
+            if filename is None:
+                continue
+            self._preloaded[key] = self._create_video(playitem, filename,
+                                                      state='pause', preload=True)
+
+    def playlist_index(self, source):
+        # source to index map, rebuilt after the playlist changed
+        playlist = self.playlist or []
+        if self._playlist_index is not None:
+            index = self._playlist_index.get(source)
+            if index is None:
+                return None
+            if index < len(playlist) and playlist[index][0] == source:
+                return index
+
+        self._playlist_index = {}
+        for i, playitem in enumerate(playlist):
+            self._playlist_index.setdefault(playitem[0], i)
+        return self._playlist_index.get(source)
+
+    def on_playlist(self, instance, value):
+        # a new list or, forwarded by the owner of the list, an edit in place
+        self._playlist_index = None
+        Clock.unschedule(self._update_preload)
+        Clock.schedule_once(self._update_preload)
+
+    def on_preload_size(self, instance, value):
+        Clock.unschedule(self._update_preload)
+        Clock.schedule_once(self._update_preload)
+
+    def _load_detected(self, serial, sources, hints, kwargs):
+        detected = [self._detect_file(source, *hints) for source in sources]
+        Clock.schedule_once(partial(self._on_load_detected, serial, sources,
+                                    detected, kwargs))
+
+    def _on_load_detected(self, serial, sources, detected, kwargs, *largs):
+        if serial != self._detect_serial:
+            return
+        colorfmt = kwargs.get('colorfmt', self.colorfmt)
+        yuv_fps  = kwargs.get('yuv_fps', self.yuv_fps)
+
+        playitems = []
+        for source, hints in zip(sources, detected):
+            format, yuv_size, bitdepth = self.default_yuv(*hints)
+            playitems.append([source, format, colorfmt, yuv_size, yuv_fps,
+                              bitdepth])
+            if self.playlist_index(source) is None:
+                self.playlist.append(playitems[-1][:])
+                self._playlist_index = None
+
+        if kwargs.get('region', None):
+            self.set_region(kwargs['region'], sources[0])
+        self.playitem = playitems[0]
+        self.state = kwargs.get('state', 'play')
+
+    def _open_thumbnails(self, filename):
+        # seek bar previews come from a sidecar index built in the background,
+        # opened there too so a slow mount never blocks switching items
+        kwargs = dict(filename=filename, format=self.format,
+                      size=list(self.yuv_size), bitdepth=self.bitdepth,
+                      matrix=self.color_matrix, range=self.color_range)
+        thread = Thread(target=self._load_thumbnails,
+                        args=(self._thumbnail_serial, kwargs),
+                        name='Controller thumbnails %s' % filename)
+        thread.daemon = True
+        thread.start()
+
+    def _load_thumbnails(self, serial, kwargs):
+        try:
+            thumbnails = ThumbnailYuv(**kwargs)
+        except Exception:
+            return
+        Clock.schedule_once(partial(self._on_load_thumbnails, serial, thumbnails))
+
+    def _on_load_thumbnails(self, serial, thumbnails, *largs):
+        # a newer item was opened meanwhile
+        if serial != self._thumbnail_serial:
+            return
+        self.thumbnails = thumbnails
+        self.thumbnails.start()
+
+    def _open_markers(self, filename):
+        # frames flagged by a dups scan of the item, shares the thumbnail serial
+        kwargs = dict(filename=filename, format=self.format,
+                      size=list(self.yuv_size), bitdepth=self.bitdepth)
+        thread = Thread(target=self._load_markers,
+                        args=(self._thumbnail_serial, kwargs),
+                        name='Controller markers %s' % filename)
+        thread.daemon = True
+        thread.start()
+
+    def _load_markers(self, serial, kwargs):
+        try:
+            hasher  = HashYuv(**kwargs)
+            records = hasher.load()
+        except Exception:
+            return
+        if not records:
+            return
+        # seek bar fractions of every run of flagged frames
+        last = float(max(hasher.frames - 1, 1))
+        markers = [(first / last, end / last, kind)
+                   for first, end, kind in hasher.markers(records)]
+        Clock.schedule_once(partial(self._on_load_markers, serial, markers))
+
+    def _on_load_markers(self, serial, markers, *largs):
+        if serial != self._thumbnail_serial:
+            return
+        self.markers = markers
+
+    def _on_open_error(self, instance, value):
+        if value:
+            self.message = 'cannot open %s' % basename(self.source)
+
     def _on_load_video(self, *largs):
         if self._video is not None:
             self._video.unbind(texture=self._on_load_video)
 
+        # a reopened item goes back to where it was
+        if self._resume and self._video is not None and self._video.duration > 0:
+            self._video.seek(min(self._resume / float(self._video.duration), 1.))
+        self._resume = None
+
         self.display.clear_widgets()
         self.display.add_widget(self._video)
 
-        source, format, colorfmt, yuv_size, yuv_fps = self.playitem
+        source, format, colorfmt, yuv_size, yuv_fps, bitdepth = self.playitem
 
         title = '%s' % basename(source)
         if source.lower().endswith('.yuv'):
@@ -225,12 +766,17 @@ class Controller(EventDispatcher):
                 format.upper(),
                 yuv_fps
             )
+            if bitdepth > 8:
+                title += ' %dbit' % bitdepth
         window = EventLoop.window
         window.title = title
 
-        playlist = self.playlist[:]
-        for playitem in playlist:
-            if playitem[0] == source:
-                playitem[1:] = self.playitem[1:]
-                return
-        self.playlist.append(self.playitem[:])
+        index = self.playlist_index(source)
+        if index is not None:
+            self.playlist[index][1:] = self.playitem[1:]
+        else:
+            self.playlist.append(self.playitem[:])
+            self._playlist_index = None
+
+        Clock.unschedule(self._update_preload)
+        Clock.schedule_once(self._update_preload)
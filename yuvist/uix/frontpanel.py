@@ -24,9 +24,13 @@ from os.path import dirname, join
 
 from kivy.lang import Builder
 from kivy.resources import resource_find
-from kivy.properties import NumericProperty, StringProperty, \
+from kivy.properties import NumericProperty, StringProperty, ListProperty, \
         ObjectProperty, BooleanProperty, OptionProperty, AliasProperty
 from kivy.animation import Animation
+from kivy.core.window import Window
+from kivy.graphics import Color, Rectangle, Line
+from kivy.graphics.texture import Texture
+from kivy.uix.widget import Widget
 from kivy.uix.videoplayer import VideoPlayerProgressBar
 from kivy.uix.slider import Slider
 from kivy.uix.button import Button
@@ -57,9 +61,73 @@ Builder.load_string('''
 Builder.load_file(resource_find('data/skins/movist.kv'))
 
 
+class SeekPreview(Widget):
+
+    length       = NumericProperty(5)
+    thumb_height = NumericProperty(54)
+    margin       = NumericProperty(2)
+
+    def __init__(self, **kwargs):
+        self._thumbnails = None
+        self._textures   = {}
+        super(SeekPreview, self).__init__(**kwargs)
+
+    def show(self, thumbnails, nframe, center_x, y, left, right):
+        # a filmstrip of the indexed frames around nframe, the middle one
+        # is the preview of nframe itself
+        self.canvas.clear()
+        if thumbnails is None or thumbnails.built == 0:
+            return
+        if thumbnails is not self._thumbnails:
+            self._thumbnails = thumbnails
+            self._textures   = {}
+
+        tw, th = thumbnails.size
+        height = self.thumb_height
+        width  = int(height * tw / float(th))
+        index  = min(nframe // thumbnails.interval, thumbnails.built - 1)
+        half   = self.length // 2
+
+        total = self.length * (width + self.margin) - self.margin
+        x = min(max(center_x - total / 2., left), max(right - total, left))
+
+        textures = {}
+        with self.canvas:
+            for slot in xrange(self.length):
+                i = index + slot - half
+                pos = x + slot * (width + self.margin), y
+                if 0 <= i < thumbnails.built:
+                    texture = self._textures.get(i) or \
+                              self._create_texture(thumbnails, i)
+                    textures[i] = texture
+                    Color(1, 1, 1, 1 if i == index else .6)
+                    Rectangle(texture=texture, pos=pos, size=(width, height))
+                if i == index:
+                    Color(1, 1, 1, 1)
+                    Line(rectangle=(pos[0], pos[1], width, height))
+        # thumbnails out of the strip are uploaded again when they come back
+        self._textures = textures
+
+    def hide(self):
+        self.canvas.clear()
+
+    def _create_texture(self, thumbnails, index):
+        texture = Texture.create(size=thumbnails.size, colorfmt='rgb')
+        texture.flip_vertical()
+        texture.blit_buffer(thumbnails.get(thumbnails.frame_of(index)),
+                            colorfmt='rgb', bufferfmt='ubyte')
+        return texture
+
+
 class SeekBar(VideoPlayerProgressBar):
 
+    # exact and near duplicate frames
+    MARKER_COLORS = {'duplicate': (1, .3, .3, .9), 'near': (1, .8, .2, .9)}
+
     show_bubble = BooleanProperty(False)
+    thumbnails  = ObjectProperty(None, allownone=True)
+    markers     = ListProperty([])
+    hover       = NumericProperty(None, allownone=True)
 
     def __init__(self, **kwargs):
 
@@ -69,6 +137,45 @@ class SeekBar(VideoPlayerProgressBar):
         if not self.show_bubble:
             self.alpha = 0
 
+        self.preview = SeekPreview()
+        self.add_widget(self.preview)
+        self.bind(hover=self._update_preview, seek=self._update_preview,
+                  thumbnails=self._update_preview)
+        self.bind(pos=self._update_markers, size=self._update_markers,
+                  markers=self._update_markers)
+        Window.bind(mouse_pos=self._on_mouse_pos)
+
+    def _update_markers(self, *largs):
+        # a tick at least a pixel wide over every run of flagged frames
+        self.canvas.after.clear()
+        if not self.markers:
+            return
+        with self.canvas.after:
+            for first, last, kind in self.markers:
+                Color(*self.MARKER_COLORS.get(kind, (1, 1, 1, .9)))
+                x = self.x + first * self.width
+                Rectangle(pos=(int(x), int(self.center_y - 4)),
+                          size=(max(1, int((last - first) * self.width)), 8))
+
+    def _on_mouse_pos(self, window, pos):
+        if self.width == 0 or self.get_root_window() is None:
+            return
+        x, y = self.to_widget(*pos)
+        if self.x <= x <= self.right and self.y <= y <= self.top:
+            self.hover = (x - self.x) / float(self.width)
+        else:
+            self.hover = None
+
+    def _update_preview(self, *largs):
+        seek = self.seek if self.seek is not None else self.hover
+        thumbnails = self.thumbnails
+        if seek is None or thumbnails is None:
+            self.preview.hide()
+            return
+        nframe = int(min(max(seek, 0.), 1.) * (thumbnails.frames - 1))
+        self.preview.show(thumbnails, nframe, self.x + seek * self.width,
+                          self.top + self.bubble.height, self.x, self.right)
+
     def _update_bubble(self, *l):
         seek = self.seek
         if self.seek is None:
@@ -133,6 +240,8 @@ class FrontPanel(GridLayout):
     volume     = NumericProperty(1.0)
     state      = OptionProperty('stop', options=('play', 'pause', 'stop'))
 
+    thumbnails = ObjectProperty(None, allownone=True)
+    markers    = ListProperty([])
     controller = ObjectProperty(None, allownone=True)
 
     def __init__(self, **kwargs):
@@ -193,7 +302,9 @@ class FrontPanel(GridLayout):
         controller.bind(state=self.setter('state'),
                         duration=self.setter('duration'),
                         position=self.setter('position'),
-                        volume=self.setter('volume'))
+                        volume=self.setter('volume'),
+                        thumbnails=self.setter('thumbnails'),
+                        markers=self.setter('markers'))
 
         self.bind(state=controller.setter('state'),
                   volume=controller.setter('volume'))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('PixelBox', )
+
+from kivy.lang import Builder
+from kivy.properties import StringProperty, ListProperty
+from kivy.uix.relativelayout import RelativeLayout
+
+
+Builder.load_string('''
+<PixelBox>:
+    size_hint: (None, None)
+    width: max(pixel.texture_size[0] + root.padding[0], 1)
+    height: max(pixel.texture_size[1] + root.padding[1], 1)
+
+    Button:
+        id: pixel
+        background_normal: 'atlas://data/images/defaulttheme/bubble'
+        background_down: self.background_normal
+        font_name: 'data/fonts/DroidSansMono.ttf'
+        font_size: 11
+        color: root.color
+        text: root.text
+''')
+
+
+class PixelBox(RelativeLayout):
+
+    padding = ListProperty([12, 12])
+    color   = ListProperty([1, 1, 1, 1])
+    text    = StringProperty('')
+
+    def show_at(self, pos, bounds):
+        # next to the cursor, kept inside bounds
+        self.opacity = 1 if self.text else 0
+        x = pos[0] + 16
+        y = pos[1] - self.height - 16
+        if x + self.width > bounds[0]:
+            x = pos[0] - self.width - 16
+        self.pos = max(x, 0), max(y, 0)
+
+    def hide(self):
+        self.opacity = 0
@@ -23,7 +23,7 @@ __all__ = ('PlaylistPopup', )
 from os.path import basename
 
 from kivy.lang import Builder
-from kivy.properties import ObjectProperty, ListProperty
+from kivy.properties import ObjectProperty, ListProperty, DictProperty
 from kivy.adapters.dictadapter import DictAdapter
 from kivy.uix.listview import ListItemButton, CompositeListItem, ListView
 from kivy.uix.boxlayout import BoxLayout
@@ -37,7 +37,7 @@ Builder.load_string('''
 
     GridLayout:
         id: layout
-        cols: 3
+        cols: 4
 
     GridLayout:
         size_hint_y: None
@@ -60,6 +60,7 @@ class PlaylistLayout(BoxLayout):
 
     popup     = ObjectProperty(None)
     playlist  = ListProperty([])
+    info      = DictProperty({})
 
     def __init__(self, **kwargs):
 
@@ -72,6 +73,7 @@ class PlaylistLayout(BoxLayout):
                         if self.playlist[i][0].lower().endswith('.yuv') else '',
                 'format': self.playlist[i][1].upper() \
                           if self.playlist[i][0].lower().endswith('.yuv') else '',
+                'frames': str(self.info.get(self.playlist[i][0], {}).get('frames') or ''),
                 'playlist': self.playlist[i],
                 'is_selected': False
             } for i in xrange(len(self.playlist))
@@ -88,6 +90,9 @@ class PlaylistLayout(BoxLayout):
                             'size_hint_x': None, 'width': 100}},
                 {'cls': ListItemButton,
                  'kwargs': {'text': rec['format'],
+                            'size_hint_x': None, 'width': 70}},
+                {'cls': ListItemButton,
+                 'kwargs': {'text': rec['frames'],
                             'size_hint_x': None, 'width': 70}}
             ]
         }
@@ -122,10 +127,11 @@ class PlaylistPopup(Popup):
         super(PlaylistPopup, self).__init__()
 
         playlist       = kwargs.get('playlist', [])
+        info           = kwargs.get('info', {})
 
         self.confirm   = kwargs.get('confirm', None)
 
         self.title     = kwargs.get('title', 'PlayList YUV Image File')
         self.size_hint = kwargs.get('size_hint', (None, None))
         self.size      = kwargs.get('size', (700, 500))
-        self.content   = PlaylistLayout(popup=self, playlist=playlist)
+        self.content   = PlaylistLayout(popup=self, playlist=playlist, info=info)
@@ -27,52 +27,15 @@ from kivy.uix.dropdown import DropDown
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.popup import Popup
 
-from yuvist.core.video import YUV_CHROMA_FORMAT
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_BITDEPTH
 
 
 Builder.load_string('''
 #:import YUV_CHROMA_FORMAT yuvist.core.video.YUV_CHROMA_FORMAT
+#:import YUV_BITDEPTH yuvist.core.video.YUV_BITDEPTH
+#:import YUV_SIZE_LIST yuvist.core.video.YUV_SIZE_LIST
 
-#:set YUV_SIZE_LIST (            \
-    (( 128,   96), 'SQCIF'),     \
-    (( 176,  144), 'QCIF'),      \
-    (( 320,  240), 'QVGA'),      \
-    (( 352,  240), '525 SIF'),   \
-    (( 352,  288), 'CIF'),       \
-    (( 352,  480), '525 HHR'),   \
-    (( 352,  576), '625 HHR'),   \
-    (( 640,  360), 'Q720p'),     \
-    (( 640,  480), 'VGA'),       \
-    (( 704,  480), '525 4SIF'),  \
-    (( 720,  480), '525 SD'),    \
-    (( 704,  576), '4CIF'),      \
-    (( 720,  576), '625 SD'),    \
-    (( 864,  480), '480p'),      \
-    (( 800,  600), 'SVGA'),      \
-    (( 960,  540), 'QHD'),       \
-    ((1024,  768), 'XGA'),       \
-    ((1280,  720), '720p HD'),   \
-    ((1280,  960), '4VGA'),      \
-    ((1280, 1024), 'SXGA'),      \
-    ((1408,  960), '525 16SIF'), \
-    ((1408, 1152), '16CIF'),     \
-    ((1600, 1200), '4SVGA'),     \
-    ((1920, 1080), '1080 HD'),   \
-    ((2048, 1024), '2Kx1K'),     \
-    ((2048, 1080), '2Kx1080'),   \
-    ((2560, 1920), '16VGA'),     \
-    ((3616, 1536), '3616x1536'), \
-    ((3680, 1536), '3672x1536'), \
-    ((3840, 2160), '4HD'),       \
-    ((4096, 2048), '4Kx2K'),     \
-    ((4096, 2160), '4096x2160'), \
-    ((4096, 2304), '4096x2304'), \
-    ((7680, 4320), '7680x4320'), \
-    ((8192, 4096), '8192x4096'), \
-    ((8192, 4320), '8192x4320')  \
-)
-
-#:set YUV_CHROMA_LIST ('4:0:0', '4:2:0', '4:2:2', '4:2:2v', '4:4:4')
+#:set YUV_CHROMA_LIST ('4:0:0', '4:2:0', '4:2:2', '4:2:2v', '4:4:4', 'NV12', 'NV21', 'YUYV', 'UYVY')
 
 #:set MIN_YUV_WIDTH  1
 #:set MIN_YUV_HEIGHT 1
@@ -192,9 +155,10 @@ Builder.load_string('''
 
             GridLayout:
                 pos_hint: {'center_x':.5, 'center_y':.4}
-                size_hint: (.8, None)
+                size_hint: (.9, None)
                 height: 150
                 rows: 5
+                cols: 2
 
                 ToggleButton:
                     text: YUV_CHROMA_LIST[0]
@@ -221,6 +185,56 @@ Builder.load_string('''
                     group: 'chroma'
                     state: 'down' if root.format == YUV_CHROMA_FORMAT[4] else 'normal'
                     on_press: root.format = YUV_CHROMA_FORMAT[4]
+                ToggleButton:
+                    text: YUV_CHROMA_LIST[5]
+                    group: 'chroma'
+                    state: 'down' if root.format == YUV_CHROMA_FORMAT[5] else 'normal'
+                    on_press: root.format = YUV_CHROMA_FORMAT[5]
+                ToggleButton:
+                    text: YUV_CHROMA_LIST[6]
+                    group: 'chroma'
+                    state: 'down' if root.format == YUV_CHROMA_FORMAT[6] else 'normal'
+                    on_press: root.format = YUV_CHROMA_FORMAT[6]
+                ToggleButton:
+                    text: YUV_CHROMA_LIST[7]
+                    group: 'chroma'
+                    state: 'down' if root.format == YUV_CHROMA_FORMAT[7] else 'normal'
+                    on_press: root.format = YUV_CHROMA_FORMAT[7]
+                ToggleButton:
+                    text: YUV_CHROMA_LIST[8]
+                    group: 'chroma'
+                    state: 'down' if root.format == YUV_CHROMA_FORMAT[8] else 'normal'
+                    on_press: root.format = YUV_CHROMA_FORMAT[8]
+
+    HSeparator:
+        text: 'Bit Depth'
+
+    GridLayout:
+        size_hint: (.9, None)
+        pos_hint: {'center_x':.5}
+        height: 30
+        cols: 4
+
+        ToggleButton:
+            text: '%d bit' % YUV_BITDEPTH[0]
+            group: 'bitdepth'
+            state: 'down' if root.bitdepth == YUV_BITDEPTH[0] else 'normal'
+            on_press: root.bitdepth = YUV_BITDEPTH[0]
+        ToggleButton:
+            text: '%d bit' % YUV_BITDEPTH[1]
+            group: 'bitdepth'
+            state: 'down' if root.bitdepth == YUV_BITDEPTH[1] else 'normal'
+            on_press: root.bitdepth = YUV_BITDEPTH[1]
+        ToggleButton:
+            text: '%d bit' % YUV_BITDEPTH[2]
+            group: 'bitdepth'
+            state: 'down' if root.bitdepth == YUV_BITDEPTH[2] else 'normal'
+            on_press: root.bitdepth = YUV_BITDEPTH[2]
+        ToggleButton:
+            text: '%d bit' % YUV_BITDEPTH[3]
+            group: 'bitdepth'
+            state: 'down' if root.bitdepth == YUV_BITDEPTH[3] else 'normal'
+            on_press: root.bitdepth = YUV_BITDEPTH[3]
 
     Widget:
         size_hint_y: None
@@ -236,7 +250,7 @@ Builder.load_string('''
             on_press: root.cancel()
         Button:
             text: 'Confirm'
-            on_press: root.confirm(root.format, root.yuv_size)
+            on_press: root.confirm(root.format, root.yuv_size, root.bitdepth)
 ''')
 
 
@@ -256,10 +270,11 @@ class YuvParamLayout(BoxLayout):
     popup    = ObjectProperty(None)
     format   = OptionProperty(YUV_CHROMA_FORMAT[1], options=YUV_CHROMA_FORMAT)
     yuv_size = ListProperty([0, 0])
+    bitdepth = OptionProperty(YUV_BITDEPTH[0], options=YUV_BITDEPTH)
 
-    def confirm(self, format, yuv_size):
+    def confirm(self, format, yuv_size, bitdepth):
         if self.popup.confirm is not None:
-            self.popup.confirm(format, yuv_size)
+            self.popup.confirm(format, yuv_size, bitdepth)
         self.popup.dismiss()
 
     def cancel(self):
@@ -282,10 +297,12 @@ class YuvParamPopup(Popup):
 
         format         = kwargs.get('format', YUV_CHROMA_FORMAT[1])
         yuv_size       = kwargs.get('yuv_size', [0, 0])
+        bitdepth       = kwargs.get('bitdepth', YUV_BITDEPTH[0])
 
         self.confirm   = kwargs.get('confirm', None)
 
         self.title     = kwargs.get('title', 'Configuration YUV image')
         self.size_hint = kwargs.get('size_hint', (None, None))
-        self.size      = kwargs.get('size', (400, 400))
-        self.content   = YuvParamLayout(popup=self, format=format, yuv_size=yuv_size)
+        self.size      = kwargs.get('size', (400, 480))
+        self.content   = YuvParamLayout(popup=self, format=format, yuv_size=yuv_size,
+                                        bitdepth=bitdepth)
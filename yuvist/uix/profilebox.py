@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('ProfileBox', )
+
+from kivy.lang import Builder
+from kivy.properties import StringProperty, ListProperty
+from kivy.uix.relativelayout import RelativeLayout
+
+
+Builder.load_string('''
+<ProfileBox>:
+    size_hint: (None, None)
+    width: max(profile.texture_size[0] + root.padding[0], 1)
+    height: max(profile.texture_size[1] + root.padding[1], 1)
+
+    Button:
+        id: profile
+        background_normal: 'atlas://data/images/defaulttheme/bubble'
+        background_down: self.background_normal
+        font_name: 'data/fonts/DroidSansMono.ttf'
+        font_size: 11
+        halign: 'left'
+        color: root.color
+        text: root.text
+''')
+
+
+class ProfileBox(RelativeLayout):
+
+    padding = ListProperty([16, 16])
+    color   = ListProperty([1, 1, 1, 1])
+    text    = StringProperty('')
+
+    def show(self):
+        self.opacity = 1
+
+    def hide(self):
+        self.opacity = 0
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""\
+Kivy YUV Image Viewer
+Copyright (C) 2012 Luuvish <luuvish@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__all__ = ('StatsBox', )
+
+from kivy.lang import Builder
+from kivy.properties import StringProperty, ObjectProperty
+from kivy.graphics import Color, Line
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.widget import Widget
+
+
+Builder.load_string('''
+<StatsBox>:
+    orientation: 'vertical'
+    size_hint: (None, None)
+    padding: 8
+    spacing: 4
+    width: max(info.texture_size[0], 256) + self.padding * 2
+    height: info.texture_size[1] + graph.height + self.padding * 2 + self.spacing
+
+    canvas.before:
+        Color:
+            rgba: 0, 0, 0, .6
+        Rectangle:
+            size: self.size
+            pos: self.pos
+
+    Label:
+        id: info
+        size_hint_y: None
+        height: self.texture_size[1]
+        font_name: 'data/fonts/DroidSansMono.ttf'
+        font_size: 11
+        text: root.text
+
+    StatsGraph:
+        id: graph
+        size_hint_y: None
+        height: 64
+        stats: root.stats
+''')
+
+
+class StatsGraph(Widget):
+
+    # y, u, v histograms drawn over each other
+    PLANE_COLORS = ((1, 1, 1, .9), (.3, .5, 1, .8), (1, .3, .3, .8))
+
+    stats = ObjectProperty(None, allownone=True)
+
+    def __init__(self, **kwargs):
+        super(StatsGraph, self).__init__(**kwargs)
+        self.bind(pos=self._redraw, size=self._redraw)
+
+    def on_stats(self, instance, value):
+        self._redraw()
+
+    def _redraw(self, *largs):
+        self.canvas.clear()
+        if not self.stats:
+            return
+
+        with self.canvas:
+            for plane, color in zip(self.stats, self.PLANE_COLORS):
+                histogram = plane['histogram']
+                peak = float(max(max(histogram), 1))
+                step = self.width / float(max(len(histogram) - 1, 1))
+                points = []
+                for i, count in enumerate(histogram):
+                    points += [self.x + i * step, self.y + self.height * count / peak]
+                Color(*color)
+                Line(points=points)
+
+
+class StatsBox(BoxLayout):
+
+    stats = ObjectProperty(None, allownone=True)
+    text  = StringProperty('')
+
+    def on_stats(self, instance, value):
+        if not value:
+            self.text = ''
+            return
+
+        lines = ['%-5s %8s %9s %5s %5s %7s %7s' % (
+                 'plane', 'mean', 'stddev', 'min', 'max', 'clip-', 'clip+')]
+        for plane in value:
+            lines.append('%-5s %8.2f %9.2f %5d %5d %7d %7d' % (
+                plane['plane'].upper(), plane['mean'], plane['variance'] ** .5,
+                plane['min'], plane['max'], plane['clip_low'], plane['clip_high']))
+        self.text = '\n'.join(lines)
+
+    def show(self):
+        self.opacity = 1
+
+    def hide(self):
+        self.opacity = 0
@@ -24,10 +24,14 @@ from kivy.lang import Builder
 from kivy.resources import resource_find
 from kivy.graphics import RenderContext
 from kivy.properties import NumericProperty, StringProperty, ListProperty, \
-        ObjectProperty, OptionProperty
+        ObjectProperty, OptionProperty, BooleanProperty
 from kivy.uix.video import Video
 
-from yuvist.core.video import YUV_CHROMA_FORMAT, OUT_COLOR_FORMAT
+from yuvist.core.video import YUV_CHROMA_FORMAT, YUV_CHROMA_SUBPIXEL, \
+        YUV_CHROMA_LAYOUT, YUV_BITDEPTH, YUV_COLOR_MATRIX, YUV_COLOR_RANGE, \
+        YUV_CHROMA_FILTER, YUV_CHROMA_SITING, OUT_COLOR_FORMAT, COMPARE_MODE, \
+        PLAYBACK_POLICY
+from yuvist.core.video.convert_yuv import ConvertYuv
 from yuvist.core.video.video_yuv import VideoYuv
 
 
@@ -38,6 +42,15 @@ Builder.load_string('''
     canvas:
         Color:
             rgba: self.color
+        BindTexture:
+            texture: self.textures[5]
+            index: 6
+        BindTexture:
+            texture: self.textures[4]
+            index: 5
+        BindTexture:
+            texture: self.textures[3]
+            index: 4
         BindTexture:
             texture: self.textures[2]
             index: 3
@@ -50,91 +63,327 @@ Builder.load_string('''
         Rectangle:
             size: self.norm_image_size
             pos: self.center_x - self.norm_image_size[0] / 2., self.center_y - self.norm_image_size[1] / 2.
+            tex_coords: self.view_coords
 ''')
 
 
 class YuvVideo(Video):
 
-    FS_CONVERT_RGB = '''$HEADER$
+    ZOOM_MAX = 32.
+
+    # fragment shaders are assembled from a plane sampler, a pixel
+    # conversion and a main function, see _build_fs()
+
+    FS_HEADER = '''$HEADER$
     uniform sampler2D tex_y;
     uniform sampler2D tex_u;
     uniform sampler2D tex_v;
+    uniform sampler2D tex_y2;
+    uniform sampler2D tex_u2;
+    uniform sampler2D tex_v2;
+
+    uniform float yuv_scale;
+    uniform float tex_width;
+    uniform vec3 yuv_offset;
+    uniform vec3 yuv_to_r;
+    uniform vec3 yuv_to_g;
+    uniform vec3 yuv_to_b;
+    uniform float compare_mode;
+    uniform float wipe_pos;
+    uniform float diff_gain;
+    uniform vec2 luma_size;
+    uniform vec2 chroma_size;
+    uniform vec2 chroma_step;
+    uniform vec2 chroma_site;
+    uniform float chroma_filter;
+    '''
 
-    void main(void) {
-        float r, g, b;
+    FS_SAMPLE_8BIT = '''
+    float sample_plane(sampler2D tex, vec2 pos) {
+        return texture2D(tex, pos).s;
+    }
+
+    // sample pairs of interleaved planes arrive as luminance and alpha
+    vec2 sample_pair(sampler2D tex, vec2 pos) {
+        vec4 t = texture2D(tex, pos);
+        return vec2(t.r, t.a);
+    }
+    '''
 
-        r = texture2D(tex_y, tex_coord0).r;
-        g = texture2D(tex_y, tex_coord0).g;
-        b = texture2D(tex_y, tex_coord0).b;
+    FS_SAMPLE_16BIT = '''
+    // little-endian 16 bit samples arrive as luminance (low) and alpha (high)
+    float sample_plane(sampler2D tex, vec2 pos) {
+        vec4 t = texture2D(tex, pos);
+        return (t.r + t.a * 256.0) * yuv_scale;
+    }
 
-        gl_FragColor = vec4(r, g, b, 1.0);
+    // pairs of 16 bit samples arrive as rgba, one sample in each half
+    vec2 sample_pair(sampler2D tex, vec2 pos) {
+        vec4 t = texture2D(tex, pos);
+        return vec2(t.r + t.g * 256.0, t.b + t.a * 256.0) * yuv_scale;
     }
     '''
 
-    FS_CONVERT_YUV = '''$HEADER$
-    uniform sampler2D tex_y;
-    uniform sampler2D tex_u;
-    uniform sampler2D tex_v;
+    FS_CONVERT_RGB = '''
+    vec3 pixel_a(vec2 pos) {
+        return texture2D(tex_y, pos).rgb;
+    }
 
-    void main(void) {
-        float r, g, b, y, u, v;
+    vec3 pixel_b(vec2 pos) {
+        return texture2D(tex_y2, pos).rgb;
+    }
+    '''
 
-        y = texture2D(tex_y, tex_coord0).s;
-        u = texture2D(tex_u, tex_coord0).s;
-        v = texture2D(tex_v, tex_coord0).s;
+    FS_YUV_TO_RGB = '''
+    // matrix rows come from the color matrix and range, see _update_color()
+    vec3 yuv_to_rgb(float y, float u, float v) {
+        vec3 yuv = vec3(y, u, v) - yuv_offset;
 
-        y = 1.1643 * (y - 0.0625);
-        u = u - 0.5;
-        v = v - 0.5;
+        return vec3(dot(yuv_to_r, yuv),
+                    dot(yuv_to_g, yuv),
+                    dot(yuv_to_b, yuv));
+    }
+    '''
 
-        r = y + 1.5958  * v;
-        g = y - 0.39173 * u - 0.81290 * v;
-        b = y + 2.017   * u;
+    # fetch_chroma() reads the u, v pair of chroma sample j at its texel
+    # centre, clamped to the plane, so every filter works on exact samples
 
-        gl_FragColor = vec4(r, g, b, 1.0);
+    FS_FETCH_PLANAR = '''
+    vec2 fetch_chroma(sampler2D tex_u, sampler2D tex_v, vec2 j) {
+        vec2 t = (clamp(j, vec2(0.0), chroma_size - 1.0) + 0.5) / chroma_size;
+        return vec2(sample_plane(tex_u, t), sample_plane(tex_v, t));
     }
     '''
 
-    FS_CONVERT_MONO = '''$HEADER$
-    uniform sampler2D tex_y;
-    uniform sampler2D tex_u;
-    uniform sampler2D tex_v;
+    FS_FETCH_SEMIPLANAR = '''
+    vec2 fetch_chroma(sampler2D tex_c, sampler2D tex_unused, vec2 j) {
+        vec2 t = (clamp(j, vec2(0.0), chroma_size - 1.0) + 0.5) / chroma_size;
+        vec2 c = sample_pair(tex_c, t);
+        return vec2(c.$U$, c.$V$);
+    }
+    '''
 
-    void main(void) {
-        float y;
+    FS_FETCH_PACKED = '''
+    // the chroma alternates u and v over the texel pair of sample j
+    vec2 fetch_chroma(sampler2D tex, sampler2D tex_unused, vec2 j) {
+        j = clamp(j, vec2(0.0), chroma_size - 1.0);
+        float y = (j.y + 0.5) / chroma_size.y;
+        return vec2(sample_pair(tex, vec2((j.x * 2.0 + 0.5) / tex_width, y)).$C$,
+                    sample_pair(tex, vec2((j.x * 2.0 + 1.5) / tex_width, y)).$C$);
+    }
+    '''
+
+    FS_CHROMA = '''
+    // nearest repeats a sample over its luma block, bilinear blends the two
+    // samples on each side by their siting, see _update_chroma() and
+    // ConvertYuv.chroma_taps() for the same on the cpu
+    vec2 sample_chroma(sampler2D tex_u, sampler2D tex_v, vec2 pos) {
+        vec2 luma = floor(pos * luma_size);
+        if (chroma_filter < 0.5)
+            return fetch_chroma(tex_u, tex_v, floor(luma / chroma_step));
+
+        vec2 c = (luma - chroma_site) / chroma_step;
+        vec2 j = floor(c);
+        vec2 f = c - j;
+        return mix(mix(fetch_chroma(tex_u, tex_v, j),
+                       fetch_chroma(tex_u, tex_v, j + vec2(1.0, 0.0)), f.x),
+                   mix(fetch_chroma(tex_u, tex_v, j + vec2(0.0, 1.0)),
+                       fetch_chroma(tex_u, tex_v, j + 1.0), f.x), f.y);
+    }
+    '''
+
+    FS_CONVERT_YUV = '''
+    vec3 pixel_a(vec2 pos) {
+        vec2 c = sample_chroma(tex_u, tex_v, pos);
+        return yuv_to_rgb(sample_plane(tex_y, pos), c.x, c.y);
+    }
+
+    vec3 pixel_b(vec2 pos) {
+        vec2 c = sample_chroma(tex_u2, tex_v2, pos);
+        return yuv_to_rgb(sample_plane(tex_y2, pos), c.x, c.y);
+    }
+    '''
 
-        y = texture2D(tex_y, tex_coord0).s;
-        y = 1.1643 * (y - 0.0625);
+    FS_CONVERT_SEMIPLANAR = '''
+    vec3 pixel_semiplanar(sampler2D tex_y, sampler2D tex_c, vec2 pos) {
+        vec2 c = sample_chroma(tex_c, tex_c, pos);
+        return yuv_to_rgb(sample_plane(tex_y, pos), c.x, c.y);
+    }
+
+    vec3 pixel_a(vec2 pos) {
+        return pixel_semiplanar(tex_y, tex_u, pos);
+    }
+
+    vec3 pixel_b(vec2 pos) {
+        return pixel_semiplanar(tex_y2, tex_u2, pos);
+    }
+    '''
 
-        gl_FragColor = vec4(y, y, y, 1.0);
+    FS_CONVERT_PACKED = '''
+    // every texel holds a luma sample and a chroma sample
+    vec3 pixel_packed(sampler2D tex, vec2 pos) {
+        vec2 c = sample_chroma(tex, tex, pos);
+        return yuv_to_rgb(sample_pair(tex, pos).$Y$, c.x, c.y);
+    }
+
+    vec3 pixel_a(vec2 pos) {
+        return pixel_packed(tex_y, pos);
+    }
+
+    vec3 pixel_b(vec2 pos) {
+        return pixel_packed(tex_y2, pos);
+    }
+    '''
+
+    # component order of the interleaved formats
+    FS_SWIZZLE = {
+        'nv12': {'$U$': 'x', '$V$': 'y'},
+        'nv21': {'$U$': 'y', '$V$': 'x'},
+        'yuyv': {'$Y$': 'x', '$C$': 'y'},
+        'uyvy': {'$Y$': 'y', '$C$': 'x'}
+    }
+
+    FS_CONVERT_MONO = '''
+    vec3 pixel_a(vec2 pos) {
+        return vec3(yuv_to_r.x * (sample_plane(tex_y, pos) - yuv_offset.x));
+    }
+
+    vec3 pixel_b(vec2 pos) {
+        return vec3(yuv_to_r.x * (sample_plane(tex_y2, pos) - yuv_offset.x));
+    }
+    '''
+
+    FS_MAIN = '''
+    void main(void) {
+        gl_FragColor = vec4(pixel_a(tex_coord0), 1.0);
+    }
+    '''
+
+    FS_COMPARE_MAIN = '''
+    void main(void) {
+        vec2 pos = tex_coord0;
+        vec3 color;
+
+        if (compare_mode < 0.5) {
+            color = pixel_a(pos);
+        } else if (compare_mode < 1.5) {
+            // side by side, each half shows the centre half of its frame
+            if (pos.x < 0.5)
+                color = pixel_a(vec2(pos.x + 0.25, pos.y));
+            else
+                color = pixel_b(vec2(pos.x - 0.25, pos.y));
+        } else if (compare_mode < 2.5) {
+            color = pos.x < wipe_pos ? pixel_a(pos) : pixel_b(pos);
+        } else {
+            color = abs(pixel_a(pos) - pixel_b(pos)) * diff_gain;
+        }
+
+        gl_FragColor = vec4(clamp(color, 0.0, 1.0), 1.0);
     }
     '''
 
     fs       = StringProperty(None)
-    textures = ListProperty([None, None, None])
+    textures = ListProperty([None] * 6)
 
     format   = OptionProperty(YUV_CHROMA_FORMAT[1], options=YUV_CHROMA_FORMAT)
     colorfmt = OptionProperty(OUT_COLOR_FORMAT[1], options=OUT_COLOR_FORMAT)
     yuv_size = ListProperty([0, 0])
     yuv_fps  = NumericProperty(30.)
+    bitdepth = OptionProperty(YUV_BITDEPTH[0], options=YUV_BITDEPTH)
+
+    color_matrix = OptionProperty(YUV_COLOR_MATRIX[0], options=YUV_COLOR_MATRIX)
+    color_range  = OptionProperty(YUV_COLOR_RANGE[0], options=YUV_COLOR_RANGE)
+
+    chroma_filter = OptionProperty(YUV_CHROMA_FILTER[0], options=YUV_CHROMA_FILTER)
+    chroma_siting = OptionProperty(YUV_CHROMA_SITING[0], options=YUV_CHROMA_SITING)
+
+    buffer_depth = NumericProperty(4)
+    use_mmap     = BooleanProperty(False)
+
+    playback_policy = OptionProperty(PLAYBACK_POLICY[0], options=PLAYBACK_POLICY)
+
+    show_stats  = BooleanProperty(False)
+    frame_stats = ObjectProperty(None, allownone=True)
+
+    preload    = BooleanProperty(False)
+    loading    = BooleanProperty(False)
+    open_error = StringProperty('')
+
+    compare_source = StringProperty('')
+    compare_mode   = OptionProperty(COMPARE_MODE[1], options=COMPARE_MODE)
+    wipe_pos       = NumericProperty(.5)
+    diff_gain      = NumericProperty(4.)
+
+    # region of interest [x, y, width, height], only its rows are read
+    region = ListProperty([])
+
+    # zoom and pan only move the texture coordinates, planes stay uploaded
+    zoom        = NumericProperty(1.)
+    view_center = ListProperty([.5, .5])
+    view_coords = ListProperty([0., 0., 1., 0., 1., 1., 0., 1.])
 
     def __init__(self, **kwargs):
 
         self.register_event_type('on_load')
 
-        self.canvas = RenderContext(fs=self.FS_CONVERT_YUV)
+        self.canvas = RenderContext(fs=self.FS_HEADER + self.FS_SAMPLE_8BIT +
+                                       self.FS_YUV_TO_RGB + self.FS_FETCH_PLANAR +
+                                       self.FS_CHROMA + self.FS_CONVERT_YUV +
+                                       self.FS_MAIN)
         self.canvas['tex_y'] = 1
         self.canvas['tex_u'] = 2
         self.canvas['tex_v'] = 3
+        self.canvas['tex_y2'] = 4
+        self.canvas['tex_u2'] = 5
+        self.canvas['tex_v2'] = 6
 
         super(YuvVideo, self).__init__(**kwargs)
 
+        self.fs = self._build_fs()
+        self.canvas['yuv_scale'] = 1. / (1 << (self.bitdepth - 8))
+        self.canvas['tex_width'] = float(max(self.yuv_size[0], 1))
+        self._update_color()
+        self._update_chroma()
+
+        self.on_compare_mode(self, self.compare_mode)
+        self.on_wipe_pos(self, self.wipe_pos)
+        self.on_diff_gain(self, self.diff_gain)
+
+    def _build_fs(self):
+        layout = YUV_CHROMA_LAYOUT[self.format]
         if self.colorfmt == OUT_COLOR_FORMAT[0]:
-            self.fs = self.FS_CONVERT_RGB
-        elif self.format != YUV_CHROMA_FORMAT[0]:
-            self.fs = self.FS_CONVERT_YUV
+            convert = self.FS_CONVERT_RGB
+        elif self.format == YUV_CHROMA_FORMAT[0]:
+            convert = self.FS_CONVERT_MONO
+        elif layout == 'semiplanar':
+            convert = self.FS_YUV_TO_RGB + self.FS_FETCH_SEMIPLANAR + \
+                      self.FS_CHROMA + self.FS_CONVERT_SEMIPLANAR
+        elif layout == 'packed':
+            convert = self.FS_YUV_TO_RGB + self.FS_FETCH_PACKED + \
+                      self.FS_CHROMA + self.FS_CONVERT_PACKED
         else:
-            self.fs = self.FS_CONVERT_MONO
+            convert = self.FS_YUV_TO_RGB + self.FS_FETCH_PLANAR + \
+                      self.FS_CHROMA + self.FS_CONVERT_YUV
+
+        for key, value in self.FS_SWIZZLE.get(self.format, {}).items():
+            convert = convert.replace(key, value)
+
+        sample = self.FS_SAMPLE_16BIT if self.bitdepth > 8 else self.FS_SAMPLE_8BIT
+        main = self.FS_COMPARE_MAIN if self.compare_source else self.FS_MAIN
+
+        return self.FS_HEADER + sample + convert + main
+
+    @property
+    def playback(self):
+        if self._video is None:
+            return None
+        return self._video.playback
+
+    @property
+    def buffer_fill(self):
+        if self._video is None:
+            return 0, self.buffer_depth
+        return self._video.buffer_fill
 
     def seek(self, percent):
         if self.eos == True:
@@ -152,6 +401,202 @@ class YuvVideo(Video):
             shader.fs = old_value
             raise Exception('failed')
 
+    def on_color_matrix(self, instance, value):
+        self._update_color()
+
+    def on_color_range(self, instance, value):
+        self._update_color()
+
+    def _update_color(self):
+        # uniforms only, a switch shows up on the next frame without a reload
+        offset, coeffs = ConvertYuv.coefficients(self.color_matrix, self.color_range)
+        ky, rv, gu, gv, bu = coeffs
+
+        self.canvas['yuv_offset'] = (offset / 255., 128. / 255., 128. / 255.)
+        self.canvas['yuv_to_r'] = (ky,  0., rv)
+        self.canvas['yuv_to_g'] = (ky, -gu, -gv)
+        self.canvas['yuv_to_b'] = (ky,  bu, 0.)
+
+        # rgb output is converted on the cpu by the loaders
+        if self._video is not None and self.colorfmt == OUT_COLOR_FORMAT[0]:
+            self._video.color = self.color_matrix, self.color_range
+
+    def on_chroma_filter(self, instance, value):
+        self._update_chroma()
+
+    def on_chroma_siting(self, instance, value):
+        self._update_chroma()
+
+    def _update_chroma(self):
+        # uniforms only as the colors are, sizes follow the frame or region
+        texture = self.textures[0]
+        if texture is not None:
+            luma = texture.width, texture.height
+        else:
+            luma = self.yuv_size
+        luma = [max(n, 1) for n in luma]
+        step = YUV_CHROMA_SUBPIXEL[self.format]
+
+        self.canvas['luma_size'] = tuple(float(n) for n in luma)
+        self.canvas['chroma_size'] = tuple(float(max(n // s, 1))
+                                           for n, s in zip(luma, step))
+        self.canvas['chroma_step'] = tuple(float(s) for s in step)
+        self.canvas['chroma_site'] = ConvertYuv.chroma_site(step, self.chroma_siting)
+        self.canvas['chroma_filter'] = float(YUV_CHROMA_FILTER.index(self.chroma_filter))
+
+        # rgb output is converted on the cpu by the loaders
+        if self._video is not None and self.colorfmt == OUT_COLOR_FORMAT[0]:
+            self._video.chroma = self.chroma_filter, self.chroma_siting
+
+    def on_show_stats(self, instance, value):
+        if self._video is not None:
+            self._video.stats = value
+        if not value:
+            self.frame_stats = None
+
+    def on_compare_mode(self, instance, value):
+        self.canvas['compare_mode'] = float(COMPARE_MODE.index(value))
+
+    def on_wipe_pos(self, instance, value):
+        self.canvas['wipe_pos'] = float(value)
+
+    def on_diff_gain(self, instance, value):
+        self.canvas['diff_gain'] = float(value)
+
+    def on_zoom(self, instance, value):
+        self._update_view()
+
+    def on_view_center(self, instance, value):
+        self._update_view()
+
+    def _update_view(self):
+        span = 1. / self.zoom
+        cx = min(max(self.view_center[0], span / 2.), 1. - span / 2.)
+        cy = min(max(self.view_center[1], span / 2.), 1. - span / 2.)
+        if [cx, cy] != list(self.view_center):
+            self.view_center = [cx, cy]
+            return
+        u0, v0 = cx - span / 2., cy - span / 2.
+        u1, v1 = u0 + span, v0 + span
+        self.view_coords = [u0, v0, u1, v0, u1, v1, u0, v1]
+        self._update_filter()
+
+    def _update_filter(self):
+        # zoomed in every sample shows as a square
+        filter = 'nearest' if self.zoom > 1. else 'linear'
+        for texture in self.textures:
+            if texture is not None and texture.mag_filter != filter:
+                texture.mag_filter = filter
+
+    def zoom_at(self, zoom, pos=None):
+        # keeps the texel under pos in place, the centre by default
+        zoom = min(max(zoom, 1.), self.ZOOM_MAX)
+        point = self.view_point(pos) if pos is not None else None
+        if point is None:
+            self.zoom = zoom
+            return
+        u, v, fx, fy = point
+        span = 1. / zoom
+        self.view_center = [u - fx * span + span / 2., v - fy * span + span / 2.]
+        self.zoom = zoom
+
+    def view_point(self, pos):
+        # texture coordinate under pos and its place in the picture, or None
+        width, height = self.norm_image_size
+        if width <= 0 or height <= 0:
+            return None
+        fx = (pos[0] - (self.center_x - width / 2.)) / width
+        fy = (pos[1] - (self.center_y - height / 2.)) / height
+        if not (0. <= fx < 1. and 0. <= fy < 1.):
+            return None
+        u0, v0, u1 = self.view_coords[0:3]
+        v1 = self.view_coords[5]
+        return u0 + fx * (u1 - u0), v0 + fy * (v1 - v0), fx, fy
+
+    def pixel_at(self, pos):
+        # luma position under pos and the samples there of both videos
+        point = self.view_point(pos)
+        if point is None or self._video is None:
+            return None
+        u, v = point[0:2]
+        compare = False
+        if self.compare_source and self.compare_mode == 'split':
+            # each half shows the centre half of its frame
+            compare = u >= .5
+            u += -.25 if compare else .25
+        region = self._video.region or [0, 0] + list(self.yuv_size)
+        x = int(u * region[2])
+        y = int(v * region[3])
+        samples = self._video.pixel(x, y)
+        if samples is None:
+            return None
+        other = None
+        if self.compare_source and self.compare_mode != 'none':
+            other = self._video.pixel(x, y, compare=True)
+            if compare:
+                samples, other = other, samples
+        return region[0] + x, region[1] + y, samples, other
+
+    def view_region(self):
+        # the part of the frame on screen as a region of the whole frame
+        region = self._video.region if self._video is not None else None
+        region = region or [0, 0] + list(self.yuv_size)
+        u0, v0, u1 = self.view_coords[0:3]
+        v1 = self.view_coords[5]
+        return [int(region[0] + u0 * region[2]), int(region[1] + v0 * region[3]),
+                int(round((u1 - u0) * region[2])), int(round((v1 - v0) * region[3]))]
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super(YuvVideo, self).on_touch_down(touch)
+        if 'button' in touch.profile and touch.button.startswith('scroll'):
+            factor = {'scrollup': 2., 'scrolldown': .5}.get(touch.button, 1.)
+            self.zoom_at(self.zoom * factor, touch.pos)
+            return True
+        if self.compare_source and self.compare_mode == 'wipe':
+            touch.grab(self)
+            touch.ud['yuvvideo'] = 'wipe'
+            self._move_wipe(touch)
+            return True
+        if self.zoom > 1.:
+            touch.grab(self)
+            touch.ud['yuvvideo'] = 'pan'
+            return True
+        return super(YuvVideo, self).on_touch_down(touch)
+
+    def on_touch_move(self, touch):
+        if touch.grab_current is self:
+            if touch.ud.get('yuvvideo') == 'pan':
+                self._move_view(touch)
+            else:
+                self._move_wipe(touch)
+            return True
+        return super(YuvVideo, self).on_touch_move(touch)
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is self:
+            touch.ungrab(self)
+            return True
+        return super(YuvVideo, self).on_touch_up(touch)
+
+    def _move_view(self, touch):
+        width, height = self.norm_image_size
+        if width <= 0 or height <= 0:
+            return
+        span = 1. / self.zoom
+        self.view_center = [self.view_center[0] - touch.dx / width * span,
+                            self.view_center[1] - touch.dy / height * span]
+
+    def _move_wipe(self, touch):
+        width = self.norm_image_size[0]
+        if width <= 0:
+            return
+        left = self.center_x - width / 2.
+        fx = min(max(0., (touch.x - left) / width), 1.)
+        # the wipe is a texture coordinate, zoomed in it follows the view
+        u0, u1 = self.view_coords[0], self.view_coords[2]
+        self.wipe_pos = u0 + fx * (u1 - u0)
+
     def on_size(self, instance, value):
         window = self.get_parent_window()
         if window:
@@ -164,42 +609,78 @@ class YuvVideo(Video):
             self._video.stop()
         else:
             super(YuvVideo, self).on_state(instance, value)
+        self.loading = self._video.loading
 
     def _do_video_load(self, *largs):
         if self._video:
             self._video.stop()
+        self.loading    = False
+        self.open_error = ''
         if not self.source:
             self._video   = None
-            self.textures = [None, None, None]
+            self.textures = [None] * 6
             self.texture  = None
         else:
             filename = self.source
             if filename.split(':')[0] not in (
                     'http', 'https', 'file', 'udp', 'rtp', 'rtsp'):
                 filename = resource_find(filename)
+            compare = None
+            if self.compare_source:
+                compare = resource_find(self.compare_source)
             self._video = VideoYuv(filename=filename,
+                                   compare=compare,
                                    format=self.format,
                                    colorfmt=self.colorfmt,
                                    size=self.yuv_size,
-                                   fps=self.yuv_fps)
+                                   fps=self.yuv_fps,
+                                   bitdepth=self.bitdepth,
+                                   matrix=self.color_matrix,
+                                   range=self.color_range,
+                                   filter=self.chroma_filter,
+                                   siting=self.chroma_siting,
+                                   buffer_depth=self.buffer_depth,
+                                   policy=self.playback_policy,
+                                   mmap=self.use_mmap,
+                                   region=list(self.region) or None,
+                                   stats=self.show_stats)
             self._video.volume = self.volume
             self._video.bind(on_load=self._on_video_load,
                              on_frame=self._on_video_frame,
-                             on_eos=self._on_eos)
+                             on_eos=self._on_eos,
+                             on_open=self._on_video_open)
             if self.state == 'play' or self.play:
                 self._video.play()
+            elif self.preload:
+                # first frame read and textures made before the video is shown
+                self._video.open()
+            self.loading = self._video.loading
             self.duration = 1.
             self.position = 0.
 
+    def _on_video_open(self, instance, error):
+        self.loading = False
+        if error is not None:
+            self.open_error = str(error)
+            self.state = 'stop'
+
     def _on_video_load(self, *largs):
+        # duration first, texture watchers may seek right away
         self._on_video_frame()
+        # textures are created once per video and refilled in place
+        self.textures = self._video.texture
+        self.texture  = self._video.texture[0]
+        # packed texels are counted over the frame or region width
+        self.canvas['tex_width'] = float(max(self.textures[0].width, 1))
+        self._update_chroma()
+        self._update_filter()
         self.dispatch('on_load')
 
     def _on_video_frame(self, *largs):
         self.duration = self._video.duration
         self.position = self._video.position
-        self.textures = self._video.texture
-        self.texture  = self._video.texture[0]
+        if self.show_stats:
+            self.frame_stats = self._video.frame_stats
         self.canvas.ask_update()
 
     def _on_eos(self, *largs):
@@ -26,6 +26,9 @@ import yuvist
 from kivy.app import App
 
 from yuvist.command import Command
+from yuvist.core.video.cache_yuv import frame_cache
+from yuvist.core.video.playlist_yuv import PlaylistYuv
+from yuvist.core.video.profile_yuv import profiler
 from yuvist.mainscreen import MainScreen
 
 
@@ -38,6 +41,8 @@ class YuvistApp(App):
     def __init__(self, **kwargs):
         super(YuvistApp, self).__init__(**kwargs)
         self.command = kwargs.get('command', None)
+        self.profile = None
+        self.playlist = None
 
     def build(self):
         return MainScreen()
@@ -59,23 +64,79 @@ class YuvistApp(App):
         elif size_hint != (None, None):
             controller.dispatch('on_customsize', yuv_size, size_hint)
 
-        format   = command.get('format',   controller.format)
+        format   = command.get('format',   None)
         colorfmt = command.get('colorfmt', controller.colorfmt)
-        yuv_size = command.get('yuv_size', controller.yuv_size)
+        yuv_size = command.get('yuv_size', None)
         yuv_fps  = command.get('yuv_fps',  controller.yuv_fps)
+        bitdepth = command.get('bitdepth', None)
+
+        controller.color_matrix = command.get('color_matrix', controller.color_matrix)
+        controller.color_range  = command.get('color_range', controller.color_range)
+
+        controller.chroma_filter = command.get('chroma_filter', controller.chroma_filter)
+        controller.chroma_siting = command.get('chroma_siting', controller.chroma_siting)
+
+        controller.buffer_depth = command.get('buffer_depth', controller.buffer_depth)
+        controller.use_mmap     = command.get('use_mmap', controller.use_mmap)
+        controller.preload_size = command.get('preload_size', controller.preload_size)
+
+        controller.playback_policy = command.get('playback_policy', controller.playback_policy)
+
+        controller.compare_source = command.get('compare_source', controller.compare_source)
+        controller.compare_mode   = command.get('compare_mode', controller.compare_mode)
+
+        if 'cache_size' in command:
+            frame_cache.limit = command['cache_size'] * 1024 * 1024
+
+        self.profile = command.get('profile', None)
+        controller.profiling = self.profile is not None
 
         playitem = command.get('playitem', [])
 
-        for filename in playitem:
-            playitem = [filename, format, colorfmt, yuv_size, yuv_fps]
-            controller.playlist.append(playitem)
+        # items of a playlist file come with their metadata, nothing is probed
+        if command.get('playlist', None):
+            self.playlist = PlaylistYuv(filename=command['playlist'],
+                                        format=controller.format,
+                                        colorfmt=colorfmt,
+                                        size=controller.yuv_size,
+                                        fps=yuv_fps,
+                                        bitdepth=controller.bitdepth)
+            self.playlist.load()
+            for filename in playitem:
+                self.playlist.add(filename, format=format, colorfmt=colorfmt,
+                                  size=yuv_size, fps=yuv_fps, bitdepth=bitdepth)
+            if self.playlist.dirty:
+                self.playlist.save()
+            controller.playlist.extend(self.playlist.playitems())
+            controller.playlist_info = self.playlist.info()
+            playitem = []
 
         controller.volume = command.get('volume', controller.volume)
-        if len(controller.playlist) > 0:
+
+        # files named on the command line are probed off the ui thread, the
+        # window shows meanwhile and the first one opens when it is done
+        if playitem:
+            controller.open_detected(playitem, format, yuv_size, bitdepth,
+                                     colorfmt=colorfmt, yuv_fps=yuv_fps,
+                                     region=command.get('region', None),
+                                     state=command.get('state', controller.state))
+        elif len(controller.playlist) > 0:
+            if command.get('region', None):
+                controller.set_region(command['region'], controller.playlist[0][0])
             controller.playitem = controller.playlist[0]
             controller.state = command.get('state',  controller.state)
         else:
-            controller.playitem = ['', format, colorfmt, yuv_size, yuv_fps]
+            format, yuv_size, bitdepth = controller.default_yuv(format, yuv_size,
+                                                                bitdepth)
+            controller.playitem = ['', format, colorfmt, yuv_size, yuv_fps, bitdepth]
+
+    def on_stop(self):
+        if self.playlist is not None:
+            self.playlist.update(self.root.controller.playlist)
+            if self.playlist.dirty:
+                self.playlist.save()
+        if self.profile is not None:
+            profiler.dump(self.profile, **self.root.controller.profile_info())
 
 
 if __name__ == '__main__':